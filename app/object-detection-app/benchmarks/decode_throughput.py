@@ -0,0 +1,97 @@
+"""
+JPEG decode throughput benchmark.
+
+Compares full-resolution decode + resize against libjpeg scaled decoding
+(IMREAD_REDUCED_*) and TurboJPEG when it is installed, for typical ESP32-CAM
+frame sizes.
+
+Usage:
+    python -m benchmarks.decode_throughput --target 640x480 --seconds 2
+"""
+import cv2
+import json
+import time
+import argparse
+import numpy as np
+from src.utils import image_processing
+from src.utils.image_processing import decode_jpeg, resize_image
+
+# ESP32-CAM framesizes worth benchmarking
+FRAME_SIZES = {
+    "VGA": (640, 480),
+    "SVGA": (800, 600),
+    "XGA": (1024, 768),
+    "SXGA": (1280, 1024),
+    "UXGA": (1600, 1200),
+}
+
+
+def synthetic_jpeg(width: int, height: int, quality: int = 12) -> bytes:
+    """Build a JPEG with camera-like texture; quality uses the ESP32 0-63 scale."""
+    rng = np.random.default_rng(0)
+    base = cv2.resize(rng.integers(0, 255, (height // 16, width // 16, 3), dtype=np.uint8), (width, height))
+    noise = rng.integers(0, 24, (height, width, 3), dtype=np.uint8)
+    frame = cv2.add(base, noise)
+    jpeg_quality = max(10, 100 - quality)
+    ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+    return data.tobytes()
+
+
+def measure(fn, seconds: float) -> float:
+    fn()
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run(target, seconds: float):
+    results = []
+    for name, (width, height) in FRAME_SIZES.items():
+        data = synthetic_jpeg(width, height)
+        buffer = np.frombuffer(data, dtype=np.uint8)
+
+        def full():
+            resize_image(cv2.imdecode(buffer, cv2.IMREAD_COLOR), *target)
+
+        def reduced():
+            frame = decode_jpeg(data, target)
+            if frame.shape[1] != target[0] or frame.shape[0] != target[1]:
+                resize_image(frame, *target)
+
+        row = {
+            "framesize": name,
+            "source": f"{width}x{height}",
+            "jpeg_bytes": len(data),
+            "full_decode_fps": measure(full, seconds),
+            "reduced_decode_fps": measure(reduced, seconds),
+            "turbojpeg": image_processing._turbo is not None,
+        }
+        row["speedup"] = row["reduced_decode_fps"] / row["full_decode_fps"]
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JPEG decode throughput benchmark")
+    parser.add_argument("--target", default="640x480", help="Consumer size WIDTHxHEIGHT")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per measurement")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    target = tuple(int(v) for v in args.target.lower().split("x"))
+    results = run(target, args.seconds)
+
+    print(f"{'framesize':<10}{'source':>11}{'full fps':>11}{'reduced fps':>13}{'speedup':>9}")
+    for row in results:
+        print(f"{row['framesize']:<10}{row['source']:>11}{row['full_decode_fps']:>11.1f}"
+              f"{row['reduced_decode_fps']:>13.1f}{row['speedup']:>8.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"target": args.target, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Inference pool scaling benchmark.
+
+Measures detection throughput for a multi-camera style load with the
+in-process detector and with InferencePool at increasing worker counts, to
+check how close to linear the scaling is on this machine.
+
+Usage:
+    python -m benchmarks.inference_pool --backend onnxruntime --workers 1 2 4 8
+"""
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+from src.config import settings
+from src.core.detector import ObjectDetector
+from src.core.inference_pool import InferencePool
+
+
+def synthetic_frames(count: int, width: int, height: int):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def throughput(detector, frames, seconds: float) -> float:
+    """Frames per second when every batch holds one frame per camera."""
+    detector.detect_batch(frames)
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        detector.detect_batch(frames)
+        done += len(frames)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="InferencePool scaling benchmark")
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    parser.add_argument("--backend", default=settings.INFERENCE_BACKEND)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=settings.THREADS_PER_WORKER,
+                        help="Threads per worker process")
+    parser.add_argument("--cameras", type=int, default=8, help="Frames submitted per batch")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.cameras, settings.VIDEO_WIDTH, settings.VIDEO_HEIGHT)
+    kwargs = {"model_path": args.model, "backend": args.backend}
+
+    results = {"cpu_count": os.cpu_count(), "backend": args.backend, "runs": []}
+    single = throughput(ObjectDetector(**kwargs), frames, args.seconds)
+    results["in_process_fps"] = single
+    print(f"in-process: {single:7.1f} fps")
+
+    base = None
+    for workers in args.workers:
+        with InferencePool(workers, args.threads, detector_kwargs=kwargs) as pool:
+            fps = throughput(pool, frames, args.seconds)
+        base = base or fps / workers
+        efficiency = fps / (base * workers)
+        results["runs"].append({"workers": workers, "fps": fps, "efficiency": efficiency})
+        print(f"{workers:2d} workers: {fps:7.1f} fps  ({efficiency:.0%} of linear)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
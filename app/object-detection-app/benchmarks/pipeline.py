@@ -0,0 +1,231 @@
+"""
+Reproducible capture -> preprocess -> detect -> draw benchmark.
+
+Replays a recorded MJPEG stream (through a local stand-in ESP32 server and
+ESP32Camera's mjpeg backend) or a video file (through CameraStream), runs
+preprocess_frame and ObjectDetector at each requested input size, and writes
+per-stage latency percentiles, end-to-end FPS and peak memory to JSON so runs
+can be compared across commits. Runs offline on CPU with the bundled model.
+
+Usage:
+    python -m benchmarks.pipeline --output bench.json
+    python -m benchmarks.pipeline --input recording.mjpeg --sizes 320 640 --compare bench.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+
+import cv2
+import numpy as np
+
+from src.config import settings
+from src.core.camera import CameraStream
+from src.core.detector import ObjectDetector
+from src.core.ESP32Camera import ESP32Camera
+from src.utils.image_processing import draw_detections, preprocess_frame
+from src.utils.metrics import metrics, process_rss
+from benchmarks.replay import MJPEGReplayServer, load_mjpeg
+
+
+def synthetic_recording(path: str, frames: int = 120, size=(640, 480)) -> str:
+    """Write a deterministic .mjpeg clip of moving shapes."""
+    rng = np.random.default_rng(0)
+    background = cv2.resize(
+        rng.integers(40, 200, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8), size
+    )
+    with open(path, "wb") as f:
+        for i in range(frames):
+            frame = background.copy()
+            x = 20 + (i * 7) % (size[0] - 140)
+            cv2.rectangle(frame, (x, 120), (x + 100, 300), (30, 30, 220), -1)
+            cv2.circle(frame, (size[0] - x, 360), 40, (220, 200, 30), -1)
+            f.write(cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+    return path
+
+
+class MJPEGReplaySource:
+    def __init__(self, path: str):
+        self.server = MJPEGReplayServer(load_mjpeg(path)).__enter__()
+        self.camera = ESP32Camera(backend="mjpeg")
+        if not self.camera.connect(self.server.address):
+            raise RuntimeError("Could not connect to the local replay server")
+        self.last_id = 0
+
+    def read(self):
+        self.last_id, frame = self.camera.wait_for_frame(self.last_id, timeout=5)
+        return frame
+
+    def close(self):
+        self.camera.disconnect()
+        self.server.__exit__(None, None, None)
+
+
+class VideoFileSource:
+    def __init__(self, path: str):
+        self.path = path
+        self.stream = self._open()
+
+    def _open(self):
+        stream = CameraStream(self.path, threaded=False)
+        if not stream.open():
+            raise RuntimeError(f"Could not open {self.path}")
+        return stream
+
+    def read(self):
+        with metrics.time("receive"):
+            ret, frame = self.stream.read(rgb=False)
+            if not ret:
+                # Loop the recording so any frame count can be benchmarked
+                self.stream.release()
+                self.stream = self._open()
+                ret, frame = self.stream.read(rgb=False)
+        return frame
+
+    def close(self):
+        self.stream.release()
+
+
+def open_source(path: str):
+    if path.lower().endswith((".mjpeg", ".mjpg")):
+        return MJPEGReplaySource(path)
+    return VideoFileSource(path)
+
+
+def peak_rss_bytes() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def run_size(args, size: int):
+    detector = ObjectDetector(
+        args.model, backend=args.backend, imgsz=size,
+        **({"device": "cpu"} if args.backend == "ultralytics" else {})
+    )
+    source = open_source(args.input)
+    target = (size, size * 3 // 4)
+    try:
+        for _ in range(args.warmup):
+            frame = source.read()
+            if frame is None:
+                continue
+            detector.detect(frame, args.conf)
+
+        metrics.reset()
+        detections = 0
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            frame = source.read()
+            if frame is None:
+                break
+            with metrics.time("preprocess_frame"):
+                preprocess_frame(frame, target)
+            result = detector.detect(frame, args.conf)
+            # Camera frames are shared; copy outside the timed draw
+            canvas = frame.copy()
+            with metrics.time("draw"):
+                draw_detections(canvas, result)
+            detections += len(result)
+            metrics.mark_frame()
+        elapsed = time.perf_counter() - start
+    finally:
+        source.close()
+
+    snapshot = metrics.snapshot()
+    frames = snapshot["stages_ms"].get("draw", {}).get("count", 0)
+    return {
+        "size": size,
+        "frames": frames,
+        "fps": frames / elapsed if elapsed else 0.0,
+        "detections_per_frame": detections / frames if frames else 0.0,
+        "stages_ms": snapshot["stages_ms"],
+        "counters": snapshot["counters"],
+        "rss_mb": process_rss() / 1e6,
+        "peak_rss_mb": peak_rss_bytes() / 1e6,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {run["size"]: run for run in json.load(f)["runs"]}
+    print(f"\nvs {baseline_path}")
+    print(f"{'size':>6}{'fps':>10}{'Δfps':>9}{'infer p50':>11}{'Δ':>9}")
+    for run in current:
+        old = baseline.get(run["size"])
+        if old is None:
+            continue
+        infer = run["stages_ms"].get("inference", {}).get("p50", 0.0)
+        old_infer = old["stages_ms"].get("inference", {}).get("p50", 0.0)
+        fps_delta = (run["fps"] / old["fps"] - 1) * 100 if old["fps"] else 0.0
+        infer_delta = (infer / old_infer - 1) * 100 if old_infer else 0.0
+        print(f"{run['size']:>6}{run['fps']:>10.1f}{fps_delta:>+8.1f}%{infer:>11.1f}{infer_delta:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture/detect pipeline benchmark")
+    parser.add_argument("--input", help="Recorded .mjpeg or video file (default: synthetic clip)")
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    parser.add_argument("--backend", default=settings.INFERENCE_BACKEND)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[320, 480, 640],
+                        help="Model input sizes to benchmark")
+    parser.add_argument("--frames", type=int, default=100, help="Measured frames per size")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured frames per size")
+    parser.add_argument("--conf", type=float, default=settings.CONF_THRESHOLD)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.input is None:
+            args.input = synthetic_recording(os.path.join(directory, "synthetic.mjpeg"))
+
+        runs = []
+        for size in args.sizes:
+            run = run_size(args, size)
+            runs.append(run)
+            infer = run["stages_ms"].get("inference", {})
+            print(f"size {size:>4}: {run['fps']:6.1f} fps, inference p50 {infer.get('p50', 0):6.1f} ms "
+                  f"p95 {infer.get('p95', 0):6.1f} ms, peak RSS {run['peak_rss_mb']:.0f} MB")
+
+    result = {
+        "environment": environment(),
+        "config": {
+            "input": args.input, "backend": args.backend, "model": os.path.basename(args.model),
+            "frames": args.frames, "warmup": args.warmup, "conf": args.conf,
+        },
+        "runs": runs,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(runs, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Accuracy-vs-speed report for quantized model variants.
+
+Builds the requested precision variants of the model, runs each one and the
+FP32 baseline over a small local sample of images, and reports latency, FPS
+and how well each variant's detections agree with FP32. If YOLO-format label
+files sit next to the images (``image.jpg`` + ``image.txt``), recall against
+the labels is reported too.
+
+Usage:
+    python -m benchmarks.quantization_report --images samples/ --variants int8 fp16
+"""
+import os
+import glob
+import json
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from src.config import settings
+from src.core.detector import ObjectDetector
+from src.core.quantization import build_variant
+from src.utils.boxes import match_boxes, xywh_to_xyxy
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_sample(directory: str, limit: int):
+    paths = sorted(
+        p for p in glob.glob(os.path.join(directory, "*"))
+        if p.lower().endswith(IMAGE_EXTENSIONS)
+    )[:limit]
+    sample = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        sample.append((image, load_labels(os.path.splitext(path)[0] + ".txt", image.shape)))
+    return sample
+
+
+def load_labels(path: str, shape):
+    """Read YOLO-format labels (class cx cy w h, normalised) as pixel xyxy boxes."""
+    if not os.path.exists(path):
+        return None
+    rows = np.loadtxt(path, ndmin=2, dtype=np.float32)
+    if rows.size == 0:
+        return np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.int32)
+    h, w = shape[:2]
+    boxes = xywh_to_xyxy(rows[:, 1:5] * np.array([w, h, w, h], dtype=np.float32))
+    return boxes, rows[:, 0].astype(np.int32)
+
+
+def evaluate(detector, sample, conf, warmup: int = 2):
+    for image, _ in sample[:warmup]:
+        detector.detect(image, conf)
+    latencies, outputs = [], []
+    for image, _ in sample:
+        start = time.perf_counter()
+        outputs.append(detector.detect(image, conf))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), outputs
+
+
+def agreement(outputs, reference, iou):
+    """F1 of a variant's detections against the FP32 detections."""
+    matched = sum(
+        match_boxes(out.boxes, out.class_ids, ref.boxes, ref.class_ids, iou)
+        for out, ref in zip(outputs, reference)
+    )
+    predicted = sum(len(out) for out in outputs)
+    expected = sum(len(ref) for ref in reference)
+    if predicted + expected == 0:
+        return 1.0
+    return 2 * matched / (predicted + expected)
+
+
+def recall(outputs, sample, iou):
+    labelled = [(out, labels) for out, (_, labels) in zip(outputs, sample) if labels is not None]
+    total = sum(len(labels[0]) for _, labels in labelled)
+    if not total:
+        return None
+    found = sum(match_boxes(out.boxes, out.class_ids, labels[0], labels[1], iou) for out, labels in labelled)
+    return found / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized variant accuracy/speed report")
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    parser.add_argument("--images", required=True, help="Directory of sample images")
+    parser.add_argument("--variants", nargs="+", default=["int8", "fp16"], choices=("int8", "fp16"))
+    parser.add_argument("--backend", default="onnxruntime", choices=("onnxruntime", "openvino"))
+    parser.add_argument("--limit", type=int, default=50, help="Maximum number of images")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for matching detections")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    sample = load_sample(args.images, args.limit)
+    if not sample:
+        parser.error(f"No images found in {args.images}")
+
+    report = []
+    reference = None
+    for variant in ["fp32"] + args.variants:
+        build_variant(args.model, variant, settings.INFERENCE_SIZE)
+        detector = ObjectDetector(args.model, backend=args.backend, variant=variant)
+        latencies, outputs = evaluate(detector, sample, args.conf)
+        if reference is None:
+            reference = outputs
+        row = {
+            "variant": variant,
+            "size_mb": os.path.getsize(detector.backend.onnx_path) / 1e6,
+            "latency_ms_mean": float(latencies.mean()),
+            "latency_ms_p95": float(np.percentile(latencies, 95)),
+            "fps": float(1000 / latencies.mean()),
+            "agreement_f1": agreement(outputs, reference, args.iou),
+            "recall": recall(outputs, sample, args.iou),
+        }
+        row["speedup"] = report[0]["latency_ms_mean"] / row["latency_ms_mean"] if report else 1.0
+        report.append(row)
+
+    print(f"{'variant':<8}{'size MB':>9}{'mean ms':>9}{'p95 ms':>8}{'fps':>8}"
+          f"{'speedup':>9}{'agree':>7}{'recall':>8}")
+    for row in report:
+        rec = f"{row['recall']:.3f}" if row["recall"] is not None else "-"
+        print(f"{row['variant']:<8}{row['size_mb']:>9.1f}{row['latency_ms_mean']:>9.1f}"
+              f"{row['latency_ms_p95']:>8.1f}{row['fps']:>8.1f}{row['speedup']:>8.2f}x"
+              f"{row['agreement_f1']:>7.3f}{rec:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"backend": args.backend, "images": len(sample), "results": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Local HTTP server replaying JPEG frames as an ESP32-CAM /stream."""
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from src.core.mjpeg import BOUNDARY, MJPEGParser
+
+
+def load_mjpeg(path: str) -> List[bytes]:
+    """Split a raw .mjpeg recording (concatenated JPEGs) into frames."""
+    with open(path, "rb") as f:
+        return MJPEGParser().feed(f.read())
+
+
+class MJPEGReplayServer:
+    """
+    Local stand-in for the ESP32-CAM web server serving ``jpegs`` on /stream.
+
+    Frames are sent ``interval`` seconds apart (0 sends them as fast as the
+    client reads), in a loop unless ``loop`` is False. With ``chunked`` the
+    stream is sent with ``Transfer-Encoding: chunked``, one chunk per part
+    header and per JPEG, like ``esp_http_server``.
+    """
+
+    def __init__(self, jpegs: List[bytes], interval: float = 0.0, loop: bool = True,
+                 chunked: bool = False):
+        self.jpegs = list(jpegs)
+        self.interval = interval
+        self.loop = loop
+        self.chunked = chunked
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/":
+                    body = b"<html>ESP32-CAM</html>"
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if self.path != "/stream":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/x-mixed-replace;boundary={BOUNDARY}")
+                if server.chunked:
+                    self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    while not server.stopped.is_set():
+                        for jpeg in server.jpegs:
+                            head = (
+                                f"\r\n--{BOUNDARY}\r\n".encode()
+                                + b"Content-Type: image/jpeg\r\n"
+                                + f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                            )
+                            for part in (head, jpeg) if server.chunked else (head + jpeg,):
+                                if server.chunked:
+                                    part = f"{len(part):X}\r\n".encode() + part + b"\r\n"
+                                self.wfile.write(part)
+                            self.wfile.flush()
+                            if server.interval:
+                                time.sleep(server.interval)
+                            if server.stopped.is_set():
+                                return
+                        if not server.loop:
+                            break
+                    if server.chunked:
+                        self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        # esp_http_server always answers HTTP/1.1 and keeps the connection open
+        Handler.protocol_version = "HTTP/1.1" if chunked else "HTTP/1.0"
+        self.stopped = threading.Event()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.address = f"127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,87 @@
+"""
+Startup time report.
+
+Each measurement runs in a fresh interpreter so module caches from earlier
+steps do not hide regressions: the import cost of the GUI (or of the core
+modules when PyQt5 is not installed), detector construction, warm-up, and
+the first inference after warm-up compared with a steady-state one.
+
+Usage:
+    python -m benchmarks.startup --backend onnxruntime --json startup.json
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+from src.config import settings
+
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+try:
+    import PyQt5
+    import src.gui.main_window
+    target = "gui"
+except ImportError:
+    import src.cli, src.core.ESP32Camera, src.core.tracker, src.core.camera_manager
+    target = "core"
+print(target, time.perf_counter() - start)
+"""
+
+MODEL_PROBE = """
+import sys, time
+import numpy as np
+start = time.perf_counter()
+from src.core.detector import ObjectDetector
+imported = time.perf_counter()
+detector = ObjectDetector(model_path=sys.argv[1], backend=sys.argv[2])
+loaded = time.perf_counter()
+detector.warmup(int(sys.argv[3]), int(sys.argv[4]))
+warmed = time.perf_counter()
+frame = np.zeros((int(sys.argv[4]), int(sys.argv[3]), 3), dtype=np.uint8)
+times = []
+for _ in range(5):
+    t = time.perf_counter()
+    detector.detect(frame)
+    times.append(time.perf_counter() - t)
+print(imported - start, loaded - imported, warmed - loaded, times[0], sorted(times)[2])
+"""
+
+
+def probe(code: str, *args) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code, *map(str, args)],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.split("\n")[-2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time report")
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    parser.add_argument("--backend", default=settings.INFERENCE_BACKEND)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    target, import_s = probe(IMPORT_PROBE).split()
+    report = {"import_target": target, "import_s": float(import_s)}
+    print(f"{target} imports:        {float(import_s):6.2f}s")
+
+    values = map(float, probe(
+        MODEL_PROBE, args.model, args.backend, settings.VIDEO_WIDTH, settings.VIDEO_HEIGHT
+    ).split())
+    for key, label in zip(
+        ("detector_import_s", "model_load_s", "warmup_s", "first_inference_s", "median_inference_s"),
+        ("detector imports", "model load", "warm-up", "first inference", "median inference"),
+    ):
+        report[key] = next(values)
+        print(f"{label + ':':20s}{report[key]:6.2f}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Cost and benefit of sliced inference.
+
+Runs the detector on full frames and with TiledInference at the requested
+tile sizes, and reports latency, FPS, the slowdown against full-frame
+inference, tiles per frame and detections per frame. With YOLO-format labels
+next to the images, recall is reported overall and for small objects
+(under 32x32 pixels), which is what tiling is for.
+
+Usage:
+    python -m benchmarks.tiling --images uxga_samples/ --tile-sizes 640 512 --overlap 0.2
+"""
+import json
+import argparse
+
+import numpy as np
+
+from benchmarks.quantization_report import evaluate, load_sample, recall
+from src.config import settings
+from src.core.detector import ObjectDetector
+from src.core.tiling import TiledInference
+from src.utils.boxes import box_area
+
+SMALL_AREA = 32 * 32
+
+
+def small_objects(sample):
+    """The sample with only the labels of small objects kept."""
+    small = []
+    for image, labels in sample:
+        if labels is not None:
+            mask = box_area(labels[0]) < SMALL_AREA
+            labels = (labels[0][mask], labels[1][mask])
+        small.append((image, labels))
+    return small
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiled vs full-frame inference report")
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    parser.add_argument("--backend", default=settings.INFERENCE_BACKEND)
+    parser.add_argument("--images", required=True, help="Directory of (high-resolution) sample images")
+    parser.add_argument("--tile-sizes", nargs="+", type=int, default=[settings.TILE_SIZE])
+    parser.add_argument("--overlap", type=float, default=settings.TILE_OVERLAP)
+    parser.add_argument("--no-full-frame", action="store_true",
+                        help="Run tiles only, without the extra whole-frame pass")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum number of images")
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for matching labels")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    sample = load_sample(args.images, args.limit)
+    if not sample:
+        parser.error(f"No images found in {args.images}")
+    small = small_objects(sample)
+    h, w = sample[0][0].shape[:2]
+
+    detector = ObjectDetector(args.model, backend=args.backend)
+    report = []
+    for tile_size in [None] + args.tile_sizes:
+        tiler = None
+        if tile_size is not None:
+            tiler = TiledInference(tile_size, args.overlap, full_frame=not args.no_full_frame)
+        detector.set_tiling(tiler)
+        latencies, outputs = evaluate(detector, sample, args.conf)
+        row = {
+            "mode": f"tiles {tile_size}" if tiler else "full frame",
+            "tiles": tiler.tiles_per_frame(w, h) if tiler else 1,
+            "latency_ms_mean": float(latencies.mean()),
+            "latency_ms_p95": float(np.percentile(latencies, 95)),
+            "fps": float(1000 / latencies.mean()),
+            "detections": float(np.mean([len(out) for out in outputs])),
+            "recall": recall(outputs, sample, args.iou),
+            "small_recall": recall(outputs, small, args.iou),
+        }
+        row["cost"] = row["latency_ms_mean"] / report[0]["latency_ms_mean"] if report else 1.0
+        report.append(row)
+
+    print(f"{'mode':<12}{'tiles':>6}{'mean ms':>9}{'p95 ms':>8}{'fps':>7}{'cost':>7}"
+          f"{'dets':>6}{'recall':>8}{'small':>7}")
+    for row in report:
+        rec = f"{row['recall']:.3f}" if row["recall"] is not None else "-"
+        small_rec = f"{row['small_recall']:.3f}" if row["small_recall"] is not None else "-"
+        print(f"{row['mode']:<12}{row['tiles']:>6}{row['latency_ms_mean']:>9.1f}"
+              f"{row['latency_ms_p95']:>8.1f}{row['fps']:>7.1f}{row['cost']:>6.2f}x"
+              f"{row['detections']:>6.1f}{rec:>8}{small_rec:>7}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "backend": args.backend, "images": len(sample), "frame": [w, h],
+                "overlap": args.overlap, "results": report
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
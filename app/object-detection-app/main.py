@@ -1,12 +1,21 @@
 import sys
+import time
+
+# Taken before the heavy imports so the startup report covers them
+_START = time.perf_counter()
+
 from PyQt5.QtWidgets import QApplication
 from src.gui.main_window import MainWindow
+from src.utils.metrics import metrics
 
 def main():
+    metrics.started = _START
+    metrics.mark_startup("imports")
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    metrics.mark_startup("window_shown")
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
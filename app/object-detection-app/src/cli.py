@@ -0,0 +1,301 @@
+"""
+Headless capture + detection entry point.
+
+Runs ESP32-CAM streams or local video files through ObjectDetector without
+PyQt5 and streams detections as JSON lines and/or writes annotated video.
+
+Usage:
+    python -m src.cli 192.168.1.50 --jsonl detections.jsonl
+    python -m src.cli recording.mp4 --save-video annotated.mp4 --conf 0.4
+    python -m src.cli 192.168.1.50 --record-dir clips --record-classes person
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import List, Optional
+
+import cv2
+
+from src.config import settings
+from src.utils.image_processing import MotionGate, draw_detections
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class VideoFileSource:
+    """Reads every frame of a local video file in order."""
+
+    def __init__(self, path: str):
+        self.name = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"Could not open video file {path}")
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or settings.FPS
+        self.finished = False
+
+    def next_frame(self, timeout: float = 0.0):
+        ret, frame = self.capture.read()
+        if not ret:
+            self.finished = True
+            return None
+        return frame
+
+    def close(self) -> None:
+        self.capture.release()
+
+
+class CameraSource:
+    """Pulls the newest frame from an ESP32-CAM, skipping frames missed while busy."""
+
+    def __init__(self, address: str, backend: str):
+        from src.core.ESP32Camera import ESP32Camera
+        from src.core.supervisor import StreamSupervisor
+
+        self.name = address
+        self.camera = ESP32Camera(backend=backend)
+        if not self.camera.connect(address):
+            raise IOError(f"Could not connect to ESP32-CAM at {address}")
+        # Dropped or stalled streams are reopened in the background
+        self.supervisor = StreamSupervisor(self.camera, address, settings.STALL_TIMEOUT)
+        self.supervisor.start()
+        self.fps = settings.FPS
+        self.finished = False
+        self.last_id = 0
+
+    def next_frame(self, timeout: float = 0.1):
+        """Newest unseen frame, waiting up to ``timeout``; 0 returns at once."""
+        if not timeout:
+            self.last_id, frame = self.camera.get_frame_if_newer(self.last_id)
+            return frame
+        self.last_id, frame = self.camera.wait_for_frame(self.last_id, timeout=timeout)
+        if frame is None and not self.camera.running:
+            # Reconnecting; wait instead of spinning through the source loop
+            time.sleep(timeout)
+        return frame
+
+    def close(self) -> None:
+        self.supervisor.stop()
+        stats = self.supervisor.stats()
+        logger.info(
+            f"{self.name}: {stats['reconnects']} reconnects, {stats['stalls']} stalls, "
+            f"{stats['fps']:.1f} fps"
+        )
+        if self.camera.running:
+            self.camera.disconnect()
+
+
+def open_source(spec: str, backend: str):
+    if os.path.exists(spec):
+        return VideoFileSource(spec)
+    return CameraSource(spec, backend)
+
+
+def video_output_path(path: str, index: int, count: int) -> str:
+    if count == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{index}{ext}"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Run object detection headless on ESP32-CAM streams or video files."
+    )
+    parser.add_argument("sources", nargs="+", help="ESP32-CAM addresses/URLs or video file paths")
+    parser.add_argument("--model", default=settings.MODEL_PATH, help="Model weights path")
+    parser.add_argument("--conf", type=float, default=settings.CONF_THRESHOLD,
+                        help="Confidence threshold")
+    parser.add_argument("--backend", default=settings.CAMERA_BACKEND, choices=("opencv", "mjpeg"),
+                        help="Capture backend for ESP32-CAM streams")
+    parser.add_argument("--detect-interval", type=int, default=settings.DETECT_INTERVAL,
+                        help="Run the model every N frames and track boxes in between")
+    parser.add_argument("--motion-gate", action="store_true", default=settings.MOTION_GATING,
+                        help="Skip inference on static frames and reuse the last results")
+    parser.add_argument("--motion-threshold", type=float, default=settings.MOTION_THRESHOLD,
+                        help="Fraction of changed pixels that triggers inference")
+    parser.add_argument("--motion-crop", action="store_true", default=settings.MOTION_CROP,
+                        help="Run the model only on the changed region")
+    parser.add_argument("--tiled", action="store_true", default=settings.TILED_INFERENCE,
+                        help="Detect on overlapping tiles to find small objects in large frames")
+    parser.add_argument("--tile-size", type=int, default=settings.TILE_SIZE,
+                        help="Tile edge in pixels for --tiled")
+    parser.add_argument("--tile-overlap", type=float, default=settings.TILE_OVERLAP,
+                        help="Fraction of each tile shared with its neighbours")
+    parser.add_argument("--jsonl", default="-",
+                        help="Write detections as JSON lines to this file ('-' for stdout, '' to disable)")
+    parser.add_argument("--save-video", help="Write annotated video to this path")
+    parser.add_argument("--record-dir", default=settings.RECORD_DIR if settings.RECORDING else None,
+                        help="Save pre-event clips from camera sources to this directory")
+    parser.add_argument("--record-classes", nargs="*", default=list(settings.RECORD_CLASSES),
+                        help="Class names that trigger a clip (default: any detection)")
+    parser.add_argument("--pre-seconds", type=float, default=settings.RECORD_PRE_SECONDS,
+                        help="Seconds of video kept from before a trigger")
+    parser.add_argument("--post-seconds", type=float, default=settings.RECORD_POST_SECONDS,
+                        help="Seconds of video recorded after the last trigger")
+    parser.add_argument("--events",
+                        help="Log detections to this SQLite database for later queries")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="Re-stream annotated video and detections over HTTP on this port")
+    parser.add_argument("--metrics",
+                        help="Periodically write pipeline metrics here (.prom = Prometheus text, else JSON)")
+    parser.add_argument("--metrics-interval", type=float, default=5.0,
+                        help="Seconds between metrics writes")
+    parser.add_argument("--max-frames", type=int, default=0,
+                        help="Stop after this many frames per source (0 = unlimited)")
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> int:
+    from src.core.detector import ObjectDetector
+    from src.core.tracker import TrackingDetector
+
+    tiler = None
+    if args.tiled:
+        from src.core.tiling import TiledInference
+
+        tiler = TiledInference(args.tile_size, args.tile_overlap)
+    model = ObjectDetector(model_path=args.model, crop_to_motion=args.motion_crop, tiler=tiler)
+    model.warmup(settings.VIDEO_WIDTH, settings.VIDEO_HEIGHT)
+    metrics.mark_startup("model_ready")
+    logger.info(f"Startup: {metrics.startup_report()}")
+    sources = [open_source(spec, args.backend) for spec in args.sources]
+    # One tracker and motion gate per source so state never mixes between streams
+    detectors = [
+        TrackingDetector(
+            model,
+            args.detect_interval,
+            motion_gate=MotionGate(args.motion_threshold) if args.motion_gate else None
+        )
+        for _ in sources
+    ]
+    counts = [0] * len(sources)
+    recorders = [None] * len(sources)
+    if args.record_dir:
+        from src.core.recorder import ClipRecorder
+
+        for i, source in enumerate(sources):
+            if isinstance(source, CameraSource):
+                recorders[i] = ClipRecorder(
+                    args.record_dir, args.pre_seconds, args.post_seconds,
+                    settings.RECORD_BUFFER_BYTES, args.record_classes, prefix=f"camera{i}"
+                )
+                source.camera.attach_recorder(recorders[i])
+    writers = [None] * len(sources)
+    server = None
+    if args.serve is not None:
+        from src.core.stream_server import StreamServer
+
+        server = StreamServer(settings.STREAM_HOST, args.serve, settings.STREAM_QUALITY).start()
+    store = None
+    if args.events:
+        from src.core.event_store import DetectionStore
+
+        store = DetectionStore(
+            args.events, batch_size=settings.EVENT_BATCH_SIZE, max_pending=settings.EVENT_MAX_PENDING
+        )
+
+    if args.jsonl == "-":
+        jsonl = sys.stdout
+    elif args.jsonl:
+        jsonl = open(args.jsonl, "w")
+    else:
+        jsonl = None
+
+    last_metrics = time.monotonic()
+    try:
+        while True:
+            if args.metrics and time.monotonic() - last_metrics >= args.metrics_interval:
+                metrics.write(args.metrics)
+                last_metrics = time.monotonic()
+
+            active = [
+                i for i, source in enumerate(sources)
+                if not source.finished and not (args.max_frames and counts[i] >= args.max_frames)
+            ]
+            if not active:
+                break
+
+            # A single source may block for its next frame; with several, each
+            # is polled so a stalled camera does not hold up the others
+            timeout = 0.1 if len(active) == 1 else 0.0
+            idle = True
+            for i in active:
+                source = sources[i]
+                frame = source.next_frame(timeout)
+                if frame is None:
+                    continue
+                idle = False
+                counts[i] += 1
+                metrics.mark_frame()
+
+                detections = detectors[i].detect(frame, conf_threshold=args.conf)
+                if recorders[i] is not None:
+                    recorders[i].observe(detections)
+                if store is not None:
+                    store.add(source.name, detections)
+                if jsonl is not None:
+                    jsonl.write(json.dumps({
+                        "source": source.name,
+                        "frame": counts[i],
+                        "timestamp": time.time(),
+                        "detections": detections.to_list(),
+                    }) + "\n")
+                    jsonl.flush()
+
+                if args.save_video or server is not None:
+                    # Camera frames are shared with the recorder; draw on a copy
+                    with metrics.time("draw"):
+                        frame = draw_detections(frame.copy(), detections)
+                if server is not None:
+                    server.publish(source.name, frame, detections)
+                if args.save_video:
+                    if writers[i] is None:
+                        h, w = frame.shape[:2]
+                        writers[i] = cv2.VideoWriter(
+                            video_output_path(args.save_video, i, len(sources)),
+                            cv2.VideoWriter_fourcc(*"mp4v"), source.fps, (w, h)
+                        )
+                    writers[i].write(frame)
+            if idle and not timeout:
+                # Nothing new from any source; don't spin
+                time.sleep(0.005)
+    except KeyboardInterrupt:
+        logger.info("Interrupted")
+    finally:
+        if args.metrics:
+            metrics.write(args.metrics)
+        if model.gated_frames:
+            logger.info(
+                f"Motion gate skipped {model.skipped_frames} of {model.gated_frames} frames"
+            )
+        for source in sources:
+            source.close()
+        for recorder in recorders:
+            if recorder is not None:
+                recorder.close()
+        for writer in writers:
+            if writer is not None:
+                writer.release()
+        if server is not None:
+            server.stop()
+        if store is not None:
+            store.close()
+            if store.dropped:
+                logger.warning(f"Event store dropped {store.dropped} frames of detections")
+        if jsonl not in (None, sys.stdout):
+            jsonl.close()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    return run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,107 @@
 # Configuration settings for the Object Detection App
+import os
 
-MODEL_PATH = "app/object-detection-app/models/best.pt"
+APP_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_PATH = os.path.join(APP_DIR, "models", "best.pt")
 VIDEO_WIDTH = 640
 VIDEO_HEIGHT = 480
 FPS = 60
+# Square model input size used for letterboxing/export
+INFERENCE_SIZE = 640
 WINDOW_TITLE = "Object Detection Application"
+
+# Capture backend for ESP32-CAM streams: "opencv" (cv2.VideoCapture/FFmpeg)
+# or "mjpeg" (built-in multipart reader over a persistent HTTP connection)
+CAMERA_BACKEND = "opencv"
+
+# Reconnect a camera that has not delivered a frame for this many seconds
+STALL_TIMEOUT = 5.0
+
+# Multi-camera views read every stream on one asyncio event loop, decoding on
+# DECODE_WORKERS threads, instead of running one capture thread per camera
+ASYNC_CAPTURE = True
+DECODE_WORKERS = 2
+
+# Run the detector every N frames and track boxes in between (1 = every frame)
+DETECT_INTERVAL = 1
+
+# Adaptive quality: when the single-camera pipeline falls behind the target
+# FPS, lower the model input size through ADAPTIVE_SIZES, then detect only
+# every 2..ADAPTIVE_MAX_INTERVAL frames; raise them again when there is
+# headroom. ADAPTIVE_CAMERA_CONTROL also sets the ESP32 sensor framesize
+# to match through its /control endpoint
+ADAPTIVE_QUALITY = True
+ADAPTIVE_SIZES = (640, 480, 320)
+ADAPTIVE_MAX_INTERVAL = 4
+ADAPTIVE_CAMERA_CONTROL = False
+
+# Sliced inference for small objects in high-resolution frames: run the
+# model on overlapping TILE_SIZE tiles (plus the whole frame) and merge
+TILED_INFERENCE = False
+TILE_SIZE = 640
+TILE_OVERLAP = 0.2
+
+# Motion gating: skip the model on static frames and reuse the last results.
+# MOTION_THRESHOLD is the fraction of changed pixels needed to run inference;
+# MOTION_CROP runs the model on the changed region only
+MOTION_GATING = False
+MOTION_THRESHOLD = 0.002
+MOTION_CROP = False
+
+# Pre-event clip recording (RECORDING turns it on for the GUI and is the CLI
+# default): keep the last RECORD_PRE_SECONDS of JPEG frames per camera (capped
+# at RECORD_BUFFER_BYTES) and, when one of RECORD_CLASSES is detected (empty =
+# any class), save them plus the next RECORD_POST_SECONDS to RECORD_DIR
+RECORDING = False
+RECORD_DIR = os.path.join(APP_DIR, "recordings")
+RECORD_PRE_SECONDS = 5.0
+RECORD_POST_SECONDS = 5.0
+RECORD_BUFFER_BYTES = 16 * 1024 * 1024
+RECORD_CLASSES = ()
+
+# Detection event log (SQLite); rows are written in batches of EVENT_BATCH_SIZE
+# and frames beyond EVENT_MAX_PENDING waiting for the writer are dropped
+EVENT_LOGGING = False
+EVENT_DB = os.path.join(APP_DIR, "events.db")
+EVENT_BATCH_SIZE = 1000
+EVENT_MAX_PENDING = 10000
+
+# Re-publish the annotated video over HTTP (MJPEG on /stream, JSON on
+# /detections) so any number of viewers can watch without loading the camera
+STREAM_SERVER = False
+STREAM_HOST = "0.0.0.0"
+STREAM_PORT = 8081
+STREAM_QUALITY = 80
+
+# Default confidence threshold for headless runs
+CONF_THRESHOLD = 0.5
+
+# Inference backend: "ultralytics" (PyTorch), "onnxruntime" or "openvino".
+# The ONNX-based backends export MODEL_PATH once and reuse the cached .onnx
+INFERENCE_BACKEND = "ultralytics"
+
+# Multi-camera inference in INFERENCE_WORKERS separate processes (0 = in the
+# GUI process), each limited to THREADS_PER_WORKER threads
+INFERENCE_WORKERS = 0
+THREADS_PER_WORKER = 1
+# Seconds allowed for every worker to load its model before the pool is abandoned
+INFERENCE_POOL_TIMEOUT = 120.0
+
+# Models switched away from in the GUI stay loaded and warmed up, least
+# recently used first out, while their weights fit in MODEL_CACHE_BYTES
+MODEL_CACHE_BYTES = 1024 * 1024 * 1024
+MODEL_CACHE_MODELS = 4
+
+# Entries of the ControlPanel model dropdown: label -> ObjectDetector arguments
+MODEL_CHOICES = {
+    "YOLOv8 (PyTorch)": {"model_path": MODEL_PATH, "backend": "ultralytics"},
+    "YOLOv8 (ONNX Runtime CPU)": {"model_path": MODEL_PATH, "backend": "onnxruntime"},
+    "YOLOv8 (OpenVINO CPU)": {"model_path": MODEL_PATH, "backend": "openvino"},
+    # Quantized variants, produced by python -m benchmarks.quantization_report
+    "YOLOv8 INT8 (ONNX Runtime CPU)": {
+        "model_path": MODEL_PATH, "backend": "onnxruntime", "variant": "int8"
+    },
+    "YOLOv8 FP16 (ONNX Runtime CPU)": {
+        "model_path": MODEL_PATH, "backend": "onnxruntime", "variant": "fp16"
+    },
+}
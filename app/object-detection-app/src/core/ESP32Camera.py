@@ -1,48 +1,81 @@
 import cv2
+import time
 import logging
-import requests
 import threading
 import numpy as np
 from typing import Optional, Tuple
+from src.config.settings import CAMERA_BACKEND
+from src.core.mjpeg import MJPEGStream
+from src.utils.image_processing import decode_jpeg
+from src.utils.metrics import metrics
 
 
 class ESP32Camera:
-    def __init__(self):
+    def __init__(
+        self,
+        backend: str = CAMERA_BACKEND,
+        decode_size: Optional[Tuple[int, int]] = None
+    ):
+        if backend not in ("opencv", "mjpeg"):
+            raise ValueError(f"Unknown camera backend: {backend}")
+        self.backend = backend
         self.stream = None
         self.is_connected = False
         self.running = False
         self.current_frame = None
+        # With the mjpeg backend frames are kept as JPEG bytes and only decoded
+        # when a consumer asks for them, at the smallest scale covering decode_size
+        self.current_jpeg = None
+        self.decode_size = decode_size
+        self.frame_id = 0
+        # Address of the last successful connect, for control requests
+        self.address = None
+        # Last frame id handed to a consumer; frames overwritten before that are drops
+        self.delivered_id = 0
+        # Optional ClipRecorder fed with every received frame as JPEG bytes
+        self.recorder = None
+        # Sleep after a failed read, doubling per consecutive failure up to the max
+        self.retry_interval = 0.01
+        self.max_retry_interval = 1.0
         self.lock = threading.Lock()
+        self.frame_ready = threading.Condition(self.lock)
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO)
 
     def connect(self, ip_address: str) -> bool:
         try:
-            # Don’t strip http:// if user gives full URL
-            if ip_address.startswith("http"):
-                base_url = ip_address.rstrip("/")
-            else:
-                base_url = f"http://{ip_address}"
+            base_url = self.base_url(ip_address)
 
             # Some sketches serve on / or /stream, not always :81
             test_url = f"{base_url}/"
             stream_url = f"{base_url}/stream"
 
+            # Imported here: requests costs more startup time than the rest of this module
+            import requests
+
             self.logger.info(f"Testing connection to {test_url}")
             response = requests.get(test_url, timeout=5)
 
             if response.status_code != 200:
                 raise Exception("ESP32-CAM not responding")
 
-            self.logger.info(f"Opening video stream from {stream_url}")
-            self.stream = cv2.VideoCapture(stream_url)
+            self.logger.info(f"Opening {self.backend} video stream from {stream_url}")
+            if self.backend == "mjpeg":
+                stream = MJPEGStream(stream_url)
+            else:
+                stream = cv2.VideoCapture(stream_url)
 
-            if not self.stream.isOpened():
+            if not stream.isOpened():
+                stream.release()
                 raise Exception("Could not open video stream")
 
+            # A capture thread only runs while its stream is the current one,
+            # so a reconnect retires the previous thread without joining it
+            self.stream = stream
+            self.address = ip_address
             self.is_connected = True
             self.running = True
-            threading.Thread(target=self._capture_loop, daemon=True).start()
+            threading.Thread(target=self._capture_loop, args=(stream,), daemon=True).start()
             self.logger.info(f"Connected to ESP32-CAM at {base_url}")
             return True
 
@@ -50,28 +83,242 @@ class ESP32Camera:
             self.logger.error(f"Connection failed: {e}")
             return False
 
+    @staticmethod
+    def base_url(ip_address: str) -> str:
+        # Don’t strip http:// if user gives full URL
+        if ip_address.startswith("http"):
+            return ip_address.rstrip("/")
+        return f"http://{ip_address}"
+
+    def set_control(self, var: str, value: int) -> bool:
+        """
+        Change a sensor setting through the CameraWebServer ``/control`` endpoint,
+        e.g. ``set_control("framesize", 5)`` for QVGA or ``("quality", 12)``.
+        """
+        if self.address is None:
+            return False
+        import requests
+
+        try:
+            response = requests.get(
+                f"{self.base_url(self.address)}/control",
+                params={"var": var, "val": value},
+                timeout=2
+            )
+        except requests.RequestException as e:
+            self.logger.warning(f"Camera control {var}={value} failed: {e}")
+            return False
+        if response.status_code != 200:
+            self.logger.warning(f"Camera control {var}={value} rejected ({response.status_code})")
+            return False
+        self.logger.info(f"Camera {var} set to {value}")
+        return True
+
+    def reconnect(self, ip_address: str) -> bool:
+        """
+        Open a fresh stream without clearing the last frame or waking consumers.
+
+        The old capture thread is abandoned rather than joined. An MJPEG
+        stream is released here, which unblocks a stalled read; a
+        ``cv2.VideoCapture`` cannot be released under a running read, so its
+        thread releases it once the read returns.
+        """
+        stream, self.stream = self.stream, None
+        self.is_connected = False
+        if isinstance(stream, MJPEGStream):
+            stream.release()
+        return self.connect(ip_address)
+
     def disconnect(self) -> None:
         self.running = False
-        if self.stream:
-            self.stream.release()
+        stream, self.stream = self.stream, None
+        if stream:
+            stream.release()
         self.is_connected = False
-        self.current_frame = None
+        with self.lock:
+            self.current_frame = None
+            self.current_jpeg = None
+            self.frame_ready.notify_all()
         self.logger.info("Disconnected from ESP32-CAM")
 
-    def get_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+    def attach_recorder(self, recorder) -> None:
+        """
+        Feed every received frame to a ClipRecorder (None detaches it).
+
+        With the mjpeg backend the camera's own JPEG bytes are buffered as-is;
+        the opencv backend has to re-encode each decoded frame.
+        """
+        self.recorder = recorder
+
+    def set_decode_size(self, size: Optional[Tuple[int, int]]) -> None:
+        """Set the smallest (width, height) consumers need; None decodes at full size."""
+        self.decode_size = size
+
+    def get_frame(self, copy: bool = True) -> Tuple[bool, Optional[np.ndarray]]:
         with self.lock:
-            if self.current_frame is None:
+            if not self._has_frame():
                 return False, None
-            return True, self.current_frame.copy()
+            frame_id, frame, jpeg = self.frame_id, self.current_frame, self.current_jpeg
+            self.delivered_id = frame_id
+        if frame is None:
+            frame = self._decode(frame_id, jpeg)
+            if frame is None:
+                return False, None
+        return True, frame.copy() if copy else frame
+
+    def get_frame_if_newer(self, last_id: int) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Return the latest frame only if it is newer than ``last_id``.
+
+        The capture loop never writes into a frame after publishing it, so the
+        returned array is handed over without a copy. Consumers that share a
+        camera and draw in place should use ``get_frame()`` instead.
+
+        Returns:
+            (frame_id, frame), or (last_id, None) if nothing new has arrived.
+        """
+        with self.lock:
+            if not self._has_frame() or self.frame_id <= last_id:
+                return last_id, None
+            frame_id, frame, jpeg = self.frame_id, self.current_frame, self.current_jpeg
+            self.delivered_id = frame_id
+        return self._resolve(last_id, frame_id, frame, jpeg)
+
+    def get_jpeg_if_newer(self, last_id: int) -> Tuple[int, Optional[bytes]]:
+        """
+        Return the raw JPEG bytes of the latest frame if it is newer than ``last_id``.
+
+        Only available with the mjpeg backend; lets consumers decode at their
+        own size, e.g. through ``preprocess_frame``.
+        """
+        with self.lock:
+            if self.current_jpeg is None or self.frame_id <= last_id:
+                return last_id, None
+            self.delivered_id = self.frame_id
+            return self.frame_id, self.current_jpeg
+
+    def wait_for_frame(
+        self, last_id: int = 0, timeout: Optional[float] = None
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        """
+        Block until a frame newer than ``last_id`` is available.
+
+        Returns:
+            (frame_id, frame), or (last_id, None) on timeout or disconnect.
+        """
+        with self.frame_ready:
+            self.frame_ready.wait_for(
+                lambda: not self.running
+                or (self._has_frame() and self.frame_id > last_id),
+                timeout
+            )
+            if not self._has_frame() or self.frame_id <= last_id:
+                return last_id, None
+            frame_id, frame, jpeg = self.frame_id, self.current_frame, self.current_jpeg
+            self.delivered_id = frame_id
+        return self._resolve(last_id, frame_id, frame, jpeg)
+
+    def _has_frame(self) -> bool:
+        return self.current_frame is not None or self.current_jpeg is not None
+
+    def _resolve(
+        self, last_id: int, frame_id: int, frame: Optional[np.ndarray], jpeg: Optional[bytes]
+    ) -> Tuple[int, Optional[np.ndarray]]:
+        if frame is None:
+            frame = self._decode(frame_id, jpeg)
+            if frame is None:
+                return last_id, None
+        return frame_id, frame
+
+    def _decode(self, frame_id: int, jpeg: bytes) -> Optional[np.ndarray]:
+        # Decode outside the lock so capture is never blocked, then cache the
+        # result if no newer frame has been published in the meantime
+        with metrics.time("decode"):
+            frame = decode_jpeg(jpeg, self.decode_size)
+        if frame is None:
+            self.logger.warning(f"Could not decode frame {frame_id}")
+            return None
+        with self.lock:
+            if self.frame_id == frame_id and self.current_frame is None:
+                self.current_frame = frame
+        return frame
+
+    def _publish(self, frame: Optional[np.ndarray], jpeg: Optional[bytes], stream=None) -> bool:
+        """
+        Make a received frame (decoded, JPEG bytes, or both) the latest one.
+
+        Returns False, publishing nothing, if ``stream`` has been replaced by a
+        reconnect since the frame was read.
+        """
+        with self.lock:
+            if stream is not None and self.stream is not stream:
+                return False
+            metrics.count("frames_received")
+            if self._has_frame() and self.delivered_id < self.frame_id:
+                metrics.count("dropped_frames")
+            self.current_frame = frame
+            self.current_jpeg = jpeg
+            self.frame_id += 1
+            self.frame_ready.notify_all()
+        if self.recorder is not None:
+            self._record(jpeg, frame)
+        return True
+
+    def _stream_lost(self, stream) -> None:
+        """
+        Stop capturing after a read error but keep the last frame.
+
+        Consumers go on showing it while a StreamSupervisor reconnects;
+        waiters are woken so they can see that ``running`` is False.
+        """
+        with self.lock:
+            if self.stream is not stream:
+                return
+            self.running = False
+            self.stream = None
+            self.is_connected = False
+            self.frame_ready.notify_all()
+        stream.release()
+
+    def _record(self, jpeg: Optional[bytes], frame: Optional[np.ndarray]) -> None:
+        if jpeg is None:
+            with metrics.time("record_encode"):
+                ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            if not ok:
+                return
+            jpeg = encoded.tobytes()
+        self.recorder.add_frame(jpeg)
 
-    def _capture_loop(self) -> None:
-        while self.running:
+    def _capture_loop(self, stream) -> None:
+        failures = 0
+        while self.running and self.stream is stream:
             try:
-                ret, frame = self.stream.read()
+                with metrics.time("receive"):
+                    if self.backend == "mjpeg":
+                        # Publish undecoded bytes; frames nobody reads are never decoded
+                        jpeg = stream.read_jpeg()
+                        ret, frame = jpeg is not None, None
+                    else:
+                        jpeg = None
+                        ret, frame = stream.read()
                 if ret:
-                    with self.lock:
-                        self.current_frame = frame
+                    failures = 0
+                    if not self._publish(frame, jpeg, stream):
+                        break
+                    continue
+                if self.stream is not stream:
+                    break
+                if not stream.isOpened():
+                    raise ConnectionError("stream closed")
+                # Back off instead of spinning on a stream that returns no frames
+                failures += 1
+                metrics.count("read_failures")
+                time.sleep(min(self.retry_interval * 2 ** min(failures, 10), self.max_retry_interval))
             except Exception as e:
+                if not self.running or self.stream is not stream:
+                    break
                 self.logger.error(f"Frame capture error: {e}")
-                self.disconnect()
-                break
\ No newline at end of file
+                self._stream_lost(stream)
+                break
+        if self.stream is not stream:
+            stream.release()
\ No newline at end of file
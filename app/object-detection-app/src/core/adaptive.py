@@ -0,0 +1,160 @@
+"""
+Closed-loop quality control for a detection pipeline.
+
+``AdaptiveController`` is fed the time each frame spends in the pipeline
+(detection, tracking and drawing) and compares its moving average with the
+budget implied by the target frame rate. When the pipeline falls behind it
+steps down a quality ladder: first a smaller model input size, then running
+the detector on fewer frames and tracking in between. It steps back up when
+the estimated cost of the next better step fits comfortably in the budget.
+Steps are at least ``cooldown`` seconds apart and the average restarts after
+each one, so the controller does not oscillate on transient spikes.
+
+Optionally the camera follows the input size: ``camera_control`` is called
+with the new size on a background thread, e.g. to switch the ESP32 sensor
+framesize through its ``/control`` endpoint.
+"""
+import time
+import logging
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# ESP32 camera framesize values (esp_camera.h) for common inference sizes
+ESP32_FRAMESIZES = {
+    240: 4,    # 240x240
+    320: 5,    # QVGA 320x240
+    400: 6,    # CIF 400x296
+    480: 7,    # HVGA 480x320
+    640: 8,    # VGA 640x480
+    800: 9,    # SVGA 800x600
+    1024: 10,  # XGA 1024x768
+}
+
+
+def esp32_framesize(size: int) -> int:
+    """Smallest ESP32 framesize at least ``size`` pixels wide (the largest if none is)."""
+    widths = sorted(ESP32_FRAMESIZES)
+    return ESP32_FRAMESIZES[next((w for w in widths if w >= size), widths[-1])]
+
+
+def quality_ladder(sizes: Sequence[int], max_interval: int) -> List[Tuple[int, int]]:
+    """(input size, detect interval) steps from best quality to cheapest."""
+    sizes = sorted(set(sizes), reverse=True)
+    return [(size, 1) for size in sizes] + [
+        (sizes[-1], interval) for interval in range(2, max_interval + 1)
+    ]
+
+
+class AdaptiveController:
+    """
+    Trades input size and detection rate for frame rate.
+
+    Args:
+        detector (ObjectDetector): Detector whose input size is adjusted; may be
+            set later with ``set_detector`` while the model is still loading
+        tracking_detector (TrackingDetector): Optional; its detect interval is adjusted
+        target_fps (float): Frame rate the pipeline should sustain
+        sizes (sequence): Input sizes to step through, largest first
+        max_interval (int): Largest detect interval (needs tracking_detector)
+        smoothing (float): Weight of the newest frame in the moving average (0-1)
+        headroom (float): Fraction of the budget the next better step may use
+        cooldown (float): Minimum seconds between steps
+        camera_control (callable): Optional, called with the new input size
+    """
+
+    def __init__(
+        self,
+        detector,
+        tracking_detector=None,
+        target_fps: float = 30.0,
+        sizes: Sequence[int] = (640, 480, 320),
+        max_interval: int = 4,
+        smoothing: float = 0.1,
+        headroom: float = 0.8,
+        cooldown: float = 2.0,
+        camera_control: Optional[Callable[[int], object]] = None
+    ):
+        self.detector = detector
+        self.tracking_detector = tracking_detector
+        self.ladder = quality_ladder(sizes, max_interval if tracking_detector is not None else 1)
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.camera_control = camera_control
+        # Detect interval chosen by the user; the controller never goes below it
+        self.min_interval = tracking_detector.detect_interval if tracking_detector is not None else 1
+        self.set_target_fps(target_fps)
+        self.level = 0
+        self.average = None
+        self.changed_at = time.monotonic()
+        self._apply(self.level)
+
+    @property
+    def size(self) -> int:
+        return self.ladder[self.level][0]
+
+    @property
+    def interval(self) -> int:
+        return max(self.ladder[self.level][1], self.min_interval)
+
+    def set_detector(self, detector) -> None:
+        self.detector = detector
+        if detector is not None:
+            detector.set_input_size(self.size)
+
+    def set_target_fps(self, fps: float) -> None:
+        self.target_fps = max(float(fps), 1e-3)
+        self.budget = 1.0 / self.target_fps
+
+    def set_min_interval(self, interval: int) -> None:
+        self.min_interval = max(1, int(interval))
+        if self.tracking_detector is not None:
+            self.tracking_detector.set_detect_interval(self.interval)
+
+    def update(self, seconds: float) -> bool:
+        """Record one frame's pipeline time; returns True when the quality level changed."""
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += self.smoothing * (seconds - self.average)
+        if time.monotonic() - self.changed_at < self.cooldown:
+            return False
+
+        if self.average > self.budget and self.level < len(self.ladder) - 1:
+            level = self.level + 1
+        elif self.level > 0 and self._estimate(self.level - 1) < self.budget * self.headroom:
+            level = self.level - 1
+        else:
+            return False
+        fps = 1.0 / self.average
+        self._apply(level)
+        logger.info(
+            f"Pipeline at {fps:.1f} fps for a {self.target_fps:g} fps target: "
+            f"input {self.size}, detecting every {self.interval} frames"
+        )
+        return True
+
+    def _estimate(self, level: int) -> float:
+        """Frame time expected at ``level``: inference scales with input area and detect rate."""
+        size, interval = self.ladder[level]
+        current_size, current_interval = self.ladder[self.level]
+        return self.average * (size / current_size) ** 2 * current_interval / interval
+
+    def _apply(self, level: int) -> None:
+        previous_size = self.size
+        self.level = level
+        self.average = None
+        self.changed_at = time.monotonic()
+        if self.detector is not None:
+            self.detector.set_input_size(self.size)
+        if self.tracking_detector is not None:
+            self.tracking_detector.set_detect_interval(self.interval)
+        metrics.gauge("adaptive_input_size", self.size)
+        metrics.gauge("adaptive_detect_interval", self.interval)
+        if self.camera_control is not None and self.size != previous_size:
+            # An HTTP round trip to the camera must not stall the pipeline
+            threading.Thread(target=self.camera_control, args=(self.size,), daemon=True).start()
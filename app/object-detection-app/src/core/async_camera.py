@@ -0,0 +1,219 @@
+"""
+Asyncio capture backend for many ESP32-CAM streams on one thread.
+
+``AsyncCameraHub`` runs a single event loop in a background thread and reads
+every camera's ``/stream`` over a raw asyncio connection, framing JPEGs with
+the same ``MJPEGParser`` as the threaded ``mjpeg`` backend. Decoding is handed
+to a bounded thread pool with at most one decode in flight per camera; frames
+that arrive meanwhile replace each other, so a slow consumer or a busy pool
+costs dropped frames rather than memory. Dropped connections and stalls are
+retried with exponential backoff.
+
+Each stream is exposed as an ``AsyncCamera``, which keeps ``ESP32Camera``'s
+frame contract (``get_frame``, ``get_frame_if_newer``, ``wait_for_frame``) so
+it can be used anywhere an ``ESP32Camera`` is.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from src.core.ESP32Camera import ESP32Camera
+from src.core.mjpeg import ChunkedDecoder, MJPEGParser, parse_boundary
+from src.utils.image_processing import decode_jpeg
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _timed_decode(jpeg: bytes, decode_size) -> Optional[np.ndarray]:
+    with metrics.time("decode"):
+        return decode_jpeg(jpeg, decode_size)
+
+
+class AsyncCamera(ESP32Camera):
+    """
+    One stream of an AsyncCameraHub with the ``ESP32Camera`` frame API.
+
+    ``connect`` only schedules the stream on the hub and returns immediately;
+    ``is_connected`` turns true once the HTTP response has been received and
+    back to false while the hub is reconnecting.
+    """
+
+    def __init__(self, hub: "AsyncCameraHub", decode_size: Optional[Tuple[int, int]] = None):
+        super().__init__(backend="mjpeg", decode_size=decode_size)
+        self.hub = hub
+        self.url = None
+        # Decode backpressure, only touched on the hub's event loop
+        self.decoding = False
+        self.pending_jpeg = None
+
+    def connect(self, ip_address: str) -> bool:
+        self.url = f"{self.base_url(ip_address)}/stream"
+        self.running = True
+        self.hub.attach(self)
+        return True
+
+    def disconnect(self) -> None:
+        self.running = False
+        self.hub.detach(self)
+        super().disconnect()
+
+
+class AsyncCameraHub:
+    """
+    Event loop thread plus decode pool shared by many AsyncCameras.
+
+    Args:
+        decode_workers (int): Threads in the JPEG decode pool
+        timeout (float): Seconds without data before a stream is considered stalled
+        chunk_size (int): Bytes requested per socket read
+        initial_backoff (float): First reconnect delay in seconds, doubled per failure
+        max_backoff (float): Upper bound for the reconnect delay
+    """
+
+    def __init__(
+        self,
+        decode_workers: int = 2,
+        timeout: float = 5.0,
+        chunk_size: int = 16 * 1024,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0
+    ):
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.executor = ThreadPoolExecutor(decode_workers, thread_name_prefix="jpeg-decode")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.tasks: Dict[AsyncCamera, "asyncio.Future"] = {}
+        self.lock = threading.Lock()
+
+    def camera(self, decode_size: Optional[Tuple[int, int]] = None) -> AsyncCamera:
+        """Create an unconnected camera served by this hub."""
+        return AsyncCamera(self, decode_size)
+
+    def open(self, address: str, decode_size: Optional[Tuple[int, int]] = None) -> AsyncCamera:
+        camera = self.camera(decode_size)
+        camera.connect(address)
+        return camera
+
+    def attach(self, camera: AsyncCamera) -> None:
+        future = asyncio.run_coroutine_threadsafe(self._stream(camera), self.loop)
+        with self.lock:
+            self.tasks[camera] = future
+
+    def detach(self, camera: AsyncCamera) -> None:
+        with self.lock:
+            future = self.tasks.pop(camera, None)
+        if future is not None:
+            future.cancel()
+
+    def stop(self) -> None:
+        with self.lock:
+            cameras = list(self.tasks)
+        for camera in cameras:
+            camera.disconnect()
+        try:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self.loop).result(timeout=2)
+        except Exception as e:
+            logger.warning(f"Streams did not shut down cleanly: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2)
+        if not self.thread.is_alive():
+            self.loop.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _cancel_all(self) -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _stream(self, camera: AsyncCamera) -> None:
+        parts = urlsplit(camera.url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        backoff = self.initial_backoff
+        while camera.running:
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(parts.hostname, parts.port or 80), self.timeout
+                )
+                parser, dechunk = await self._handshake(reader, writer, parts.hostname, path)
+                camera.is_connected = True
+                logger.info(f"Streaming {camera.url}")
+                while camera.running:
+                    data = await asyncio.wait_for(reader.read(self.chunk_size), self.timeout)
+                    if not data:
+                        raise ConnectionError("stream closed")
+                    if dechunk is not None:
+                        data = dechunk.feed(data)
+                        if dechunk.finished:
+                            raise ConnectionError("stream closed")
+                    jpegs = parser.feed(data)
+                    if jpegs:
+                        backoff = self.initial_backoff
+                        # Only the newest complete frame matters
+                        self._submit(camera, jpegs[-1])
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError, ValueError) as e:
+                camera.is_connected = False
+                if not camera.running:
+                    break
+                metrics.count("reconnects")
+                logger.warning(f"Stream {camera.url} failed ({e or type(e).__name__}); "
+                               f"retrying in {backoff:.1f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+    async def _handshake(self, reader, writer, host: str, path: str):
+        """Send the request and read the response head; returns the parser and an optional dechunker."""
+        # HTTP/1.0 asks for a plain body, but esp_http_server streams chunked regardless
+        writer.write(f"GET {path} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.timeout)
+        lines = head.decode("latin-1").split("\r\n")
+        status = lines[0].split(" ", 2)
+        if len(status) < 2 or status[1] != "200":
+            raise ConnectionError(f"unexpected response {lines[0]!r}")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        parser = MJPEGParser(parse_boundary(headers.get("content-type", "")))
+        chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        return parser, ChunkedDecoder() if chunked else None
+
+    def _submit(self, camera: AsyncCamera, jpeg: bytes) -> None:
+        if camera.decoding:
+            if camera.pending_jpeg is not None:
+                metrics.count("dropped_frames")
+            camera.pending_jpeg = jpeg
+            return
+        camera.decoding = True
+        future = self.loop.run_in_executor(self.executor, _timed_decode, jpeg, camera.decode_size)
+        future.add_done_callback(lambda f: self._decoded(camera, jpeg, f))
+
+    def _decoded(self, camera: AsyncCamera, jpeg: bytes, future: "asyncio.Future") -> None:
+        camera.decoding = False
+        if future.cancelled() or not camera.running:
+            return
+        if future.exception() is not None:
+            logger.warning(f"Decode failed for {camera.url}: {future.exception()}")
+        elif future.result() is not None:
+            camera._publish(future.result(), jpeg)
+        if camera.pending_jpeg is not None:
+            jpeg, camera.pending_jpeg = camera.pending_jpeg, None
+            self._submit(camera, jpeg)
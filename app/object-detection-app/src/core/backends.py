@@ -0,0 +1,316 @@
+"""
+Pluggable inference backends for ObjectDetector.
+
+Every backend turns a list of BGR frames into one Detections per frame.
+Heavy runtimes (torch, ultralytics, onnxruntime, openvino) are imported only
+when the corresponding backend is created, and the exported backends load a
+cached ``.onnx`` file so later startups never import torch.
+"""
+import os
+import ast
+import json
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.core.detections import Detections
+from src.utils.boxes import batched_nms, xywh_to_xyxy
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Precision variants of the ONNX export; produced by src/core/quantization.py
+VARIANTS = ("fp32", "fp16", "int8")
+
+
+def onnx_cache_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".onnx"
+
+
+def variant_path(onnx_path: str, variant: str = "fp32") -> str:
+    """Path of a precision variant next to the base export, e.g. best.int8.onnx."""
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown model variant: {variant} (expected one of {VARIANTS})")
+    if variant == "fp32":
+        return onnx_path
+    return os.path.splitext(onnx_path)[0] + f".{variant}.onnx"
+
+
+def export_onnx(model_path: str, imgsz: int = 640) -> str:
+    """
+    Return a cached ONNX export of ``model_path``, exporting it on first use.
+
+    The export is redone only when the weights are newer than the cache. Class
+    names and input size are stored in a JSON sidecar so loading the cached
+    model needs neither torch nor ultralytics.
+    """
+    if model_path.endswith(".onnx"):
+        return model_path
+    onnx_path = onnx_cache_path(model_path)
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(model_path):
+        return onnx_path
+
+    from ultralytics import YOLO
+
+    logger.info(f"Exporting {model_path} to ONNX (first use, cached afterwards)")
+    model = YOLO(model_path)
+    exported = model.export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    with open(onnx_path + ".json", "w") as f:
+        json.dump({"names": {int(k): v for k, v in model.names.items()}, "imgsz": imgsz}, f)
+    return onnx_path
+
+
+def load_onnx_metadata(onnx_path: str) -> Dict:
+    """Read class names and input size from the export sidecar, if present."""
+    sidecar = onnx_path + ".json"
+    if not os.path.exists(sidecar):
+        return {}
+    with open(sidecar) as f:
+        meta = json.load(f)
+    meta["names"] = {int(k): v for k, v in meta.get("names", {}).items()}
+    return meta
+
+
+def letterbox(
+    frame: np.ndarray, size: int, color: Tuple[int, int, int] = (114, 114, 114)
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize keeping aspect ratio and pad to a ``size`` x ``size`` square.
+
+    Returns:
+        (image, scale, (pad_x, pad_y)) so boxes can be mapped back with
+        ``(box - pad) / scale``.
+    """
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = round(w * scale), round(h * scale)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    out = np.full((size, size, 3), color, dtype=np.uint8)
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+        frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    return out, scale, (pad_x, pad_y)
+
+
+class InferenceBackend:
+    """Base class: ``predict`` maps BGR frames to one Detections each."""
+
+    name = "base"
+
+    def __init__(self, model_path: str, imgsz: int = 640):
+        self.model_path = model_path
+        self.imgsz = imgsz
+        self.names: Dict[int, str] = {}
+        self.model = None
+        # Whether predict accepts an input size other than imgsz
+        self.dynamic_size = False
+
+    def predict(
+        self, frames: Sequence[np.ndarray], conf_threshold: float = 0.5, imgsz: Optional[int] = None
+    ) -> List[Detections]:
+        """``imgsz`` overrides the input size for this call when ``dynamic_size`` is set."""
+        raise NotImplementedError
+
+    def warmup(self, width: int, height: int, runs: int = 2) -> None:
+        dummy = np.zeros((height, width, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.predict([dummy])
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the model: the size of its weights file."""
+        path = getattr(self, "onnx_path", self.model_path)
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class UltralyticsBackend(InferenceBackend):
+    """PyTorch inference through Ultralytics YOLO (GPU when available)."""
+
+    name = "ultralytics"
+
+    def __init__(self, model_path: str, imgsz: int = 640, variant: str = "fp32", device: str = None):
+        super().__init__(model_path, imgsz)
+        if variant != "fp32":
+            raise ValueError("Precision variants require the onnxruntime or openvino backend")
+        import torch
+        from ultralytics import YOLO
+
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = YOLO(model_path).to(self.device)
+        self.names = self.model.names
+        self.dynamic_size = True
+
+    def predict(self, frames, conf_threshold=0.5, imgsz=None):
+        if not len(frames):
+            return []
+        results = self.model(
+            list(frames), verbose=False, conf=conf_threshold, imgsz=imgsz or self.imgsz
+        )
+        # Ultralytics already times its own stages (ms per image)
+        for stage, ms in results[0].speed.items():
+            if ms is not None:
+                metrics.record(stage, ms / 1000.0)
+        return [self._to_detections(result, conf_threshold) for result in results]
+
+    def _to_detections(self, result, conf_threshold):
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return Detections.empty(self.names)
+        # One device-to-host transfer per array instead of per-box tensor access
+        data = boxes.data.cpu().numpy()
+        detections = Detections(
+            data[:, :4].astype(np.float32),
+            data[:, 4].astype(np.float32),
+            data[:, 5].astype(np.int32),
+            self.names
+        )
+        return detections.above(conf_threshold)
+
+    def memory_bytes(self):
+        module = self.model.model
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ExportedYOLOBackend(InferenceBackend):
+    """Shared letterbox pre-processing and YOLOv8 head decoding for exported models."""
+
+    def __init__(
+        self,
+        model_path: str,
+        imgsz: int = 640,
+        variant: str = "fp32",
+        iou_threshold: float = 0.45,
+        max_det: int = 300
+    ):
+        super().__init__(model_path, imgsz)
+        self.iou_threshold = iou_threshold
+        self.max_det = max_det
+        base_path = export_onnx(model_path, imgsz)
+        self.variant = variant
+        self.onnx_path = variant_path(base_path, variant)
+        if not os.path.exists(self.onnx_path):
+            raise FileNotFoundError(
+                f"{self.onnx_path} not found; create it with "
+                f"python -m benchmarks.quantization_report --variants {variant}"
+            )
+        meta = load_onnx_metadata(base_path)
+        self.names = meta.get("names", {})
+        self.imgsz = meta.get("imgsz", imgsz)
+        self.dynamic_batch = True
+
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict(self, frames, conf_threshold=0.5, imgsz=None):
+        if not len(frames):
+            return []
+        size = imgsz if imgsz and self.dynamic_size else self.imgsz
+        with metrics.time("preprocess"):
+            letterboxed = [letterbox(frame, size) for frame in frames]
+            # NCHW float32 RGB in [0, 1] in one call
+            blob = cv2.dnn.blobFromImages([lb[0] for lb in letterboxed], 1 / 255.0, swapRB=True)
+        with metrics.time("inference"):
+            if self.dynamic_batch:
+                outputs = self._infer(blob)
+            else:
+                outputs = np.concatenate([self._infer(blob[i:i + 1]) for i in range(len(frames))])
+
+        with metrics.time("postprocess"):
+            return [
+                self._decode(output, scale, pad, frame.shape, conf_threshold)
+                for output, (_, scale, pad), frame in zip(outputs, letterboxed, frames)
+            ]
+
+    def _decode(self, output, scale, pad, shape, conf_threshold):
+        # YOLOv8 head: (4 + num_classes, anchors); transpose to one row per anchor
+        pred = output.T if output.shape[0] < output.shape[1] else output
+        class_scores = pred[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(pred)), class_ids]
+        mask = scores >= conf_threshold
+        if not mask.any():
+            return Detections.empty(self.names)
+
+        boxes = xywh_to_xyxy(pred[mask, :4])
+        scores, class_ids = scores[mask], class_ids[mask]
+        keep = batched_nms(boxes, scores, class_ids, self.iou_threshold)[:self.max_det]
+        boxes = boxes[keep]
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / scale
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / scale
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, shape[1])
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, shape[0])
+        return Detections(
+            boxes.astype(np.float32),
+            scores[keep].astype(np.float32),
+            class_ids[keep].astype(np.int32),
+            self.names
+        )
+
+
+class OnnxRuntimeBackend(ExportedYOLOBackend):
+    """CPU inference with ONNX Runtime on the cached ONNX export."""
+
+    name = "onnxruntime"
+
+    def __init__(self, model_path: str, imgsz: int = 640, num_threads: int = 0, **kwargs):
+        super().__init__(model_path, imgsz, **kwargs)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.model = ort.InferenceSession(
+            self.onnx_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.model.get_inputs()[0]
+        self.input_name = model_input.name
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.dynamic_size = not isinstance(model_input.shape[2], int)
+        if not self.names:
+            names = self.model.get_modelmeta().custom_metadata_map.get("names")
+            if names:
+                self.names = ast.literal_eval(names)
+
+    def _infer(self, blob):
+        return self.model.run(None, {self.input_name: blob})[0]
+
+
+class OpenVINOBackend(ExportedYOLOBackend):
+    """CPU inference with OpenVINO, compiled from the cached ONNX export."""
+
+    name = "openvino"
+
+    def __init__(self, model_path: str, imgsz: int = 640, num_threads: int = 0, **kwargs):
+        super().__init__(model_path, imgsz, **kwargs)
+        import openvino as ov
+
+        core = ov.Core()
+        config = {"INFERENCE_NUM_THREADS": num_threads} if num_threads else {}
+        self.model = core.compile_model(self.onnx_path, "CPU", config)
+        shape = self.model.input(0).get_partial_shape()
+        self.dynamic_batch = shape[0].is_dynamic
+        self.dynamic_size = shape[2].is_dynamic
+
+    def _infer(self, blob):
+        return self.model(blob)[0]
+
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenVINOBackend.name: OpenVINOBackend,
+}
+
+
+def create_backend(name: str, model_path: str, **kwargs) -> InferenceBackend:
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown inference backend: {name}") from None
+    return backend_class(model_path, **kwargs)
@@ -1,33 +1,60 @@
 import cv2
+import time
 import threading
 
 class CameraStream:
-    def __init__(self, src=0):
-        self.cap = cv2.VideoCapture(src)
-        self.ret, self.frame = self.cap.read()
+    """
+    OpenCV capture for webcams and video files.
+
+    With threaded=True (the default, for live cameras) a background thread
+    keeps only the newest frame; with threaded=False every read() pulls the
+    next frame in order, which is what replaying a recording needs.
+    """
+    def __init__(self, src=0, threaded=True):
+        self.src = src
+        self.threaded = threaded
+        self.cap = None
+        self.ret, self.frame = False, None
         self.lock = threading.Lock()
-        self.running = True
-        threading.Thread(target=self._update, daemon=True).start()
+        self.running = False
+    
+    def open(self):
+        self.cap = cv2.VideoCapture(self.src)
+        if not self.cap.isOpened():
+            return False
+        if self.threaded:
+            self.ret, self.frame = self.cap.read()
+            self.running = True
+            threading.Thread(target=self._update, daemon=True).start()
+        return True
     
     def _update(self):
         while self.running:
             ret, frame = self.cap.read()
             if not ret:
+                # End of file or a camera hiccup; don't spin on the CPU
+                time.sleep(0.01)
                 continue
             with self.lock:
                 self.ret = ret
                 self.frame = frame
     
-    def read(self):
-        with self.lock:
-            if self.frame is None:
-                return None
-            return cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
+    def read(self, rgb=True):
+        if not self.threaded:
+            if self.cap is None:
+                return False, None
+            ret, frame = self.cap.read()
+        else:
+            with self.lock:
+                ret, frame = self.ret, self.frame
+        if not ret or frame is None:
+            return False, None
+        return True, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if rgb else frame
     
     def is_opened(self):
-        return self.cap.isOpened()
+        return self.cap is not None and self.cap.isOpened()
     
     def release(self):
         self.running = False
         if self.cap:
-            self.cap.release()
\ No newline at end of file
+            self.cap.release()
@@ -0,0 +1,173 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.core.ESP32Camera import ESP32Camera
+from src.utils.image_processing import draw_detections
+from src.utils.metrics import metrics
+
+FrameCallback = Callable[[str, np.ndarray], None]
+
+
+class CameraManager:
+    """
+    Registry of ESP32-CAM streams sharing a single batched detector.
+
+    One scheduler thread collects the newest unseen frame from every camera
+    per tick and runs them through the detector as one batch, so the cost of
+    a forward pass is amortised across cameras. Annotated frames are handed
+    to the subscribers of the camera they came from, and cameras with a
+    ClipRecorder attached have it triggered by their detections.
+    """
+
+    def __init__(
+        self,
+        detector,
+        max_batch_size: int = 8,
+        conf_threshold: float = 0.5,
+        idle_interval: float = 0.005
+    ):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.conf_threshold = conf_threshold
+        self.idle_interval = idle_interval
+        self.cameras: Dict[str, ESP32Camera] = {}
+        self.subscribers: Dict[str, List[FrameCallback]] = {}
+        self.last_ids: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        # Held while a batch runs, so a replaced detector is known to be idle
+        self.detector_lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.batches = 0
+        self.frames_processed = 0
+        self._next_index = 0
+        self.logger = logging.getLogger(__name__)
+
+    def add_camera(self, camera_id: str, address: str, camera: Optional[ESP32Camera] = None) -> bool:
+        """Connect a camera and register it under ``camera_id``."""
+        camera = camera or ESP32Camera()
+        if not camera.is_connected and not camera.connect(address):
+            return False
+        with self.lock:
+            self.cameras[camera_id] = camera
+            self.subscribers.setdefault(camera_id, [])
+            self.last_ids[camera_id] = 0
+        self.logger.info(f"Camera {camera_id} added ({address})")
+        return True
+
+    def remove_camera(self, camera_id: str) -> None:
+        with self.lock:
+            camera = self.cameras.pop(camera_id, None)
+            self.subscribers.pop(camera_id, None)
+            self.last_ids.pop(camera_id, None)
+        if camera is not None and camera.is_connected:
+            camera.disconnect()
+
+    def subscribe(self, camera_id: str, callback: FrameCallback) -> None:
+        """Register ``callback(camera_id, frame)`` for annotated frames of one camera."""
+        with self.lock:
+            self.subscribers.setdefault(camera_id, []).append(callback)
+
+    def set_detector(self, detector):
+        """
+        Switch detectors and return the previous one.
+
+        Returns only after any batch running on the previous detector has
+        finished, so the caller may close it.
+        """
+        with self.detector_lock:
+            previous, self.detector = self.detector, detector
+        return previous
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+        for camera_id in list(self.cameras):
+            self.remove_camera(camera_id)
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.frames_processed / self.batches if self.batches else 0.0
+
+    def collect_batch(self):
+        """Take the newest unseen frame from each camera, up to ``max_batch_size``."""
+        with self.lock:
+            items = list(self.cameras.items())
+        if not items:
+            return [], []
+
+        # Rotate the starting camera so no stream starves when batches are capped
+        start = self._next_index % len(items)
+        items = items[start:] + items[:start]
+        self._next_index += 1
+
+        camera_ids, frames = [], []
+        for camera_id, camera in items:
+            frame_id, frame = camera.get_frame_if_newer(self.last_ids.get(camera_id, 0))
+            if frame is None:
+                continue
+            self.last_ids[camera_id] = frame_id
+            camera_ids.append(camera_id)
+            frames.append(frame)
+            if len(frames) >= self.max_batch_size:
+                break
+        return camera_ids, frames
+
+    def _run(self) -> None:
+        while self.running:
+            camera_ids, frames = self.collect_batch()
+            if not frames:
+                time.sleep(self.idle_interval)
+                continue
+
+            with self.lock:
+                recorders = [
+                    getattr(self.cameras.get(camera_id), "recorder", None) for camera_id in camera_ids
+                ]
+            try:
+                with self.detector_lock:
+                    detector = self.detector
+                    if detector is None:
+                        # Model still loading; show the raw frames
+                        results = frames
+                    else:
+                        results = self._detect_and_draw(detector, frames, recorders)
+            except Exception as e:
+                self.logger.error(f"Batch detection error: {e}")
+                time.sleep(self.idle_interval)
+                continue
+            self.batches += 1
+            self.frames_processed += len(frames)
+
+            for camera_id, result in zip(camera_ids, results):
+                with self.lock:
+                    callbacks = list(self.subscribers.get(camera_id, ()))
+                for callback in callbacks:
+                    try:
+                        callback(camera_id, result)
+                    except Exception as e:
+                        self.logger.error(f"Subscriber error for camera {camera_id}: {e}")
+
+    def _detect_and_draw(self, detector, frames, recorders):
+        results = detector.detect_batch(frames, conf_threshold=self.conf_threshold)
+        for recorder, detections in zip(recorders, results):
+            if recorder is not None:
+                recorder.observe(detections)
+        # Camera frames are shared with the recorder and other consumers; draw on copies
+        with metrics.time("draw"):
+            return [
+                draw_detections(frame.copy(), detections) for frame, detections in zip(frames, results)
+            ]
@@ -0,0 +1,67 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class Detections:
+    """
+    Detections for one frame as parallel NumPy arrays.
+
+    Attributes:
+        boxes: (N, 4) float32 array of xyxy pixel coordinates
+        scores: (N,) float32 confidences
+        class_ids: (N,) int32 class indices
+        names: Mapping of class index to class name
+        track_ids: (N,) int64 track ids when produced by a tracker, else None
+    """
+    boxes: np.ndarray
+    scores: np.ndarray
+    class_ids: np.ndarray
+    names: Dict[int, str] = field(default_factory=dict)
+    track_ids: Optional[np.ndarray] = None
+
+    @classmethod
+    def empty(cls, names: Dict[int, str] = None) -> "Detections":
+        return cls(
+            np.zeros((0, 4), dtype=np.float32),
+            np.zeros(0, dtype=np.float32),
+            np.zeros(0, dtype=np.int32),
+            names or {}
+        )
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def filter(self, mask: np.ndarray) -> "Detections":
+        """Return the detections selected by a boolean mask or index array."""
+        track_ids = self.track_ids[mask] if self.track_ids is not None else None
+        return Detections(
+            self.boxes[mask], self.scores[mask], self.class_ids[mask], self.names, track_ids
+        )
+
+    def above(self, conf_threshold: float) -> "Detections":
+        return self.filter(self.scores >= conf_threshold)
+
+    def labels(self) -> List[str]:
+        labels = [self.names.get(int(c), str(int(c))) for c in self.class_ids]
+        if self.track_ids is not None:
+            labels = [f"#{int(t)} {label}" for t, label in zip(self.track_ids, labels)]
+        return labels
+
+    def to_list(self) -> List[dict]:
+        """Convert to JSON-friendly dicts with 'box', 'confidence', 'class_id' and 'name'."""
+        items = [
+            {
+                'box': [int(v) for v in box],
+                'confidence': float(score),
+                'class_id': int(class_id),
+                'name': self.names.get(int(class_id), str(int(class_id))),
+            }
+            for box, score, class_id in zip(self.boxes, self.scores, self.class_ids)
+        ]
+        if self.track_ids is not None:
+            for item, track_id in zip(items, self.track_ids):
+                item['track_id'] = int(track_id)
+        return items
@@ -1,29 +1,174 @@
-import cv2
-from ultralytics import YOLO
-import torch
+import numpy as np
+from src.config.settings import INFERENCE_BACKEND, INFERENCE_SIZE
+from src.core.backends import create_backend
+from src.core.detections import Detections
+from src.core.model_cache import model_key
+from src.utils.boxes import box_iou
+from src.utils.image_processing import draw_detections
+from src.utils.metrics import metrics
 
 class ObjectDetector:
-    def __init__(self, model_path="best.pt"):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = YOLO(model_path).to(self.device)
+    def __init__(self, model_path="best.pt", backend=INFERENCE_BACKEND, imgsz=INFERENCE_SIZE,
+                 variant="fp32", motion_gate=None, crop_to_motion=False, cache=None,
+                 tiler=None, **backend_options):
+        # Optional ModelCache shared between detectors and model switches
+        self.cache = cache
+        self.backend = self.load_model(model_path, backend, imgsz, variant, **backend_options)
+        # Runtime override of the model input size, see set_input_size
+        self.input_size = None
+        self.set_motion_gate(motion_gate, crop_to_motion)
+        self.set_tiling(tiler)
+    
+    @property
+    def model(self):
+        return self.backend.model
+    
+    @property
+    def names(self):
+        return self.backend.names
+    
+    def load_model(self, model_path="best.pt", backend=INFERENCE_BACKEND, imgsz=INFERENCE_SIZE,
+                   variant="fp32", warmup_size=None, warmup_runs=2, **backend_options):
+        """
+        Return a backend for the given model without making it current.
+        
+        With a cache, a recently used model comes back already loaded and
+        warmed up; otherwise it is built (and warmed up at warmup_size, a
+        (width, height) pair, if given) and added to the cache. Safe to call
+        from a loader thread while detection runs on the current model.
+        """
+        key = model_key(backend, model_path, imgsz, variant, **backend_options)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        with metrics.time("model_load"):
+            loaded = create_backend(
+                backend, model_path, imgsz=imgsz, variant=variant, **backend_options
+            )
+            if warmup_size is not None:
+                loaded.warmup(*warmup_size, warmup_runs)
+        if self.cache is not None:
+            self.cache.put(key, loaded)
+        return loaded
+    
+    def set_model(self, backend):
+        """
+        Make backend the current model.
+        
+        A single reference swap: a batch already running finishes on the old
+        model and the next one uses the new one, so no frame waits or is dropped.
+        """
+        self.backend = backend
+        metrics.count("model_switches")
+    
+    def set_input_size(self, size):
+        """
+        Run the model at a different square input size (None = the model's own).
+        
+        Only backends with a dynamic input shape honour it; others keep their
+        export size. Takes effect from the next batch and survives model switches.
+        """
+        self.input_size = size
+    
+    def set_tiling(self, tiler):
+        """Detect on overlapping tiles with a TiledInference (None = whole frames)."""
+        self.tiler = tiler
+    
+    def switch_model(self, model_path="best.pt", backend=INFERENCE_BACKEND, **kwargs):
+        """Load (or fetch from the cache) another model and swap it in. Blocks while loading."""
+        self.set_model(self.load_model(model_path, backend, **kwargs))
+    
+    def warmup(self, width, height, runs=2):
+        """Run a few dummy inferences so lazy initialisation is not paid on the first frame"""
+        with metrics.time("warmup"):
+            self.backend.warmup(width, height, runs)
+    
+    def set_motion_gate(self, motion_gate, crop_to_motion=False):
+        """
+        Only run the model on frames that pass motion_gate (a MotionGate);
+        static frames reuse the previous results. With crop_to_motion the
+        model sees just the changed region when it covers less than half the frame.
+        """
+        self.motion_gate = motion_gate
+        self.crop_to_motion = crop_to_motion
+        self.gated_frames = 0
+        self.skipped_frames = 0
+    
+    def detect(self, frame, conf_threshold=0.5, motion_gate=None):
+        """
+        Run the model and return Detections without touching the frame.
+        
+        motion_gate overrides the detector's own gate, so callers that feed
+        several streams through one detector can keep one gate per stream.
+        """
+        gate = motion_gate or self.motion_gate
+        if gate is None:
+            return self.detect_batch([frame], conf_threshold)[0]
+        
+        self.gated_frames += 1
+        moving = gate.update(frame)
+        # Results carry their model's names dict, so after a model switch the
+        # reused results are recognised as stale and the new model runs
+        previous = gate.last_result
+        if previous is not None and previous.names is not self.names:
+            previous = gate.last_result = None
+        if not moving and previous is not None:
+            self.skipped_frames += 1
+            metrics.count("motion_skipped_frames")
+            return gate.last_result
+        
+        roi = gate.roi_union() if self.crop_to_motion else None
+        if roi is not None and previous is not None:
+            detections = self._detect_roi(frame, roi, conf_threshold, previous)
+        else:
+            detections = self.detect_batch([frame], conf_threshold)[0]
+        gate.last_result = detections
+        return detections
+    
+    def detect_batch(self, frames, conf_threshold=0.5):
+        """Run one forward pass over several frames and return Detections per frame"""
+        backend, tiler = self.backend, self.tiler
+        if tiler is not None:
+            results = tiler.predict(backend.predict, frames, conf_threshold, self.input_size)
+        else:
+            results = backend.predict(frames, conf_threshold, self.input_size)
+        if results:
+            metrics.gauge("detections", len(results[-1]))
+        return results
     
     def process_frame(self, frame, conf_threshold=0.5):
-        results = self.model(frame, verbose=False)
-        result = results[0]
-        
-        # Draw detections
-        for box in result.boxes:
-            if box.conf < conf_threshold:
-                continue
-            
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            conf = float(box.conf)
-            cls = int(box.cls)
-            name = self.model.names[cls]
-            
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            label = f"{name} {conf:.2f}"
-            cv2.putText(frame, label, (x1, y1 - 10),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-        
-        return frame
\ No newline at end of file
+        """Detect and draw the results onto the frame in place"""
+        detections = self.detect(frame, conf_threshold)
+        with metrics.time("draw"):
+            return draw_detections(frame, detections)
+    
+    def process_batch(self, frames, conf_threshold=0.5):
+        """Run one forward pass over several frames and return them annotated"""
+        results = self.detect_batch(frames, conf_threshold)
+        with metrics.time("draw"):
+            return [
+                draw_detections(frame, detections)
+                for frame, detections in zip(frames, results)
+            ]
+    
+    def _detect_roi(self, frame, roi, conf_threshold, previous):
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = roi
+        x2, y2 = min(x2, w), min(y2, h)
+        if (x2 - x1) * (y2 - y1) > 0.5 * w * h:
+            return self.detect_batch([frame], conf_threshold)[0]
+        
+        detections = self.detect_batch([frame[y1:y2, x1:x2]], conf_threshold)[0]
+        detections.boxes += np.array([x1, y1, x1, y1], dtype=np.float32)
+        
+        # Keep earlier detections outside the re-examined region
+        region = np.array([[x1, y1, x2, y2]], dtype=np.float32)
+        outside = box_iou(previous.boxes, region)[:, 0] == 0
+        kept = previous.filter(outside)
+        return Detections(
+            np.concatenate([kept.boxes, detections.boxes]),
+            np.concatenate([kept.scores, detections.scores]),
+            np.concatenate([kept.class_ids, detections.class_ids]),
+            detections.names
+        )
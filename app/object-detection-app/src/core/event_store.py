@@ -0,0 +1,306 @@
+"""
+Persistent, append-only log of detections.
+
+``DetectionStore`` keeps every detection (time, camera, class, score, box,
+track id) in a SQLite database so questions like "how many cars passed
+camera 3 yesterday" can be answered later without the video. ``add`` only
+puts the arrays on a bounded queue; a background thread turns them into rows
+and inserts them in batched transactions. The database runs in WAL mode, so
+queries from other threads or processes never wait for the writer. When the
+disk cannot keep up, new detections are dropped and counted rather than
+blocking capture or inference.
+
+Rows are kept small: every column is an integer, which SQLite stores in
+1-6 bytes. Times are milliseconds since the epoch, scores are per mille,
+and camera and class names are interned in lookup tables. That comes to
+about 50 bytes per detection including the time index.
+"""
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cameras (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS classes (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS detections (
+    ts INTEGER NOT NULL,
+    camera INTEGER NOT NULL,
+    class INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    x1 INTEGER NOT NULL,
+    y1 INTEGER NOT NULL,
+    x2 INTEGER NOT NULL,
+    y2 INTEGER NOT NULL,
+    track INTEGER
+);
+CREATE INDEX IF NOT EXISTS detections_ts ON detections (ts);
+"""
+
+
+class DetectionStore:
+    """
+    SQLite detection log with a background writer and an aggregation query API.
+
+    Args:
+        path (str): Database file, created if missing
+        batch_size (int): Detections per insert transaction
+        flush_interval (float): Longest time, in seconds, a detection waits before being written
+        max_pending (int): Frames queued for the writer before new ones are dropped
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.written = 0
+        self.closed = False
+        self._cameras: Dict[str, int] = {}
+        self._classes: Dict[str, int] = {}
+        self._local = threading.local()
+
+        connection = self._connect()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        connection.close()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, camera: str, detections, timestamp: Optional[float] = None) -> bool:
+        """
+        Queue one frame's detections; never blocks.
+
+        Returns False if the writer is too far behind and the frame was dropped.
+        """
+        if self.closed or not len(detections):
+            return True
+        timestamp = time.time() if timestamp is None else timestamp
+        item = (
+            timestamp, camera, detections.boxes.copy(), detections.scores.copy(),
+            detections.class_ids.copy(), detections.names,
+            detections.track_ids.copy() if detections.track_ids is not None else None
+        )
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            metrics.count("event_store_dropped_frames")
+            return False
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is on disk."""
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    # Queries; each thread reads through its own connection
+
+    def count(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        camera: Optional[str] = None,
+        classes: Optional[Iterable[str]] = None,
+        distinct_tracks: bool = False
+    ) -> Dict[str, int]:
+        """
+        Detections per class name between ``start`` and ``end`` (Unix seconds).
+
+        With ``distinct_tracks`` each tracked object is counted once, which is
+        what "how many cars passed" means when the log came from a tracker.
+        Track ids are only unique per camera and session.
+        """
+        where, params = self._filter(start, end, camera, classes)
+        counted = "COUNT(DISTINCT d.camera || ':' || d.track)" if distinct_tracks else "COUNT(*)"
+        rows = self._reader().execute(
+            f"SELECT c.name, {counted} FROM detections d JOIN classes c ON c.id = d.class"
+            f"{where} GROUP BY c.name ORDER BY c.name",
+            params
+        ).fetchall()
+        return dict(rows)
+
+    def histogram(
+        self,
+        bucket_seconds: float,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        camera: Optional[str] = None,
+        classes: Optional[Iterable[str]] = None
+    ) -> List[Tuple[float, str, int]]:
+        """(bucket start in Unix seconds, class name, detections) per time bucket and class."""
+        bucket_ms = max(1, int(bucket_seconds * 1000))
+        where, params = self._filter(start, end, camera, classes)
+        rows = self._reader().execute(
+            f"SELECT d.ts / ? * ? AS bucket, c.name, COUNT(*) FROM detections d"
+            f" JOIN classes c ON c.id = d.class{where} GROUP BY bucket, c.name ORDER BY bucket, c.name",
+            [bucket_ms, bucket_ms] + params
+        ).fetchall()
+        return [(bucket / 1000.0, name, count) for bucket, name, count in rows]
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        camera: Optional[str] = None,
+        classes: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """Individual detections in time order, as dicts."""
+        where, params = self._filter(start, end, camera, classes)
+        sql = (
+            "SELECT d.ts, m.name, c.name, d.score, d.x1, d.y1, d.x2, d.y2, d.track"
+            " FROM detections d JOIN classes c ON c.id = d.class JOIN cameras m ON m.id = d.camera"
+            f"{where} ORDER BY d.ts"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [
+            {
+                "timestamp": ts / 1000.0, "camera": camera_name, "name": name,
+                "confidence": score / 1000.0, "box": [x1, y1, x2, y2], "track_id": track,
+            }
+            for ts, camera_name, name, score, x1, y1, x2, y2, track in self._reader().execute(sql, params)
+        ]
+
+    def cameras(self) -> List[str]:
+        return [row[0] for row in self._reader().execute("SELECT name FROM cameras ORDER BY name")]
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    @staticmethod
+    def _filter(start, end, camera, classes) -> Tuple[str, list]:
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("d.ts >= ?")
+            params.append(int(start * 1000))
+        if end is not None:
+            clauses.append("d.ts < ?")
+            params.append(int(end * 1000))
+        if camera is not None:
+            clauses.append("d.camera = (SELECT id FROM cameras WHERE name = ?)")
+            params.append(camera)
+        if classes is not None:
+            classes = list(classes)
+            clauses.append(
+                f"d.class IN (SELECT id FROM classes WHERE name IN ({', '.join('?' * len(classes))}))"
+            )
+            params.extend(classes)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    # Writer thread
+
+    def _run(self) -> None:
+        connection = self._connect()
+        self._load_names(connection)
+        rows: List[tuple] = []
+        waiters: List[threading.Event] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = False
+            if item is None:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not False:
+                rows.extend(self._rows(connection, *item))
+            if rows and (len(rows) >= self.batch_size or stopping or waiters
+                         or time.monotonic() >= deadline):
+                self._write(connection, rows)
+                rows = []
+            if item is False or not rows:
+                deadline = time.monotonic() + self.flush_interval
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+        # Fold the write-ahead log back into the database so it does not linger on disk
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.close()
+
+    def _write(self, connection: sqlite3.Connection, rows: List[tuple]) -> None:
+        try:
+            with metrics.time("event_store_write"), connection:
+                connection.executemany(
+                    "INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Writing {len(rows)} detections to {self.path} failed: {e}")
+            metrics.count("event_store_failed_rows", len(rows))
+            return
+        self.written += len(rows)
+
+    def _rows(self, connection, timestamp, camera, boxes, scores, class_ids, names, track_ids):
+        ts = int(timestamp * 1000)
+        camera_id = self._intern(connection, "cameras", self._cameras, camera)
+        classes = [
+            self._intern(connection, "classes", self._classes, names.get(c, str(c)))
+            for c in class_ids.tolist()
+        ]
+        tracks = track_ids.tolist() if track_ids is not None else [None] * len(scores)
+        boxes = np.rint(boxes).astype(np.int64).tolist()
+        scores = np.rint(scores * 1000).astype(np.int64).tolist()
+        return [
+            (ts, camera_id, class_id, score, x1, y1, x2, y2, track)
+            for class_id, score, (x1, y1, x2, y2), track in zip(classes, scores, boxes, tracks)
+        ]
+
+    def _load_names(self, connection) -> None:
+        for table, cache in (("cameras", self._cameras), ("classes", self._classes)):
+            cache.update((name, id) for id, name in connection.execute(f"SELECT id, name FROM {table}"))
+
+    @staticmethod
+    def _intern(connection, table: str, cache: Dict[str, int], name: str) -> int:
+        key = cache.get(name)
+        if key is None:
+            with connection:
+                connection.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            key = cache[name] = connection.execute(
+                f"SELECT id FROM {table} WHERE name = ?", (name,)
+            ).fetchone()[0]
+        return key
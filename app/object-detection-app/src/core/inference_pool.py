@@ -0,0 +1,304 @@
+"""
+Multi-process inference for CPU-bound, multi-camera loads.
+
+``InferencePool`` starts N worker processes, each with its own detector
+restricted to a few threads, so a many-core machine runs N independent
+forward passes instead of one wide one. Frames travel through
+``multiprocessing.shared_memory`` slots: the parent copies a frame into a
+free slot and sends only (sequence, slot, shape) through a queue; workers
+map the slot and send back the small box/score/class arrays. Slots are
+recycled as results arrive, so at most ``slots`` frames are in flight and a
+full pool applies backpressure to the producer.
+
+``detect_batch`` and ``process_batch`` mirror ObjectDetector, so the pool can
+stand in for it in ``CameraManager``. The pool is driven from one thread.
+"""
+import os
+import sys
+import queue
+import logging
+import threading
+import multiprocessing as mp
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.detections import Detections
+from src.utils.image_processing import draw_detections
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Environment variables that cap the thread pools of common numeric libraries
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+# os.environ is process-wide; pools may be started from several threads
+_environ_lock = threading.Lock()
+
+
+@contextmanager
+def _thread_limits(threads: int):
+    """
+    Export the thread caps while workers are spawned.
+
+    A spawned child unpickles its target, importing this module and with it
+    numpy and cv2, before any worker code runs, so the caps have to be in
+    the environment it inherits.
+    """
+    with _environ_lock:
+        saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        os.environ.update({name: str(threads) for name in THREAD_ENV_VARS})
+        try:
+            yield
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def create_detector(**kwargs):
+    """Default worker factory: an ObjectDetector built from ``kwargs``."""
+    from src.core.detector import ObjectDetector
+
+    return ObjectDetector(**kwargs)
+
+
+def _worker_main(index, factory, kwargs, threads, tasks, results) -> None:
+    # The environment caps are inherited from the parent; cv2 and torch are
+    # set explicitly because they size their pools from the CPU count
+    import cv2
+
+    cv2.setNumThreads(threads)
+    try:
+        detector = factory(**kwargs)
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            torch.set_num_threads(threads)
+    except Exception as e:
+        results.put(("failed", index, f"{type(e).__name__}: {e}"))
+        return
+    results.put(("ready", index, getattr(detector, "names", {})))
+
+    # Mapped block per slot; a slot that grew gets a new block name
+    attached: Dict[int, shared_memory.SharedMemory] = {}
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, name, shape, dtype, conf = task
+            try:
+                shm = attached.get(slot)
+                if shm is None or shm.name != name:
+                    if shm is not None:
+                        shm.close()
+                    shm = attached[slot] = shared_memory.SharedMemory(name=name)
+                frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                detections = detector.detect_batch([frame], conf)[0]
+                del frame
+                results.put(("done", seq, (
+                    detections.boxes, detections.scores, detections.class_ids
+                )))
+            except Exception as e:
+                results.put(("error", seq, f"{type(e).__name__}: {e}"))
+    finally:
+        for shm in attached.values():
+            shm.close()
+
+
+class InferencePool:
+    """
+    Worker processes running a detector on frames passed via shared memory.
+
+    Args:
+        workers (int): Number of worker processes
+        threads_per_worker (int): Thread cap for each worker's numeric libraries
+        factory (callable): Top-level callable building a detector in the worker;
+            receives ``detector_kwargs``
+        detector_kwargs (dict): Arguments for the factory (ObjectDetector arguments by default)
+        slots (int): Frames in flight at once; defaults to two per worker
+        start_timeout (float): Seconds to wait for every worker to load its model
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        threads_per_worker: int = 1,
+        factory: Callable[..., Any] = create_detector,
+        detector_kwargs: Optional[dict] = None,
+        slots: Optional[int] = None,
+        start_timeout: Optional[float] = None
+    ):
+        detector_kwargs = dict(detector_kwargs or {})
+        if factory is create_detector and detector_kwargs.get("backend") in ("onnxruntime", "openvino"):
+            detector_kwargs.setdefault("num_threads", threads_per_worker)
+
+        # spawn: forked children would inherit the parent's threads and model state
+        context = mp.get_context("spawn")
+        self.task_queue = context.Queue()
+        self.result_queue = context.Queue()
+        self.processes = [
+            context.Process(
+                target=_worker_main,
+                args=(
+                    i, factory, detector_kwargs, threads_per_worker,
+                    self.task_queue, self.result_queue
+                ),
+                daemon=True
+            )
+            for i in range(workers)
+        ]
+        self.slots: List[Optional[shared_memory.SharedMemory]] = [None] * (slots or 2 * workers)
+        self.free_slots = deque(range(len(self.slots)))
+        self.in_flight: Dict[int, Tuple[int, Any]] = {}
+        self.done: Dict[int, Tuple[Any, Detections]] = {}
+        self.next_seq = 0
+        self.next_result = 0
+        self.names = {}
+        self.closed = False
+
+        with _thread_limits(threads_per_worker):
+            for process in self.processes:
+                process.start()
+        try:
+            self._wait_ready(start_timeout)
+        except Exception:
+            self.close()
+            raise
+        metrics.gauge("pool_workers", workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.processes)
+
+    @property
+    def pending(self) -> int:
+        """Frames submitted whose results have not been returned yet."""
+        return self.next_seq - self.next_result
+
+    def submit(self, frame: np.ndarray, conf_threshold: float = 0.5, tag: Any = None) -> int:
+        """
+        Queue a frame for detection and return its sequence number.
+
+        Blocks while every shared-memory slot is in use; finished results
+        received meanwhile are kept for ``results``.
+        """
+        while not self.free_slots:
+            self._receive(block=True)
+        slot = self.free_slots.popleft()
+        shm = self.slots[slot]
+        if shm is None or shm.size < frame.nbytes:
+            # Grow the slot; workers attach to the new block by name
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+            shm = self.slots[slot] = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[...] = frame
+
+        seq = self.next_seq
+        self.next_seq += 1
+        self.in_flight[seq] = (slot, tag)
+        self.task_queue.put((seq, slot, shm.name, frame.shape, frame.dtype.str, conf_threshold))
+        return seq
+
+    def results(self, wait: bool = True) -> Iterator[Tuple[int, Any, Detections]]:
+        """
+        Yield (seq, tag, Detections) in submission order.
+
+        With ``wait`` every submitted frame is returned; otherwise only the
+        results that are ready without blocking. If a frame failed, the
+        remaining results are still collected (and dropped) before its error
+        is raised, so they cannot surface in the next caller's batch.
+        """
+        error = None
+        while self.next_result < self.next_seq:
+            if self.next_result not in self.done:
+                if not self._receive(block=wait):
+                    break
+                continue
+            seq = self.next_result
+            tag, detections = self.done.pop(seq)
+            self.next_result += 1
+            if isinstance(detections, Exception):
+                error = error or detections
+            elif error is None:
+                yield seq, tag, detections
+        if error is not None:
+            raise error
+
+    def detect_batch(self, frames, conf_threshold: float = 0.5) -> List[Detections]:
+        """Spread frames over the workers and return Detections per frame, in order."""
+        for frame in frames:
+            self.submit(frame, conf_threshold)
+        results = [detections for _, _, detections in self.results()]
+        if results:
+            metrics.gauge("detections", len(results[-1]))
+        return results
+
+    def detect(self, frame, conf_threshold: float = 0.5) -> Detections:
+        return self.detect_batch([frame], conf_threshold)[0]
+
+    def process_batch(self, frames, conf_threshold: float = 0.5):
+        results = self.detect_batch(frames, conf_threshold)
+        with metrics.time("draw"):
+            return [
+                draw_detections(frame, detections)
+                for frame, detections in zip(frames, results)
+            ]
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.processes:
+            self.task_queue.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for shm in self.slots:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self.slots = []
+
+    def _wait_ready(self, timeout: Optional[float]) -> None:
+        ready = 0
+        while ready < len(self.processes):
+            try:
+                kind, index, payload = self.result_queue.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError("Inference workers did not start in time")
+            if kind == "failed":
+                raise RuntimeError(f"Inference worker {index} failed to start: {payload}")
+            self.names = payload
+            ready += 1
+
+    def _receive(self, block: bool) -> bool:
+        while True:
+            try:
+                kind, seq, payload = self.result_queue.get(block=block, timeout=1.0)
+                break
+            except queue.Empty:
+                if not block:
+                    return False
+                dead = [i for i, process in enumerate(self.processes) if not process.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Inference workers {dead} exited unexpectedly")
+        slot, tag = self.in_flight.pop(seq)
+        self.free_slots.append(slot)
+        if kind == "done":
+            boxes, scores, class_ids = payload
+            self.done[seq] = (tag, Detections(boxes, scores, class_ids, self.names))
+        else:
+            self.done[seq] = (tag, RuntimeError(f"Inference failed for frame {seq}: {payload}"))
+        return True
@@ -0,0 +1,267 @@
+import cv2
+import socket
+import logging
+import http.client
+import numpy as np
+from urllib.parse import urlsplit
+from typing import List, Optional, Tuple
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+# Multipart boundary of the ESP32 CameraWebServer sketch, reused by our servers
+BOUNDARY = "123456789000000000000987654321"
+
+
+class MJPEGParser:
+    """
+    Incremental parser for ``multipart/x-mixed-replace`` MJPEG bodies.
+
+    Bytes are fed in whatever chunks the transport delivers and complete JPEG
+    payloads are returned as soon as they are available. Parts are framed by
+    their ``Content-Length`` header when present (the ESP32 sketch always sends
+    one) and by the next boundary otherwise. Without a boundary the parser
+    falls back to scanning for JPEG SOI/EOI markers, which also handles raw
+    ``.mjpeg`` files made of concatenated JPEGs.
+
+    The internal buffer is a single ``bytearray`` that is compacted in place,
+    so steady-state parsing does not allocate besides the returned frames.
+    """
+
+    def __init__(self, boundary: Optional[bytes] = None, max_frame_size: int = 4 * 1024 * 1024):
+        if boundary is not None:
+            boundary = boundary.strip(b'"')
+            if not boundary.startswith(b"--"):
+                boundary = b"--" + boundary
+        self.boundary = boundary
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self._pos = 0
+        self._length = None
+        self._in_part = False
+
+    def reset(self) -> None:
+        self.buffer.clear()
+        self._pos = 0
+        self._length = None
+        self._in_part = False
+
+    def feed(self, data) -> List[bytes]:
+        """Append ``data`` and return every JPEG completed by it."""
+        self.buffer.extend(data)
+        if self.boundary is None:
+            frames = self._parse_raw()
+        else:
+            frames = self._parse_multipart()
+
+        # Compact consumed bytes so the buffer never grows past one frame
+        if self._pos:
+            del self.buffer[:self._pos]
+            self._pos = 0
+        if len(self.buffer) > self.max_frame_size:
+            logging.getLogger(__name__).warning("MJPEG frame too large, resynchronising")
+            self.reset()
+        return frames
+
+    def _parse_multipart(self) -> List[bytes]:
+        frames = []
+        buf = self.buffer
+        while True:
+            if not self._in_part:
+                start = buf.find(self.boundary, self._pos)
+                if start < 0:
+                    # Keep a tail in case the boundary is split across chunks
+                    self._pos = max(self._pos, len(buf) - len(self.boundary))
+                    break
+                header_end = buf.find(b"\r\n\r\n", start)
+                if header_end < 0:
+                    self._pos = start
+                    break
+                self._length = self._content_length(buf[start + len(self.boundary):header_end])
+                self._pos = header_end + 4
+                self._in_part = True
+
+            if self._length is not None:
+                end = self._pos + self._length
+                if len(buf) < end:
+                    break
+            else:
+                end = buf.find(self.boundary, self._pos)
+                if end < 0:
+                    break
+                while end > self._pos and buf[end - 1] in b"\r\n":
+                    end -= 1
+
+            frames.append(bytes(buf[self._pos:end]))
+            self._pos = end
+            self._in_part = False
+        return frames
+
+    def _parse_raw(self) -> List[bytes]:
+        frames = []
+        buf = self.buffer
+        while True:
+            start = buf.find(JPEG_SOI, self._pos)
+            if start < 0:
+                self._pos = max(self._pos, len(buf) - 1)
+                break
+            end = buf.find(JPEG_EOI, start + 2)
+            if end < 0:
+                self._pos = start
+                break
+            frames.append(bytes(buf[start:end + 2]))
+            self._pos = end + 2
+        return frames
+
+    @staticmethod
+    def _content_length(headers: bytes) -> Optional[int]:
+        for line in bytes(headers).split(b"\r\n"):
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                try:
+                    return int(value.strip())
+                except ValueError:
+                    return None
+        return None
+
+
+def parse_boundary(content_type: str) -> Optional[bytes]:
+    """Extract the multipart boundary from a Content-Type header value."""
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary" and value:
+            return value.strip().encode()
+    return None
+
+
+class ChunkedDecoder:
+    """
+    Incremental decoder for ``Transfer-Encoding: chunked`` bodies.
+
+    The ESP32's ``esp_http_server`` writes ``/stream`` with
+    ``httpd_resp_send_chunk``, so a raw socket reader sees chunk-size lines
+    between the multipart data. ``feed`` takes bytes as they arrive and
+    returns only the payload, ready for ``MJPEGParser``.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.remaining = 0  # payload bytes left in the current chunk
+        self.finished = False
+
+    def feed(self, data) -> bytes:
+        self.buffer.extend(data)
+        out = bytearray()
+        while self.buffer and not self.finished:
+            if self.remaining:
+                take = min(self.remaining, len(self.buffer))
+                out += self.buffer[:take]
+                del self.buffer[:take]
+                self.remaining -= take
+                if self.remaining:
+                    break
+                # The chunk's trailing CRLF is consumed with the next size line
+                continue
+            end = self.buffer.find(b"\r\n", 2 if self.buffer.startswith(b"\r\n") else 0)
+            if end < 0:
+                if len(self.buffer) > 1024:
+                    raise ValueError("invalid chunk size line")
+                break
+            line = bytes(self.buffer[:end]).strip()
+            del self.buffer[:end + 2]
+            size = int(line.split(b";", 1)[0], 16)
+            if size == 0:
+                self.finished = True
+            self.remaining = size
+        return bytes(out)
+
+
+class MJPEGStream:
+    """
+    Streaming MJPEG reader for the ESP32-CAM ``/stream`` endpoint.
+
+    Holds a single persistent HTTP connection and reads the multipart body
+    in whatever chunks have arrived. Exposes the subset of the
+    ``cv2.VideoCapture`` interface used by ``ESP32Camera`` so it can be used as
+    a drop-in capture backend; ``read_jpeg()`` yields the raw JPEG bytes for
+    consumers that want to decode lazily.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0, chunk_size: int = 16 * 1024):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += f"?{parts.query}"
+        self.timeout = timeout
+        self.connection = None
+        self.response = None
+        self.sock = None
+        self.parser = None
+        self.chunk_size = chunk_size
+        self._pending = []
+        self.logger = logging.getLogger(__name__)
+        self.open()
+
+    def open(self) -> bool:
+        self.release()
+        try:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request("GET", self.path, headers={"Connection": "keep-alive"})
+            # http.client drops its socket reference once the response owns it
+            self.sock = self.connection.sock
+            self.response = self.connection.getresponse()
+            if self.response.status != 200:
+                raise ConnectionError(f"HTTP {self.response.status}")
+            boundary = parse_boundary(self.response.getheader("Content-Type", ""))
+            self.parser = MJPEGParser(boundary)
+            return True
+        except (OSError, http.client.HTTPException) as e:
+            self.logger.error(f"Could not open MJPEG stream {self.url}: {e}")
+            self.release()
+            return False
+
+    def isOpened(self) -> bool:
+        return self.response is not None
+
+    def read_jpeg(self) -> Optional[bytes]:
+        """Block until the next complete JPEG arrives; None when the stream ends."""
+        while not self._pending:
+            if self.response is None:
+                return None
+            # read1 returns whatever has arrived; readinto would hold small
+            # frames back until the whole chunk had filled
+            data = self.response.read1(self.chunk_size)
+            if not data:
+                self.release()
+                return None
+            self._pending.extend(self.parser.feed(data))
+        # Only the newest complete frame matters; drop any older backlog
+        jpeg = self._pending[-1]
+        self._pending.clear()
+        return jpeg
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        jpeg = self.read_jpeg()
+        if jpeg is None:
+            return False, None
+        frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return frame is not None, frame
+
+    def release(self) -> None:
+        # Shut the socket down first so a read blocked in another thread
+        # returns immediately instead of holding the response open until timeout
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock = None
+        if self.response is not None:
+            self.response.close()
+            self.response = None
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        self._pending.clear()
@@ -0,0 +1,103 @@
+"""
+LRU cache of loaded, warmed-up inference backends.
+
+Switching models at runtime should not mean reloading weights every time.
+``ModelCache`` keeps recently used backends alive up to a memory budget, so
+going back to one of them is a dictionary lookup. Each entry is charged at the
+size its backend reports (``InferenceBackend.memory_bytes``), which counts
+the weights and not runtime arenas, so leave some headroom in the budget. The
+most recently used entry is never evicted, even when it alone exceeds the budget.
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def model_key(backend: str, model_path: str, imgsz: int, variant: str, **options) -> Tuple:
+    """Hashable identity of a backend configuration."""
+    return (backend, os.path.abspath(model_path), imgsz, variant, tuple(sorted(options.items())))
+
+
+class ModelCache:
+    """
+    Thread-safe LRU of inference backends.
+
+    Args:
+        max_bytes (int): Memory budget for all cached backends together
+        max_models (int): Optional cap on the number of cached backends
+    """
+
+    def __init__(self, max_bytes: int, max_models: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_models = max_models
+        self.entries: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    @property
+    def total_bytes(self) -> int:
+        with self.lock:
+            return sum(size for _, size in self.entries.values())
+
+    def keys(self) -> List[Hashable]:
+        """Cached keys, least recently used first."""
+        with self.lock:
+            return list(self.entries)
+
+    def get(self, key: Hashable):
+        """Return the cached backend for ``key`` (marking it most recent), or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                metrics.count("model_cache_misses")
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        metrics.count("model_cache_hits")
+        return entry[0]
+
+    def put(self, key: Hashable, backend, size: Optional[int] = None) -> None:
+        """Add a backend and evict least recently used ones until within budget."""
+        if size is None:
+            size = backend.memory_bytes()
+        with self.lock:
+            self.entries[key] = (backend, size)
+            self.entries.move_to_end(key)
+            evicted = self._evict()
+            total = sum(size for _, size in self.entries.values())
+        for evicted_key in evicted:
+            logger.info(f"Evicted {evicted_key} from the model cache")
+        metrics.gauge("model_cache_bytes", total)
+        metrics.gauge("model_cache_models", len(self.entries))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+        metrics.gauge("model_cache_bytes", 0)
+        metrics.gauge("model_cache_models", 0)
+
+    def _evict(self) -> List[Hashable]:
+        evicted = []
+        total = sum(size for _, size in self.entries.values())
+        while len(self.entries) > 1 and (
+            total > self.max_bytes
+            or (self.max_models is not None and len(self.entries) > self.max_models)
+        ):
+            key, (_, size) = self.entries.popitem(last=False)
+            total -= size
+            evicted.append(key)
+        return evicted
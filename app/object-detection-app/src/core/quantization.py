@@ -0,0 +1,86 @@
+"""
+Reduced-precision variants of the cached ONNX export.
+
+``int8`` uses ONNX Runtime dynamic quantization (weights stored as INT8,
+activations quantized on the fly), which needs no calibration data and is
+typically 2-3x faster on CPUs with VNNI. ``fp16`` halves the weights and is
+mainly useful on hardware with native half-precision support.
+"""
+import os
+import re
+import logging
+from typing import Iterable, List
+
+from src.core.backends import export_onnx, variant_path
+
+logger = logging.getLogger(__name__)
+
+
+def head_nodes(node_names: Iterable[str]) -> List[str]:
+    """
+    Nodes of the detection head in an Ultralytics export.
+
+    Exported node names carry their module path (``/model.22/cv2.0/...``),
+    and the Detect head is always the last module of the model.
+    """
+    modules = {}
+    for name in node_names:
+        match = re.match(r"/model\.(\d+)/", name)
+        if match:
+            modules.setdefault(int(match.group(1)), []).append(name)
+    return modules[max(modules)] if modules else []
+
+
+def quantize_int8(onnx_path: str, output_path: str) -> str:
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    # Detection heads are sensitive to quantization; keep them in float
+    excluded = head_nodes(node.name for node in onnx.load(onnx_path).graph.node)
+    quantize_dynamic(
+        onnx_path,
+        output_path,
+        weight_type=QuantType.QUInt8,
+        op_types_to_quantize=["Conv", "MatMul"],
+        nodes_to_exclude=excluded,
+    )
+    return output_path
+
+
+def convert_fp16(onnx_path: str, output_path: str) -> str:
+    import onnx
+    from onnxconverter_common import float16
+
+    model = onnx.load(onnx_path)
+    # Keep float32 inputs/outputs so callers do not have to change dtypes
+    model = float16.convert_float_to_float16(model, keep_io_types=True)
+    onnx.save(model, output_path)
+    return output_path
+
+
+CONVERTERS = {
+    "int8": quantize_int8,
+    "fp16": convert_fp16,
+}
+
+
+def build_variant(model_path: str, variant: str, imgsz: int = 640, force: bool = False) -> str:
+    """
+    Create (or reuse) a precision variant of ``model_path`` and return its path.
+
+    Args:
+        model_path (str): Weights (.pt) or an existing .onnx export
+        variant (str): "fp32", "fp16" or "int8"
+        imgsz (int): Export input size, used if the base export is missing
+        force (bool): Rebuild even if an up-to-date variant exists
+    """
+    base_path = export_onnx(model_path, imgsz)
+    output_path = variant_path(base_path, variant)
+    if variant == "fp32":
+        return output_path
+    if (not force and os.path.exists(output_path)
+            and os.path.getmtime(output_path) >= os.path.getmtime(base_path)):
+        return output_path
+
+    logger.info(f"Building {variant} variant {output_path}")
+    return CONVERTERS[variant](base_path, output_path)
@@ -0,0 +1,180 @@
+"""
+Pre-event clip recording.
+
+The capture thread pushes every received JPEG into a byte-capped ring
+buffer. When a detection triggers a recording, the buffered frames plus the
+following ``post_seconds`` are handed to a background writer thread, which
+appends them to a ``.mjpeg`` file (concatenated JPEGs, playable with
+``ffplay -f mjpeg`` and readable by ``benchmarks.pipeline``). Frames stay
+compressed the whole way, so memory is bounded by ``max_bytes`` and the
+capture thread never touches the disk.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRingBuffer:
+    """Recent (timestamp, jpeg) pairs, capped by total bytes and by age."""
+
+    def __init__(self, max_seconds: float = 5.0, max_bytes: int = 16 * 1024 * 1024):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.frames = deque()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def append(self, jpeg: bytes, timestamp: Optional[float] = None) -> None:
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self.lock:
+            self.frames.append((timestamp, jpeg))
+            self.nbytes += len(jpeg)
+            oldest = timestamp - self.max_seconds
+            while self.frames and (self.nbytes > self.max_bytes or self.frames[0][0] < oldest):
+                self.nbytes -= len(self.frames.popleft()[1])
+
+    def snapshot(self) -> List[Tuple[float, bytes]]:
+        with self.lock:
+            return list(self.frames)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.frames.clear()
+            self.nbytes = 0
+
+
+class ClipRecorder:
+    """
+    Writes a clip of the ``pre_seconds`` before a trigger and ``post_seconds`` after it.
+
+    ``add_frame`` is called from the capture thread for every frame and only
+    appends to memory. ``trigger`` (or ``observe`` with a Detections result)
+    starts a clip, or extends the running one. Frames waiting for the writer
+    count against ``max_bytes`` as well; when the disk cannot keep up, new
+    frames are dropped rather than stalling capture.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        pre_seconds: float = 5.0,
+        post_seconds: float = 5.0,
+        max_bytes: int = 16 * 1024 * 1024,
+        classes: Iterable[str] = (),
+        prefix: str = "clip"
+    ):
+        self.output_dir = output_dir
+        self.post_seconds = post_seconds
+        self.classes = set(classes)
+        self.prefix = prefix
+        self.buffer = FrameRingBuffer(pre_seconds, max_bytes)
+        self.max_queued_bytes = max_bytes
+        self.queued_bytes = 0
+        self.clip_path = None
+        self.clip_end = 0.0
+        self.clips: List[str] = []
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    @property
+    def recording(self) -> bool:
+        return self.clip_path is not None
+
+    def add_frame(self, jpeg: bytes, timestamp: Optional[float] = None) -> None:
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self.lock:
+            # Under the lock, so a trigger sees this frame either in the
+            # pre-roll snapshot or as a live frame, never both
+            self.buffer.append(jpeg, timestamp)
+            if self.clip_path is None:
+                return
+            if timestamp > self.clip_end:
+                self._finish_clip()
+                return
+            self._enqueue([jpeg])
+
+    def trigger(self, label: str = "") -> str:
+        """Start a clip (or extend the current one); returns the clip path."""
+        now = time.monotonic()
+        with self.lock:
+            self.clip_end = now + self.post_seconds
+            if self.clip_path is None:
+                name = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+                if label:
+                    name += f"_{label.replace(' ', '-')}"
+                self.clip_path = os.path.join(self.output_dir, f"{self.prefix}_{name}.mjpeg")
+                self.queue.put(("open", self.clip_path))
+                self._enqueue([jpeg for _, jpeg in self.buffer.snapshot()])
+                self.clips.append(self.clip_path)
+                metrics.count("recorded_clips")
+                logger.info(f"Recording {self.clip_path}")
+            return self.clip_path
+
+    def observe(self, detections) -> bool:
+        """Trigger when ``detections`` contains a watched class (any class if none are set)."""
+        if not len(detections):
+            return False
+        names = [detections.names.get(int(c), str(int(c))) for c in detections.class_ids]
+        matched = [name for name in names if not self.classes or name in self.classes]
+        if not matched:
+            return False
+        self.trigger(matched[0])
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish any running clip and wait for the writer to flush it."""
+        with self.lock:
+            if self.clip_path is not None:
+                self._finish_clip()
+        self.queue.put(("stop", None))
+        self.writer.join(timeout)
+
+    def _finish_clip(self) -> None:
+        self.queue.put(("close", self.clip_path))
+        self.clip_path = None
+
+    def _enqueue(self, jpegs: List[bytes]) -> None:
+        size = sum(len(jpeg) for jpeg in jpegs)
+        if self.queued_bytes + size > self.max_queued_bytes:
+            metrics.count("recorder_dropped_frames", len(jpegs))
+            return
+        self.queued_bytes += size
+        self.queue.put(("frames", jpegs))
+
+    def _write_loop(self) -> None:
+        output = None
+        while True:
+            command, payload = self.queue.get()
+            try:
+                if command == "open":
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    output = open(payload, "wb")
+                elif command == "frames":
+                    with self.lock:
+                        self.queued_bytes -= sum(len(jpeg) for jpeg in payload)
+                    if output is not None:
+                        with metrics.time("record_write"):
+                            for jpeg in payload:
+                                output.write(jpeg)
+                elif command in ("close", "stop"):
+                    if output is not None:
+                        output.close()
+                        output = None
+                    if command == "stop":
+                        return
+            except OSError as e:
+                logger.error(f"Clip write failed: {e}")
+                output = None
@@ -0,0 +1,278 @@
+"""
+HTTP re-streaming of annotated frames to any number of viewers.
+
+The ESP32-CAM serves one or two clients at most. ``StreamServer`` re-publishes
+the annotated output instead, from an asyncio event loop on a background
+thread:
+
+- ``/stream/<name>``: MJPEG (multipart/x-mixed-replace), in the same format as
+  the ESP32's ``/stream``, so browsers, ``ffplay`` and this app can all read it
+- ``/snapshot/<name>``: the newest frame as a single JPEG
+- ``/detections/<name>``: the newest detections as JSON
+- ``/``: an HTML page showing every stream
+
+``<name>`` may be left out to get the first published stream.
+
+Each frame is JPEG-encoded once, on a single encoder thread, and the same
+bytes are written to every viewer. Nothing is encoded while a stream has no
+viewers. Every viewer is sent the newest frame as soon as its socket has
+accepted the previous one, so a slow viewer skips frames instead of queueing
+them. The pipeline never waits on the network.
+"""
+import html
+import json
+import time
+import asyncio
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import quote, unquote, urlsplit
+
+import cv2
+import numpy as np
+
+from src.core.mjpeg import BOUNDARY
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _Channel:
+    """State of one published stream; only touched on the event loop."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.frame = None
+        self.detections = None
+        self.timestamp = 0.0
+        self.seq = 0
+        self.jpeg = None
+        self.jpeg_seq = 0
+        self.encoded = 0
+        self.viewers = 0
+        self.encoding = None
+        self.new_jpeg = asyncio.Event()
+
+
+class StreamServer:
+    """
+    Asyncio MJPEG and JSON server fed with annotated frames from any thread.
+
+    Args:
+        host (str): Interface to listen on
+        port (int): TCP port, 0 for any free port (see ``self.port`` after start)
+        quality (int): JPEG quality of the re-encoded frames
+        send_buffer (int): Kernel send buffer per viewer in bytes; caps how far behind a slow viewer can fall
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 8081,
+        quality: int = 80,
+        send_buffer: int = 256 * 1024
+    ):
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.send_buffer = send_buffer
+        self.channels: Dict[str, _Channel] = {}
+        self.dropped = 0
+        self.encoder = ThreadPoolExecutor(1, thread_name_prefix="stream-encode")
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.server = None
+
+    def start(self) -> "StreamServer":
+        self.thread.start()
+        self.server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port), self.loop
+        ).result(timeout=5)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Streaming annotated video on http://{self.host}:{self.port}/")
+        return self
+
+    def stop(self) -> None:
+        if self.server is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=2)
+            except Exception as e:
+                logger.warning(f"Stream server did not shut down cleanly: {e}")
+            self.server = None
+        if self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=2)
+        if not self.thread.is_alive():
+            self.loop.close()
+        self.encoder.shutdown(wait=False, cancel_futures=True)
+
+    def publish(self, name: str, frame: np.ndarray, detections=None,
+                timestamp: Optional[float] = None) -> None:
+        """
+        Offer the newest annotated frame of stream ``name``; never blocks.
+
+        The frame is encoded later on the encoder thread without a copy, so it
+        must not be modified afterwards.
+        """
+        if self.server is None:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+        self.loop.call_soon_threadsafe(self._receive, name, frame, detections, timestamp)
+
+    def viewers(self) -> Dict[str, int]:
+        return {name: channel.viewers for name, channel in list(self.channels.items())}
+
+    # Event loop side
+
+    def _receive(self, name, frame, detections, timestamp) -> None:
+        channel = self.channels.get(name)
+        if channel is None:
+            channel = self.channels[name] = _Channel(name)
+        channel.frame = frame
+        channel.detections = detections
+        channel.timestamp = timestamp
+        channel.seq += 1
+        if channel.viewers:
+            self._encode(channel)
+
+    def _encode(self, channel: _Channel) -> "asyncio.Task":
+        """Start encoding the channel's newest frame unless that is already under way."""
+        if channel.encoding is None or channel.encoding.done():
+            channel.encoding = self.loop.create_task(self._encode_newest(channel))
+        return channel.encoding
+
+    async def _encode_newest(self, channel: _Channel) -> None:
+        # Frames published while one is being encoded are skipped for the newest
+        while channel.jpeg_seq < channel.seq:
+            seq, frame = channel.seq, channel.frame
+            jpeg = await self.loop.run_in_executor(self.encoder, self._encode_frame, frame)
+            if jpeg is None:
+                break
+            channel.jpeg, channel.jpeg_seq = jpeg, seq
+            channel.encoded += 1
+            event, channel.new_jpeg = channel.new_jpeg, asyncio.Event()
+            event.set()
+
+    def _encode_frame(self, frame: np.ndarray) -> Optional[bytes]:
+        with metrics.time("stream_encode"):
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return jpeg.tobytes() if ok else None
+
+    async def _shutdown(self) -> None:
+        self.server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+            method, target = request.split(b" ", 2)[:2]
+            path = unquote(urlsplit(target.decode("latin-1")).path).strip("/")
+            route, _, name = path.partition("/")
+            if method != b"GET":
+                await self._respond(writer, 405, "text/plain", b"Method not allowed")
+            elif route == "":
+                await self._respond(writer, 200, "text/html", self._index())
+            elif route in ("stream", "snapshot", "detections"):
+                channel = self.channels.get(name) if name else next(iter(self.channels.values()), None)
+                if channel is None:
+                    await self._respond(writer, 404, "text/plain", b"No such stream")
+                elif route == "stream":
+                    await self._stream(channel, reader, writer)
+                elif route == "snapshot":
+                    await self._snapshot(channel, writer)
+                else:
+                    await self._respond(writer, 200, "application/json", self._detections(channel))
+            else:
+                await self._respond(writer, 404, "text/plain", b"Not found")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                ValueError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown; ending quietly keeps asyncio from logging every open viewer
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status: int, content_type: str, body: bytes) -> None:
+        reason = {200: "OK", 404: "Not Found", 405: "Method Not Allowed", 503: "Service Unavailable"}
+        writer.write(
+            f"HTTP/1.1 {status} {reason[status]}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nCache-Control: no-cache\r\n"
+            f"Access-Control-Allow-Origin: *\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _stream(self, channel: _Channel, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace;boundary={BOUNDARY}\r\n"
+            f"Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n"
+            f"Connection: close\r\n\r\n".encode()
+        )
+        sock = writer.get_extra_info("socket")
+        if sock is not None and self.send_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        channel.viewers += 1
+        metrics.gauge("stream_viewers", sum(c.viewers for c in self.channels.values()))
+        # Viewers send nothing after the request, so this finishes when they disconnect
+        closed = self.loop.create_task(reader.read())
+        try:
+            if channel.jpeg_seq < channel.seq:
+                self._encode(channel)
+            sent = 0
+            while True:
+                if channel.encoded <= sent:
+                    waiting = self.loop.create_task(channel.new_jpeg.wait())
+                    await asyncio.wait((waiting, closed), return_when=asyncio.FIRST_COMPLETED)
+                    if closed.done():
+                        waiting.cancel()
+                        break
+                skipped = channel.encoded - sent - 1
+                if sent and skipped:
+                    self.dropped += skipped
+                    metrics.count("stream_dropped_frames", skipped)
+                sent, jpeg = channel.encoded, channel.jpeg
+                writer.write(
+                    f"\r\n--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                )
+                writer.write(jpeg)
+                # Returns once the socket has taken most of it; newer frames replace each other meanwhile
+                await writer.drain()
+        finally:
+            closed.cancel()
+            channel.viewers -= 1
+            metrics.gauge("stream_viewers", sum(c.viewers for c in self.channels.values()))
+
+    async def _snapshot(self, channel: _Channel, writer: asyncio.StreamWriter) -> None:
+        if channel.jpeg_seq < channel.seq:
+            await self._encode(channel)
+        if channel.jpeg is None:
+            await self._respond(writer, 503, "text/plain", b"No frame encoded yet")
+        else:
+            await self._respond(writer, 200, "image/jpeg", channel.jpeg)
+
+    def _detections(self, channel: _Channel) -> bytes:
+        detections = channel.detections
+        return json.dumps({
+            "stream": channel.name,
+            "frame": channel.seq,
+            "timestamp": channel.timestamp,
+            "detections": detections.to_list() if detections is not None else [],
+        }).encode()
+
+    def _index(self) -> bytes:
+        streams = "".join(
+            f'<figure><img src="/stream/{quote(name, safe="")}"><figcaption>{html.escape(name)} '
+            f'(<a href="/detections/{quote(name, safe="")}">detections</a>)</figcaption></figure>'
+            for name in self.channels
+        )
+        return (
+            "<!DOCTYPE html><html><head><title>Object detection</title></head>"
+            f"<body>{streams or '<p>Nothing published yet</p>'}</body></html>"
+        ).encode()
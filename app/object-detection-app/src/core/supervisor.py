@@ -0,0 +1,144 @@
+"""
+Stream health supervision for ``ESP32Camera``.
+
+A ``StreamSupervisor`` watches one camera from a low-rate background thread.
+When the capture thread has died (``running`` went false after a read error)
+or no new frame has arrived within ``stall_timeout``, it reopens the stream
+with ``ESP32Camera.reconnect``. A read error only stops the capture thread,
+and reconnecting keeps the last frame and every consumer attached, so the
+detection worker and GUI carry on as if nothing happened.
+Failed attempts back off exponentially; all waits are on an Event, so an
+idle or broken stream costs no CPU.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class StreamSupervisor:
+    """
+    Keeps a connected ESP32Camera streaming across Wi-Fi drop-outs.
+
+    Args:
+        camera (ESP32Camera): Already connected camera
+        address (str): Address used to reconnect
+        stall_timeout (float): Seconds without a new frame before reconnecting
+        initial_backoff (float): First delay after a failed reconnect, doubled per failure
+        max_backoff (float): Upper bound for the reconnect delay
+        check_interval (float): Seconds between health checks
+    """
+
+    def __init__(
+        self,
+        camera,
+        address: str,
+        stall_timeout: float = 5.0,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        check_interval: float = 0.5
+    ):
+        self.camera = camera
+        self.address = address
+        self.stall_timeout = stall_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.check_interval = check_interval
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.stalls = 0
+        self.started_at = None
+        self.connected_since = None
+        # (time, frame_id) samples for the effective frame rate
+        self.samples = deque(maxlen=max(2, int(5.0 / check_interval) + 1))
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        now = time.monotonic()
+        self.started_at = now
+        self.connected_since = now if self.camera.is_connected else None
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop supervising; the camera itself is left as it is."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+
+    @property
+    def uptime(self) -> float:
+        """Seconds since the current connection was established (0 while down)."""
+        if self.connected_since is None:
+            return 0.0
+        return time.monotonic() - self.connected_since
+
+    def effective_fps(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        (t0, id0), (t1, id1) = self.samples[0], self.samples[-1]
+        return (id1 - id0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "connected": bool(self.camera.is_connected),
+            "uptime_s": self.uptime,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "stalls": self.stalls,
+            "fps": self.effective_fps(),
+        }
+
+    def _run(self) -> None:
+        last_id = self.camera.frame_id
+        last_change = time.monotonic()
+        backoff = self.initial_backoff
+        while not self.stopped.wait(self.check_interval):
+            now = time.monotonic()
+            frame_id = self.camera.frame_id
+            self.samples.append((now, frame_id))
+            if frame_id != last_id:
+                last_id, last_change = frame_id, now
+
+            if self.camera.running and now - last_change < self.stall_timeout:
+                continue
+
+            if self.camera.running:
+                self.stalls += 1
+                logger.warning(
+                    f"No frame from {self.address} for {now - last_change:.1f}s, reconnecting"
+                )
+            else:
+                logger.warning(f"Stream from {self.address} lost, reconnecting")
+            self.connected_since = None
+
+            if self._reconnect():
+                backoff = self.initial_backoff
+                last_id, last_change = self.camera.frame_id, time.monotonic()
+                self.samples.clear()
+                continue
+            logger.info(f"Reconnect to {self.address} failed, retrying in {backoff:.1f}s")
+            if self.stopped.wait(backoff):
+                break
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _reconnect(self) -> bool:
+        if self.stopped.is_set():
+            return False
+        if not self.camera.reconnect(self.address):
+            self.failed_attempts += 1
+            return False
+        self.reconnects += 1
+        self.connected_since = time.monotonic()
+        metrics.count("reconnects")
+        return True
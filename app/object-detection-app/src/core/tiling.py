@@ -0,0 +1,150 @@
+"""
+Sliced (SAHI-style) inference for small objects in large frames.
+
+A UXGA frame squeezed into a 640 px model input shrinks a 20 px object to
+8 px, below what the model can find. ``TiledInference`` cuts each frame
+into overlapping tiles close to the model's input size. It runs all tiles
+(plus, optionally, the whole frame for large objects) through the backend
+as one batch. The tile boxes are shifted back to frame coordinates in one
+vectorised step and merged with class-aware NMS. Merging uses intersection
+over the smaller box, so a partial box cut off at a tile edge is dropped in
+favour of the complete one from the neighbouring tile.
+
+Tiles are copied into one preallocated batch buffer that is reused for
+every frame of the same size.
+"""
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+from src.core.detections import Detections
+from src.utils.boxes import batched_nms
+from src.utils.metrics import metrics
+
+
+def tile_starts(length: int, tile: int, overlap: float) -> List[int]:
+    """Start coordinates of tiles covering ``length``; the last tile ends at the edge."""
+    if length <= tile:
+        return [0]
+    stride = max(1, int(tile * (1 - overlap)))
+    return list(range(0, length - tile, stride)) + [length - tile]
+
+
+def tile_grid(width: int, height: int, tile: int, overlap: float) -> np.ndarray:
+    """(T, 4) xyxy tile rectangles covering a width x height frame, row by row."""
+    tile_w, tile_h = min(tile, width), min(tile, height)
+    return np.array([
+        (x, y, x + tile_w, y + tile_h)
+        for y in tile_starts(height, tile, overlap)
+        for x in tile_starts(width, tile, overlap)
+    ], dtype=np.int64)
+
+
+class TiledInference:
+    """
+    Runs a backend on overlapping tiles and merges the results.
+
+    Args:
+        tile_size (int): Tile edge in pixels, ideally the model input size
+        overlap (float): Fraction of a tile shared with its neighbours (0-1)
+        full_frame (bool): Also run the whole, downscaled frame to keep large objects
+        iou_threshold (float): Overlap (intersection over smaller box) that merges boxes
+    """
+
+    def __init__(
+        self,
+        tile_size: int = 640,
+        overlap: float = 0.2,
+        full_frame: bool = True,
+        iou_threshold: float = 0.5
+    ):
+        if not 0 <= overlap < 1:
+            raise ValueError(f"Tile overlap must be in [0, 1), got {overlap}")
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.full_frame = full_frame
+        self.iou_threshold = iou_threshold
+        self._grid_shape = None
+        self._grid = None
+        self._buffer = None
+
+    def grid(self, width: int, height: int) -> np.ndarray:
+        if self._grid_shape != (width, height):
+            self._grid = tile_grid(width, height, self.tile_size, self.overlap)
+            self._grid_shape = (width, height)
+        return self._grid
+
+    def uses_full_frame(self, width: int, height: int) -> bool:
+        """Whether the whole-frame pass runs; it would repeat a single tile covering the frame."""
+        return self.full_frame and len(self.grid(width, height)) > 1
+
+    def tiles_per_frame(self, width: int, height: int) -> int:
+        return len(self.grid(width, height)) + int(self.uses_full_frame(width, height))
+
+    def predict(
+        self,
+        predict: Callable[..., List[Detections]],
+        frames: Sequence[np.ndarray],
+        conf_threshold: float = 0.5,
+        *args
+    ) -> List[Detections]:
+        """
+        Detect on every frame through ``predict`` (a backend's predict method),
+        sending the tiles of all frames as a single batch. Extra ``args`` are
+        passed on to ``predict``.
+        """
+        if not len(frames):
+            return []
+        h, w = frames[0].shape[:2]
+        if any(frame.shape[:2] != (h, w) for frame in frames):
+            # Mixed sizes cannot share a grid or buffer
+            return [
+                self.predict(predict, [frame], conf_threshold, *args)[0] for frame in frames
+            ]
+
+        grid = self.grid(w, h)
+        full_frame = self.uses_full_frame(w, h)
+        with metrics.time("tiling"):
+            tiles = self._slice(frames, grid)
+        batch = list(tiles)
+        if full_frame:
+            batch.extend(frames)
+        results = predict(batch, conf_threshold, *args)
+
+        with metrics.time("tiling"):
+            merged = []
+            per_frame = len(grid)
+            for i in range(len(frames)):
+                parts = results[i * per_frame:(i + 1) * per_frame]
+                offsets = grid[:, :2]
+                if full_frame:
+                    parts = parts + [results[len(tiles) + i]]
+                    offsets = np.vstack([offsets, [[0, 0]]])
+                merged.append(self._merge(parts, offsets))
+        metrics.gauge("tiles_per_frame", len(grid) + int(full_frame))
+        return merged
+
+    def _slice(self, frames: Sequence[np.ndarray], grid: np.ndarray) -> np.ndarray:
+        tile_w, tile_h = grid[0, 2] - grid[0, 0], grid[0, 3] - grid[0, 1]
+        # Channels, if any, are carried over, so grayscale frames tile too
+        shape = (len(frames) * len(grid), tile_h, tile_w) + frames[0].shape[2:]
+        if self._buffer is None or self._buffer.shape != shape or self._buffer.dtype != frames[0].dtype:
+            self._buffer = np.empty(shape, dtype=frames[0].dtype)
+        index = 0
+        for frame in frames:
+            for x1, y1, x2, y2 in grid:
+                self._buffer[index] = frame[y1:y2, x1:x2]
+                index += 1
+        return self._buffer
+
+    def _merge(self, parts: List[Detections], offsets: np.ndarray) -> Detections:
+        names = parts[0].names if parts else {}
+        counts = [len(part) for part in parts]
+        if not sum(counts):
+            return Detections.empty(names)
+        shift = np.repeat(np.tile(offsets, 2), counts, axis=0).astype(np.float32)
+        boxes = np.concatenate([part.boxes for part in parts]) + shift
+        scores = np.concatenate([part.scores for part in parts])
+        class_ids = np.concatenate([part.class_ids for part in parts])
+        keep = batched_nms(boxes, scores, class_ids, self.iou_threshold, metric="ios")
+        return Detections(boxes[keep], scores[keep], class_ids[keep], names)
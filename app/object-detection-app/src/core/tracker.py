@@ -0,0 +1,200 @@
+import cv2
+import numpy as np
+
+from src.core.detections import Detections
+from src.utils.boxes import box_iou, greedy_match
+from src.utils.image_processing import draw_detections
+from src.utils.metrics import metrics
+
+
+class IoUTracker:
+    """
+    SORT-style tracker with greedy IoU association and constant-velocity motion.
+
+    Track state is held in parallel arrays so prediction is a single vector
+    add. ``update`` associates a fresh set of detections with the predicted
+    tracks; ``predict`` advances every track one frame for frames where the
+    detector did not run.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 3, momentum: float = 0.6):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.momentum = momentum
+        self.names = {}
+        self.next_id = 1
+        self.reset()
+
+    def reset(self) -> None:
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocities = np.zeros((0, 4), dtype=np.float32)
+        self.anchors = np.zeros((0, 4), dtype=np.float32)
+        self.scores = np.zeros(0, dtype=np.float32)
+        self.class_ids = np.zeros(0, dtype=np.int32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int32)
+        self.frames_since_update = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def predict(self) -> Detections:
+        """
+        Advance all tracks by one frame and return the predicted boxes.
+
+        Like ``update``, only tracks matched at the last detector run are
+        returned; coasting tracks keep moving but stay hidden until they are
+        matched again or expire.
+        """
+        self.boxes += self.velocities
+        self.frames_since_update += 1
+        return self.current().filter(self.misses == 0)
+
+    def update(self, detections: Detections) -> Detections:
+        """Associate detections with tracks; returns the detections with track ids."""
+        self.names = detections.names
+        iou = box_iou(self.boxes, detections.boxes)
+        iou[self.class_ids[:, None] != detections.class_ids[None, :]] = 0
+        track_idx, det_idx = greedy_match(iou, self.iou_threshold)
+
+        # Matched tracks: snap to the detection and refresh the velocity estimate
+        if len(track_idx):
+            new_boxes = detections.boxes[det_idx]
+            steps = np.maximum(self.frames_since_update[track_idx], 1)[:, None]
+            measured = (new_boxes - self.anchors[track_idx]) / steps
+            self.velocities[track_idx] = (
+                self.momentum * measured + (1 - self.momentum) * self.velocities[track_idx]
+            )
+            self.boxes[track_idx] = new_boxes
+            self.anchors[track_idx] = new_boxes
+            self.scores[track_idx] = detections.scores[det_idx]
+            self.misses[track_idx] = 0
+            self.frames_since_update[track_idx] = 0
+
+        # Unmatched tracks age out after max_misses detector runs
+        unmatched = np.ones(len(self.ids), dtype=bool)
+        unmatched[track_idx] = False
+        self.misses[unmatched] += 1
+        self._keep(self.misses <= self.max_misses)
+
+        # Unmatched detections start new tracks
+        new = np.ones(len(detections), dtype=bool)
+        new[det_idx] = False
+        count = int(new.sum())
+        if count:
+            boxes = detections.boxes[new].astype(np.float32)
+            self.boxes = np.concatenate([self.boxes, boxes])
+            self.anchors = np.concatenate([self.anchors, boxes])
+            self.velocities = np.concatenate([self.velocities, np.zeros_like(boxes)])
+            self.scores = np.concatenate([self.scores, detections.scores[new]])
+            self.class_ids = np.concatenate([self.class_ids, detections.class_ids[new]])
+            self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + count)])
+            self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int32)])
+            self.frames_since_update = np.concatenate(
+                [self.frames_since_update, np.zeros(count, dtype=np.int32)]
+            )
+            self.next_id += count
+
+        return self.current().filter(self.misses == 0)
+
+    def current(self) -> Detections:
+        return Detections(
+            self.boxes.copy(), self.scores.copy(), self.class_ids.copy(), self.names, self.ids.copy()
+        )
+
+    def _keep(self, mask: np.ndarray) -> None:
+        for attr in ("boxes", "velocities", "anchors", "scores", "class_ids",
+                     "ids", "misses", "frames_since_update"):
+            setattr(self, attr, getattr(self, attr)[mask])
+
+
+class SceneChangeDetector:
+    """Flags large global changes by comparing tiny grayscale thumbnails."""
+
+    def __init__(self, threshold: float = 12.0, size=(32, 24)):
+        self.threshold = threshold
+        self.size = size
+        self.reference = None
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+
+    def set_reference(self, frame: np.ndarray) -> None:
+        self.reference = self.thumbnail(frame)
+
+    def changed(self, frame: np.ndarray) -> bool:
+        if self.reference is None:
+            return True
+        return float(np.abs(self.thumbnail(frame) - self.reference).mean()) > self.threshold
+
+
+class TrackingDetector:
+    """
+    Runs the detector every ``detect_interval`` frames and tracks in between.
+
+    Between detector runs boxes are propagated by an IoUTracker, so display
+    rate is decoupled from inference rate while tracks keep stable ids. A
+    cheap scene-change check forces an early detector run when the image
+    changes a lot. Exposes the same ``detect``/``process_frame`` interface as
+    ObjectDetector so it can be dropped into the existing pipeline. An optional
+    per-stream MotionGate is handed to the detector on every run.
+    """
+
+    def __init__(
+        self,
+        detector,
+        detect_interval: int = 1,
+        scene_change_threshold: float = 12.0,
+        motion_gate=None
+    ):
+        self.detector = detector
+        self.motion_gate = motion_gate
+        self.detect_interval = detect_interval
+        self.tracker = IoUTracker()
+        self.scene = SceneChangeDetector(scene_change_threshold)
+        self.frames_since_detect = 0
+        self.frame_count = 0
+        self.inference_count = 0
+
+    def set_detect_interval(self, interval: int) -> None:
+        self.detect_interval = max(1, int(interval))
+
+    def reset(self) -> None:
+        self.tracker.reset()
+        self.scene.reference = None
+        self.frames_since_detect = 0
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    @property
+    def inference_ratio(self) -> float:
+        """Fraction of frames that ran the full detector."""
+        return self.inference_count / self.frame_count if self.frame_count else 0.0
+
+    def detect(self, frame, conf_threshold=0.5) -> Detections:
+        if self.detector is None:
+            # Model still loading; frames pass through without boxes
+            return Detections.empty()
+        self.frame_count += 1
+        due = self.frames_since_detect + 1 >= self.detect_interval
+        if due or self.scene.changed(frame):
+            self.frames_since_detect = 0
+            self.inference_count += 1
+            self.scene.set_reference(frame)
+            if self.motion_gate is not None:
+                detections = self.detector.detect(frame, conf_threshold, motion_gate=self.motion_gate)
+            else:
+                detections = self.detector.detect(frame, conf_threshold)
+            return self.tracker.update(detections)
+
+        self.frames_since_detect += 1
+        with metrics.time("track"):
+            detections = self.tracker.predict()
+        metrics.gauge("detections", len(detections))
+        return detections
+
+    def process_frame(self, frame, conf_threshold=0.5):
+        detections = self.detect(frame, conf_threshold)
+        with metrics.time("draw"):
+            return draw_detections(frame, detections)
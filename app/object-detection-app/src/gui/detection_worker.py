@@ -0,0 +1,118 @@
+import time
+import logging
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from src.utils.image_processing import draw_detections
+from src.utils.metrics import metrics
+
+
+class DetectionWorker(QThread):
+    """Background thread that owns the detector and feeds finished frames to the GUI.
+
+    The worker waits for a frame newer than the last one it processed, so it
+    only does work when the camera has something new, and frames that arrive
+    while inference is running are overwritten by the capture thread and never
+    queued. A result is only emitted once the GUI has painted the
+    previous one, which keeps the Qt event queue from backing up.
+
+    Frames are processed at most at ``target_fps``; with an
+    AdaptiveController every frame's processing time is reported to it.
+    A ClipRecorder attached to the camera is triggered by the detections.
+    With a DetectionStore the detections are also logged under ``camera_name``,
+    and with a StreamServer the annotated frames are re-published under it.
+    """
+    frameReady = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(
+        self,
+        camera,
+        detector,
+        conf_threshold: float = 0.5,
+        target_fps: float = 0,
+        controller=None,
+        event_store=None,
+        stream_server=None,
+        camera_name: str = "camera",
+        parent=None
+    ):
+        super().__init__(parent)
+        self.camera = camera
+        self.detector = detector
+        self.conf_threshold = conf_threshold
+        self.controller = controller
+        self.event_store = event_store
+        self.stream_server = stream_server
+        self.camera_name = camera_name
+        self.set_target_fps(target_fps)
+        self.running = False
+        self.idle_interval = 0.005
+        self.wait_timeout = 0.1
+        self._displayed = threading.Event()
+        self._displayed.set()
+        self.logger = logging.getLogger(__name__)
+
+    def set_conf_threshold(self, value: float) -> None:
+        self.conf_threshold = value
+
+    def set_target_fps(self, fps: float) -> None:
+        """Cap the processing rate (0 = process every new frame)."""
+        self.min_frame_interval = 1.0 / fps if fps > 0 else 0.0
+        if self.controller is not None and fps > 0:
+            self.controller.set_target_fps(fps)
+
+    def frame_displayed(self) -> None:
+        """Called by the GUI once the last emitted frame has been painted."""
+        self._displayed.set()
+
+    def stop(self) -> None:
+        self.running = False
+        self._displayed.set()
+        self.wait()
+
+    def run(self) -> None:
+        self.running = True
+        self._displayed.set()
+        last_id = 0
+        next_due = 0.0
+        while self.running:
+            # Above the target rate, wait and then take whichever frame is newest
+            delay = next_due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            frame_id, frame = self.camera.wait_for_frame(last_id, timeout=self.wait_timeout)
+            if frame is None:
+                if not self.camera.running:
+                    time.sleep(self.wait_timeout)
+                continue
+            last_id = frame_id
+
+            start = time.perf_counter()
+            next_due = start + self.min_frame_interval
+            try:
+                detections = self.detector.detect(frame, self.conf_threshold)
+                recorder = getattr(self.camera, "recorder", None)
+                if recorder is not None:
+                    recorder.observe(detections)
+                if self.event_store is not None:
+                    self.event_store.add(self.camera_name, detections)
+                # The camera's frame is also read by its recorder; draw on a copy
+                with metrics.time("draw"):
+                    processed_frame = draw_detections(frame.copy(), detections)
+                if self.stream_server is not None:
+                    self.stream_server.publish(self.camera_name, processed_frame, detections)
+            except Exception as e:
+                self.logger.error(f"Detection error: {e}")
+                self.error.emit(str(e))
+                time.sleep(self.idle_interval)
+                continue
+            if self.controller is not None:
+                self.controller.update(time.perf_counter() - start)
+
+            # Drop the result if the GUI has not painted the previous one yet
+            if not self._displayed.is_set():
+                metrics.count("dropped_display_frames")
+                continue
+            self._displayed.clear()
+            self.frameReady.emit(processed_frame)
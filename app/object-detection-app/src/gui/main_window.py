@@ -1,20 +1,51 @@
+import logging
+
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QLineEdit, QStatusBar
 )
-from PyQt5.QtCore import QTimer, Qt
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtCore import QTimer, pyqtSignal
 from src.gui.widgets.VideoDisplay import VideoDisplay
+from src.gui.widgets.VideoGrid import VideoGrid
 from src.gui.widgets.controls import ControlPanel
+from src.gui.detection_worker import DetectionWorker
+from src.gui.model_loader import ModelLoader, PoolLoader
 from src.core.ESP32Camera import ESP32Camera
-from src.core.detector import ObjectDetector
+from src.core.adaptive import AdaptiveController, esp32_framesize
+from src.core.async_camera import AsyncCameraHub
+from src.core.camera_manager import CameraManager
+from src.core.event_store import DetectionStore
+from src.core.model_cache import ModelCache
+from src.core.recorder import ClipRecorder
+from src.core.stream_server import StreamServer
+from src.core.tiling import TiledInference
+from src.core.supervisor import StreamSupervisor
+from src.core.tracker import TrackingDetector
+from src.config.settings import (
+    VIDEO_WIDTH, VIDEO_HEIGHT, MOTION_GATING, MOTION_THRESHOLD, MOTION_CROP,
+    ASYNC_CAPTURE, DECODE_WORKERS, STALL_TIMEOUT, INFERENCE_WORKERS, THREADS_PER_WORKER,
+    INFERENCE_POOL_TIMEOUT,
+    MODEL_CACHE_BYTES, MODEL_CACHE_MODELS, ADAPTIVE_QUALITY, ADAPTIVE_SIZES,
+    ADAPTIVE_MAX_INTERVAL, ADAPTIVE_CAMERA_CONTROL, TILED_INFERENCE, TILE_SIZE, TILE_OVERLAP,
+    EVENT_LOGGING, EVENT_DB, EVENT_BATCH_SIZE, EVENT_MAX_PENDING,
+    STREAM_SERVER, STREAM_HOST, STREAM_PORT, STREAM_QUALITY, RECORDING, RECORD_DIR,
+    RECORD_PRE_SECONDS, RECORD_POST_SECONDS, RECORD_BUFFER_BYTES, RECORD_CLASSES
+)
+from src.utils.image_processing import MotionGate
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 class MainWindow(QMainWindow):
+    # Emitted from the camera manager thread, delivered on the GUI thread
+    cameraFrameReady = pyqtSignal(str, object)
+
     def __init__(self):
         super().__init__()
         self.initUI()
         self.setupDetector()
         self.setupCamera()
+        self.setupStats()
 
     def initUI(self):
         self.setWindowTitle("Object Detection System")
@@ -27,7 +58,9 @@ class MainWindow(QMainWindow):
         # Camera connection controls
         camera_layout = QHBoxLayout()
         self.ip_input = QLineEdit()
-        self.ip_input.setPlaceholderText("Enter ESP32-CAM IP address")
+        self.ip_input.setPlaceholderText(
+            "Enter ESP32-CAM IP address (comma-separate several for a tiled view)"
+        )
         self.connect_button = QPushButton("Connect Camera")
         self.connect_button.clicked.connect(self.toggle_camera)
         camera_layout.addWidget(self.ip_input)
@@ -38,6 +71,11 @@ class MainWindow(QMainWindow):
         self.video_display = VideoDisplay()
         layout.addWidget(self.video_display)
 
+        # Tiled display for multiple cameras
+        self.video_grid = VideoGrid()
+        self.video_grid.hide()
+        layout.addWidget(self.video_grid)
+
         # Detection controls
         self.control_panel = ControlPanel()
         layout.addWidget(self.control_panel)
@@ -47,55 +85,352 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.statusBar)
 
     def setupDetector(self):
-        try:
-            self.detector = ObjectDetector()
-            self.statusBar.showMessage("Model loaded successfully")
-        except Exception as e:
-            self.statusBar.showMessage(f"Error loading model: {str(e)}")
+        self.detector = None
+        self.model_choice = None
+        self.inference_pool = None
+        # Pool loaders still running; only the newest generation's pool is used
+        self.pool_loaders = []
+        self.pool_generation = 0
+        # Recently used models stay warm, so switching back to one is instant
+        self.model_cache = ModelCache(MODEL_CACHE_BYTES, MODEL_CACHE_MODELS)
+        self.event_store = None
+        if EVENT_LOGGING:
+            self.event_store = DetectionStore(
+                EVENT_DB, batch_size=EVENT_BATCH_SIZE, max_pending=EVENT_MAX_PENDING
+            )
+        self.stream_server = None
+        if STREAM_SERVER:
+            try:
+                self.stream_server = StreamServer(STREAM_HOST, STREAM_PORT, STREAM_QUALITY).start()
+            except OSError as e:
+                logger.error(f"Could not start the stream server: {e}")
+        # Loaders still running; only the newest request's model is applied
+        self.model_loaders = []
+        self.model_generation = 0
+        self.tracking_detector = TrackingDetector(
+            None,
+            detect_interval=self.control_panel.skip_spinbox.value(),
+            motion_gate=MotionGate(MOTION_THRESHOLD) if MOTION_GATING else None
+        )
+        self.adaptive = None
+        if ADAPTIVE_QUALITY:
+            # The detector is attached once the first model has loaded
+            self.adaptive = AdaptiveController(
+                None,
+                self.tracking_detector,
+                target_fps=self.control_panel.fps_spinbox.value(),
+                sizes=ADAPTIVE_SIZES,
+                max_interval=ADAPTIVE_MAX_INTERVAL,
+                camera_control=self.setCameraFramesize if ADAPTIVE_CAMERA_CONTROL else None
+            )
+        self.control_panel.skip_spinbox.valueChanged.connect(
+            self.adaptive.set_min_interval if self.adaptive is not None
+            else self.tracking_detector.set_detect_interval
+        )
+        self.control_panel.fps_spinbox.valueChanged.connect(self.update_target_fps)
+        self.loadDetector(self.control_panel.model_combo.currentData())
+        self.control_panel.model_combo.currentIndexChanged.connect(
+            lambda _: self.loadDetector(self.control_panel.model_combo.currentData())
+        )
+
+    def loadDetector(self, choice):
+        """Load and warm up a model in the background; the current one keeps running meanwhile."""
+        loader = ModelLoader(
+            choice, (VIDEO_WIDTH, VIDEO_HEIGHT),
+            detector_options={
+                "crop_to_motion": MOTION_CROP,
+                "tiler": TiledInference(TILE_SIZE, TILE_OVERLAP) if TILED_INFERENCE else None
+            },
+            detector=self.detector,
+            cache=self.model_cache,
+            generation=self.model_generation + 1
+        )
+        self.model_generation = loader.generation
+        loader.loaded.connect(self.onModelLoaded)
+        loader.failed.connect(self.onModelFailed)
+        loader.finished.connect(lambda: self.model_loaders.remove(loader))
+        self.model_loaders.append(loader)
+        self.control_panel.set_model_status("Loading model…")
+        loader.start()
+
+    def onModelLoaded(self, loaded, choice, seconds, generation):
+        if generation != self.model_generation:
+            return  # superseded by a newer selection
+        first = self.detector is None
+        if first:
+            self.detector = loaded
+            self.tracking_detector.detector = self.detector
+            if self.adaptive is not None:
+                self.adaptive.set_detector(self.detector)
+        else:
+            # A loader started before the first model arrived emits a whole
+            # detector; otherwise it is a backend. The swap is atomic, so
+            # running pipelines pick it up on their next frame.
+            self.detector.set_model(getattr(loaded, "backend", loaded))
+        self.model_choice = choice
+        self.control_panel.set_model_status(f"Ready ({choice['backend']}, {seconds:.1f}s)")
+        if getattr(self, "camera_manager", None) is not None:
+            self.batchDetector()
+        if first:
+            metrics.mark_startup("model_ready")
+            logger.info(f"Startup: {metrics.startup_report()}")
+
+    def onModelFailed(self, choice, message, generation):
+        if generation == self.model_generation:
+            self.control_panel.set_model_status("Failed to load")
+            self.statusBar.showMessage(f"Error loading model: {message}")
+
+    def batchDetector(self):
+        """
+        Detector for the multi-camera view.
+
+        With INFERENCE_WORKERS a process pool for the current model is started
+        in the background. The in-process detector, or the previous pool, keeps
+        serving the cameras until the new pool is ready.
+        """
+        if INFERENCE_WORKERS and self.model_choice is not None:
+            self.pool_generation += 1
+            loader = PoolLoader(
+                INFERENCE_WORKERS, THREADS_PER_WORKER, self.model_choice,
+                INFERENCE_POOL_TIMEOUT, generation=self.pool_generation
+            )
+            loader.loaded.connect(self.onPoolLoaded)
+            loader.failed.connect(self.onPoolFailed)
+            loader.finished.connect(lambda: self.pool_loaders.remove(loader))
+            self.pool_loaders.append(loader)
+            loader.start()
+        if self.inference_pool is not None:
+            return self.inference_pool
+        if self.camera_manager is not None and self.camera_manager.detector is not self.detector:
+            self.camera_manager.set_detector(self.detector)
+        return self.detector
+
+    def onPoolLoaded(self, pool, generation):
+        if generation != self.pool_generation or self.camera_manager is None:
+            pool.close()  # superseded, or the cameras were disconnected meanwhile
+            return
+        # Waits for the batch in flight, so the old pool is idle when closed
+        self.camera_manager.set_detector(pool)
+        self.stopInferencePool(invalidate=False)
+        self.inference_pool = pool
+
+    def onPoolFailed(self, message, generation):
+        if generation == self.pool_generation:
+            self.statusBar.showMessage(f"Inference pool failed, using one process: {message}")
+            if self.camera_manager is not None and self.inference_pool is not None:
+                self.camera_manager.set_detector(self.detector)
+                self.stopInferencePool()
+
+    def stopInferencePool(self, invalidate=True):
+        """Close the current pool; with ``invalidate`` pools still starting are discarded too."""
+        if invalidate:
+            self.pool_generation += 1
+        if self.inference_pool is not None:
+            self.inference_pool.close()
+        self.inference_pool = None
 
     def setupCamera(self):
-        self.camera = ESP32Camera()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame)
+        self.camera = ESP32Camera(decode_size=self.decodeSize())
+        self.worker = None
+        self.supervisor = None
+        self.camera_manager = None
+        self.camera_hub = None
+        self.cameraFrameReady.connect(self.video_grid.show_frame)
+        self.control_panel.conf_slider.valueChanged.connect(self.update_conf_threshold)
+
+    def decodeSize(self):
+        """Size cameras decode to; tiling needs the full sensor resolution to find small objects."""
+        return None if TILED_INFERENCE else (VIDEO_WIDTH, VIDEO_HEIGHT)
+
+    def update_conf_threshold(self, value):
+        if self.worker is not None:
+            self.worker.set_conf_threshold(value / 100)
+        if self.camera_manager is not None:
+            self.camera_manager.conf_threshold = value / 100
+
+    def update_target_fps(self, value):
+        if self.worker is not None:
+            self.worker.set_target_fps(value)
+        elif self.adaptive is not None:
+            self.adaptive.set_target_fps(value)
+
+    def setCameraFramesize(self, size):
+        """Called off the GUI thread by the adaptive controller."""
+        self.camera.set_control("framesize", esp32_framesize(size))
+
+    def setupStats(self):
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.refresh_stats)
+        self.stats_timer.start(500)
+
+    def refresh_stats(self):
+        memory = metrics.sample_memory()
+        self.control_panel.update_stats(
+            metrics.fps(),
+            int(metrics.gauges.get("detections", 0)),
+            metrics.stage_mean("preprocess", "inference", "postprocess", "track", "draw"),
+            memory.get("cuda_percent", memory.get("rss_percent", 0))
+        )
+        if self.supervisor is not None:
+            stats = self.supervisor.stats()
+            state = f"up {int(stats['uptime_s'])}s" if stats["connected"] else "reconnecting"
+            self.statusBar.showMessage(
+                f"ESP32-CAM {state}, {stats['reconnects']} reconnects, "
+                f"{stats['fps']:.1f} fps received"
+            )
+
+    def startWorker(self):
+        self.tracking_detector.reset()
+        self.worker = DetectionWorker(
+            self.camera,
+            self.tracking_detector,
+            conf_threshold=self.control_panel.conf_slider.value() / 100,
+            target_fps=self.control_panel.fps_spinbox.value(),
+            controller=self.adaptive,
+            event_store=self.event_store,
+            stream_server=self.stream_server,
+            camera_name=self.camera.address or "camera"
+        )
+        self.worker.frameReady.connect(self.update_frame)
+        self.worker.error.connect(
+            lambda msg: self.statusBar.showMessage(f"Detection error: {msg}")
+        )
+        self.worker.start()
+
+    def stopWorker(self):
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+
+    def connectCameras(self, addresses):
+        self.camera_manager = CameraManager(
+            self.batchDetector(),
+            conf_threshold=self.control_panel.conf_slider.value() / 100
+        )
+        if ASYNC_CAPTURE:
+            self.camera_hub = AsyncCameraHub(DECODE_WORKERS)
+        connected = []
+        for address in addresses:
+            if self.camera_hub is not None:
+                camera = self.camera_hub.camera(decode_size=self.decodeSize())
+            else:
+                camera = ESP32Camera(decode_size=self.decodeSize())
+            if self.camera_manager.add_camera(address, address, camera):
+                self.camera_manager.subscribe(address, self.cameraFrameReady.emit)
+                self.attachRecorder(camera, f"camera{len(connected)}")
+                connected.append(address)
+        if not connected:
+            self.camera_manager = None
+            self.stopCameraHub()
+            self.stopInferencePool()
+            return False
+
+        self.video_grid.set_cameras(connected)
+        self.video_display.hide()
+        self.video_grid.show()
+        self.camera_manager.start()
+        return len(connected)
+
+    def stopSupervisor(self):
+        if self.supervisor is not None:
+            self.supervisor.stop()
+            self.supervisor = None
+
+    def stopCameraHub(self):
+        if self.camera_hub is not None:
+            self.camera_hub.stop()
+            self.camera_hub = None
+
+    def attachRecorder(self, camera, prefix):
+        """Keep pre-event clips of ``camera`` when RECORDING is set."""
+        if RECORDING:
+            camera.attach_recorder(ClipRecorder(
+                RECORD_DIR, RECORD_PRE_SECONDS, RECORD_POST_SECONDS,
+                RECORD_BUFFER_BYTES, RECORD_CLASSES, prefix=prefix
+            ))
+
+    def detachRecorder(self, camera):
+        recorder = getattr(camera, "recorder", None)
+        if recorder is not None:
+            camera.attach_recorder(None)
+            recorder.close()
+
+    def disconnectCameras(self):
+        for camera in list(self.camera_manager.cameras.values()):
+            self.detachRecorder(camera)
+        self.camera_manager.stop()
+        self.camera_manager = None
+        self.stopCameraHub()
+        self.stopInferencePool()
+        self.video_grid.clear()
+        self.video_grid.hide()
+        self.video_display.show()
 
     def toggle_camera(self):
-        if not self.camera.is_connected:
+        if self.camera_manager is not None:
+            self.disconnectCameras()
+            self.connect_button.setText("Connect Camera")
+            self.statusBar.showMessage("Disconnected from ESP32-CAMs")
+            return
+
+        addresses = [a.strip() for a in self.ip_input.text().split(",") if a.strip()]
+        if len(addresses) > 1:
+            connected = self.connectCameras(addresses)
+            if connected:
+                self.connect_button.setText("Disconnect")
+                self.statusBar.showMessage(
+                    f"Connected to {connected} of {len(addresses)} ESP32-CAMs"
+                )
+            else:
+                self.statusBar.showMessage("Failed to connect to ESP32-CAMs")
+            return
+
+        if self.supervisor is None:
             ip = self.ip_input.text()
             if self.camera.connect(ip):
                 self.connect_button.setText("Disconnect")
                 self.statusBar.showMessage("Connected to ESP32-CAM")
-                self.timer.start(30)  # 30ms = ~33fps
+                # Reconnects in the background; the worker keeps waiting for frames
+                self.supervisor = StreamSupervisor(self.camera, ip, STALL_TIMEOUT)
+                self.supervisor.start()
+                self.attachRecorder(self.camera, "camera")
+                self.startWorker()
             else:
                 self.statusBar.showMessage("Failed to connect to ESP32-CAM")
         else:
+            self.stopSupervisor()
+            self.stopWorker()
+            self.detachRecorder(self.camera)
             self.camera.disconnect()
-            self.timer.stop()
             self.connect_button.setText("Connect Camera")
             self.statusBar.showMessage("Disconnected from ESP32-CAM")
             self.video_display.clear()
 
-    def update_frame(self):
-        if not self.camera.is_connected:
-            return
-
-        success, frame = self.camera.get_frame()
-        if not success:
+    def update_frame(self, processed_frame):
+        # Runs on the GUI thread; inference already happened in the worker
+        if self.worker is None:
             return
 
-        # Process frame with detector
-        processed_frame = self.detector.process_frame(
-            frame,
-            conf_threshold=self.control_panel.conf_slider.value() / 100
-        )
-
-        # Convert to Qt format and display
-        h, w, ch = processed_frame.shape
-        qt_image = QImage(processed_frame.data, w, h, ch * w, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qt_image)
-        scaled_pixmap = pixmap.scaled(self.video_display.size(), Qt.KeepAspectRatio)
-        self.video_display.setPixmap(scaled_pixmap)
+        # Wrap the BGR frame in a QImage without copying; scaling happens at paint time
+        with metrics.time("qt_convert"):
+            self.video_display.show_frame(processed_frame)
+        metrics.mark_frame()
+        self.worker.frame_displayed()
 
     def closeEvent(self, event):
-        if self.camera.is_connected:
+        for loader in list(self.model_loaders) + list(self.pool_loaders):
+            loader.wait()
+        self.stopSupervisor()
+        self.stopWorker()
+        self.detachRecorder(self.camera)
+        if self.camera_manager is not None:
+            self.disconnectCameras()
+        self.stopCameraHub()
+        self.stopInferencePool()
+        if self.camera.running:
             self.camera.disconnect()
+        if self.event_store is not None:
+            self.event_store.close()
+        if self.stream_server is not None:
+            self.stream_server.stop()
         event.accept()
\ No newline at end of file
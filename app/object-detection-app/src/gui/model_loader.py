@@ -0,0 +1,102 @@
+import time
+import logging
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class ModelLoader(QThread):
+    """Builds and warms up a model off the GUI thread.
+
+    The detector module (and through it torch/ultralytics or the ONNX
+    runtimes) is only imported here, so the window can be shown before any
+    of it is loaded. A few dummy inferences at the display resolution run
+    before the model is handed over, so the first real frame is not the
+    one that pays for lazy initialisation.
+
+    Without a ``detector`` a new ObjectDetector is emitted. With one, only
+    the backend for ``choice`` is prepared (or fetched from the detector's
+    model cache) and emitted; the receiver swaps it in with ``set_model``.
+
+    ``generation`` is emitted with the result, so the receiver can tell
+    whether a newer model has been requested since, whatever order loaders
+    finish in.
+    """
+    loaded = pyqtSignal(object, object, float, int)
+    failed = pyqtSignal(object, str, int)
+
+    def __init__(
+        self,
+        choice,
+        frame_size,
+        warmup_runs: int = 2,
+        detector_options=None,
+        detector=None,
+        cache=None,
+        generation=0,
+        parent=None
+    ):
+        super().__init__(parent)
+        self.choice = choice
+        self.frame_size = frame_size
+        self.warmup_runs = warmup_runs
+        self.detector_options = detector_options or {}
+        self.detector = detector
+        self.cache = cache
+        self.generation = generation
+        self.logger = logging.getLogger(__name__)
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        try:
+            if self.detector is not None:
+                result = self.detector.load_model(
+                    **self.choice, warmup_size=self.frame_size, warmup_runs=self.warmup_runs
+                )
+            else:
+                from src.core.detector import ObjectDetector
+
+                result = ObjectDetector(**self.choice, cache=self.cache, **self.detector_options)
+                result.warmup(*self.frame_size, runs=self.warmup_runs)
+        except Exception as e:
+            self.logger.error(f"Model load failed: {e}")
+            self.failed.emit(self.choice, str(e), self.generation)
+            return
+        seconds = time.perf_counter() - start
+        self.logger.info(f"Model ready in {seconds:.2f}s")
+        self.loaded.emit(result, self.choice, seconds, self.generation)
+
+
+class PoolLoader(QThread):
+    """Starts an InferencePool off the GUI thread.
+
+    Spawning the workers and waiting for each to load its model takes as
+    long as a model load per process, so it must not run on the GUI thread.
+    ``generation`` is handed back with the result so the receiver can tell
+    whether a newer pool has been requested since.
+    """
+    loaded = pyqtSignal(object, int)
+    failed = pyqtSignal(str, int)
+
+    def __init__(self, workers, threads_per_worker, detector_kwargs, start_timeout,
+                 generation=0, parent=None):
+        super().__init__(parent)
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.detector_kwargs = detector_kwargs
+        self.start_timeout = start_timeout
+        self.generation = generation
+        self.logger = logging.getLogger(__name__)
+
+    def run(self) -> None:
+        from src.core.inference_pool import InferencePool
+
+        try:
+            pool = InferencePool(
+                self.workers, self.threads_per_worker,
+                detector_kwargs=self.detector_kwargs, start_timeout=self.start_timeout
+            )
+        except Exception as e:
+            self.logger.error(f"Inference pool failed to start: {e}")
+            self.failed.emit(str(e), self.generation)
+            return
+        self.loaded.emit(pool, self.generation)
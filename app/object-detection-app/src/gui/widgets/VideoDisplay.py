@@ -1,14 +1,29 @@
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+import cv2
+import numpy as np
 from PyQt5.QtWidgets import QLabel, QSizePolicy
-from PyQt5.QtCore import Qt, QSize, pyqtSlot
-from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QPaintEvent
+from PyQt5.QtCore import Qt, QSize, QRect, pyqtSlot
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QPaintEvent, QImage
+
+# Qt >= 5.14 can read BGR frames directly; older builds need a colour swap
+FORMAT_BGR888 = getattr(QImage, "Format_BGR888", None)
 
 class VideoDisplay(QLabel):
-    """Video display widget for showing camera feed"""
+    """Video display widget for showing camera feed
+
+    Frames are wrapped in a QImage that borrows the array's memory and are
+    painted straight into the widget, scaled by the painter with a fast
+    transform. No QPixmap is built and nothing is copied per frame, except
+    the colour swap into a reused buffer on Qt builds without Format_BGR888.
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._frame = None
+        self._image = None
+        self._target = None
+        self._rgb_buffer = None
         self.initUI()
         
     def initUI(self) -> None:
@@ -37,10 +52,50 @@ class VideoDisplay(QLabel):
     def sizeHint(self) -> QSize:
         return QSize(800, 600)
 
+    def show_frame(self, frame: np.ndarray) -> None:
+        """Display a BGR frame; the array must not be modified until the next frame."""
+        frame = np.ascontiguousarray(frame)
+        h, w = frame.shape[:2]
+        if FORMAT_BGR888 is None:
+            if self._rgb_buffer is None or self._rgb_buffer.shape != frame.shape:
+                self._rgb_buffer = np.empty_like(frame)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+            image_format = QImage.Format_RGB888
+        else:
+            image_format = FORMAT_BGR888
+
+        if self._image is None:
+            self.setText("")
+        elif (self._image.width(), self._image.height()) != (w, h):
+            self._target = None
+        # QImage only borrows the buffer, so keep the array alive while it is shown
+        self._frame = frame
+        self._image = QImage(frame.data, w, h, frame.strides[0], image_format)
+        self.update()
+
+    def _target_rect(self) -> QRect:
+        if self._target is None:
+            area = self.contentsRect()
+            size = self._image.size().scaled(area.size(), Qt.KeepAspectRatio)
+            self._target = QRect(
+                area.x() + (area.width() - size.width()) // 2,
+                area.y() + (area.height() - size.height()) // 2,
+                size.width(),
+                size.height()
+            )
+        return self._target
+
+    def resizeEvent(self, event) -> None:
+        self._target = None
+        super().resizeEvent(event)
+
     def paintEvent(self, event: QPaintEvent) -> None:
         super().paintEvent(event)
-        
-        if not self.pixmap():
+
+        if self._image is not None:
+            painter = QPainter(self)
+            painter.drawImage(self._target_rect(), self._image)
+        elif not self.pixmap():
             painter = QPainter(self)
             painter.setPen(QPen(QColor('#666666')))
             painter.drawText(
@@ -51,5 +106,8 @@ class VideoDisplay(QLabel):
     
     @pyqtSlot()
     def clear(self) -> None:
+        self._frame = None
+        self._image = None
+        self._target = None
         super().clear()
         self.setText("No video input")
\ No newline at end of file
@@ -0,0 +1,36 @@
+import math
+
+from PyQt5.QtWidgets import QWidget, QGridLayout, QSizePolicy
+
+from src.gui.widgets.VideoDisplay import VideoDisplay
+
+class VideoGrid(QWidget):
+    """Tiled view with one VideoDisplay per camera"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tiles = {}
+        self.grid = QGridLayout(self)
+        self.grid.setSpacing(4)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def set_cameras(self, camera_ids) -> None:
+        self.clear()
+        columns = max(1, math.ceil(math.sqrt(len(camera_ids))))
+        for index, camera_id in enumerate(camera_ids):
+            tile = VideoDisplay()
+            tile.setMinimumSize(160, 120)
+            tile.setText(f"{camera_id}: no video input")
+            self.grid.addWidget(tile, index // columns, index % columns)
+            self.tiles[camera_id] = tile
+
+    def show_frame(self, camera_id, frame) -> None:
+        tile = self.tiles.get(camera_id)
+        if tile is None:
+            return
+        tile.show_frame(frame)
+
+    def clear(self) -> None:
+        for tile in self.tiles.values():
+            self.grid.removeWidget(tile)
+            tile.deleteLater()
+        self.tiles = {}
@@ -5,6 +5,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+from src.config.settings import MODEL_CHOICES, INFERENCE_BACKEND, DETECT_INTERVAL
 
 class ControlPanel(QWidget):
     def __init__(self, parent=None):
@@ -43,12 +44,19 @@ class ControlPanel(QWidget):
         # Model dropdown
         model_type_label = QLabel("Select Model:")
         self.model_combo = QComboBox()
-        self.model_combo.addItem("YOLOv8")
-        self.model_combo.addItem("YOLOv8-nano")
-        self.model_combo.addItem("YOLOv8-small")
+        for label, choice in MODEL_CHOICES.items():
+            self.model_combo.addItem(label, choice)
+        backends = [choice["backend"] for choice in MODEL_CHOICES.values()]
+        if INFERENCE_BACKEND in backends:
+            self.model_combo.setCurrentIndex(backends.index(INFERENCE_BACKEND))
         model_grid.addWidget(model_type_label, 0, 0)
         model_grid.addWidget(self.model_combo, 0, 1)
         
+        # Loading state of the selected model
+        self.model_status = QLabel("Loading model…")
+        model_grid.addWidget(QLabel("Status:"), 1, 0)
+        model_grid.addWidget(self.model_status, 1, 1)
+        
         detection_layout.addLayout(model_grid)
         
         # Add separator
@@ -90,6 +98,16 @@ class ControlPanel(QWidget):
         fps_layout.addWidget(self.fps_spinbox)
         detection_layout.addLayout(fps_layout)
         
+        # Frame skipping: run the model every N frames, track in between
+        skip_layout = QHBoxLayout()
+        skip_label = QLabel("Detect Every N Frames:")
+        self.skip_spinbox = QSpinBox()
+        self.skip_spinbox.setRange(1, 30)
+        self.skip_spinbox.setValue(DETECT_INTERVAL)
+        skip_layout.addWidget(skip_label)
+        skip_layout.addWidget(self.skip_spinbox)
+        detection_layout.addLayout(skip_layout)
+        
         layout.addWidget(detection_group)
         
         # Statistics group
@@ -114,7 +132,7 @@ class ControlPanel(QWidget):
         
         layout.addWidget(stats_group)
         
-        # GPU Memory usage
+        # GPU memory usage (process RAM share when no GPU is in use)
         memory_label = QLabel("GPU Memory Usage:")
         layout.addWidget(memory_label)
         
@@ -174,6 +192,9 @@ class ControlPanel(QWidget):
             }
         """)
     
+    def set_model_status(self, text):
+        self.model_status.setText(text)
+    
     def update_stats(self, fps, detections, process_time, memory_usage):
         """Update detection statistics"""
         self.fps_label.setText(f"Current FPS: {fps:.1f}")
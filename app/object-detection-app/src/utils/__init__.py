@@ -1,3 +1 @@
-Sure, here's the content for the file: /object-detection-app/object-detection-app/src/utils/__init__.py
-
 # This file is intentionally left blank.
\ No newline at end of file
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """
+    Convert center-format boxes to corner format.
+
+    Args:
+        boxes (np.ndarray): (N, 4) array of (cx, cy, w, h)
+
+    Returns:
+        np.ndarray: (N, 4) array of (x1, y1, x2, y2)
+    """
+    out = np.empty_like(boxes)
+    half_w = boxes[:, 2] / 2
+    half_h = boxes[:, 3] / 2
+    out[:, 0] = boxes[:, 0] - half_w
+    out[:, 1] = boxes[:, 1] - half_h
+    out[:, 2] = boxes[:, 0] + half_w
+    out[:, 3] = boxes[:, 1] + half_h
+    return out
+
+def box_area(boxes: np.ndarray) -> np.ndarray:
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of xyxy boxes.
+
+    Args:
+        a (np.ndarray): (N, 4) boxes
+        b (np.ndarray): (M, 4) boxes
+
+    Returns:
+        np.ndarray: (N, M) IoU matrix
+    """
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    union = box_area(a)[:, None] + box_area(b)[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+def nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    iou_threshold: float = 0.45,
+    metric: str = "iou"
+) -> np.ndarray:
+    """
+    Greedy non-maximum suppression.
+
+    Args:
+        boxes (np.ndarray): (N, 4) xyxy boxes
+        scores (np.ndarray): (N,) scores
+        iou_threshold (float): Boxes overlapping a kept box by more than this are dropped
+        metric (str): "iou", or "ios" (intersection over the smaller box), which
+            also suppresses partial boxes lying mostly inside a kept one
+
+    Returns:
+        np.ndarray: Indices of kept boxes, highest score first
+    """
+    order = np.argsort(-scores, kind="stable")
+    areas = box_area(boxes)
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        top_left = np.maximum(boxes[i, :2], boxes[rest, :2])
+        bottom_right = np.minimum(boxes[i, 2:], boxes[rest, 2:])
+        wh = np.clip(bottom_right - top_left, 0, None)
+        inter = wh[:, 0] * wh[:, 1]
+        if metric == "ios":
+            denominator = np.minimum(areas[i], areas[rest])
+        else:
+            denominator = areas[i] + areas[rest] - inter
+        iou = inter / np.maximum(denominator, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+def batched_nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    iou_threshold: float = 0.45,
+    metric: str = "iou"
+) -> np.ndarray:
+    """
+    Class-aware NMS in a single pass.
+
+    Boxes of different classes are shifted apart by a per-class offset so they
+    can never overlap, which lets one NMS call handle every class at once.
+
+    Returns:
+        np.ndarray: Indices of kept boxes, highest score first
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = class_ids.astype(boxes.dtype)[:, None] * (boxes.max() + 1)
+    return nms(boxes + offsets, scores, iou_threshold, metric)
+
+def greedy_match(iou: np.ndarray, iou_threshold: float = 0.5):
+    """
+    One-to-one assignment by repeatedly taking the highest remaining IoU.
+
+    Args:
+        iou (np.ndarray): (N, M) IoU matrix, modified in place
+        iou_threshold (float): Minimum IoU for a pair to match
+
+    Returns:
+        tuple: (rows, cols) index arrays of matched pairs
+    """
+    rows, cols = [], []
+    if iou.size:
+        while True:
+            i, j = np.unravel_index(np.argmax(iou), iou.shape)
+            if iou[i, j] <= 0 or iou[i, j] < iou_threshold:
+                break
+            rows.append(i)
+            cols.append(j)
+            iou[i, :] = 0
+            iou[:, j] = 0
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+def match_boxes(
+    boxes_a: np.ndarray,
+    classes_a: np.ndarray,
+    boxes_b: np.ndarray,
+    classes_b: np.ndarray,
+    iou_threshold: float = 0.5
+) -> int:
+    """
+    Count one-to-one matches between two detection sets.
+
+    A pair matches when the classes agree and IoU reaches iou_threshold;
+    pairs are taken greedily in order of decreasing IoU.
+
+    Returns:
+        int: Number of matched pairs
+    """
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return 0
+    iou = box_iou(boxes_a, boxes_b)
+    iou[classes_a[:, None] != classes_b[None, :]] = 0
+    return len(greedy_match(iou, iou_threshold)[0])
@@ -1,6 +1,21 @@
 import cv2
 import numpy as np
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional, Union
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+# IMREAD flags for libjpeg's DCT-domain scaled decoding, keyed by denominator
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
 
 def resize_image(image: np.ndarray, width: int, height: int) -> np.ndarray:
     """
@@ -81,8 +96,230 @@ def draw_detection_box(
     
     return image
 
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read the dimensions of a JPEG from its SOF header without decoding it.
+    
+    Args:
+        data (bytes): JPEG bytes
+    
+    Returns:
+        tuple: (width, height), or None if no SOF marker was found
+    """
+    i, n = 2, len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in _SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + ((data[i + 2] << 8) | data[i + 3])
+    return None
+
+def reduced_decode_scale(
+    source_size: Tuple[int, int],
+    target_size: Optional[Tuple[int, int]]
+) -> int:
+    """
+    Pick the largest libjpeg scale denominator that still covers the target.
+    
+    Args:
+        source_size (tuple): Encoded size (width, height)
+        target_size (tuple): Size the consumer needs (width, height)
+    
+    Returns:
+        int: One of 1, 2, 4 or 8
+    """
+    if target_size is None:
+        return 1
+    for scale in (8, 4, 2):
+        if (source_size[0] // scale >= target_size[0]
+                and source_size[1] // scale >= target_size[1]):
+            return scale
+    return 1
+
+def decode_jpeg(
+    data: bytes,
+    target_size: Optional[Tuple[int, int]] = None
+) -> Optional[np.ndarray]:
+    """
+    Decode a JPEG to BGR, at reduced resolution when that still covers target_size.
+    
+    Scaling happens inside the IDCT, so a 1/4 decode is several times cheaper
+    than a full decode followed by a resize. Uses TurboJPEG when installed and
+    OpenCV's IMREAD_REDUCED_* flags otherwise.
+    
+    Args:
+        data (bytes): JPEG bytes
+        target_size (tuple): Minimum output size (width, height), or None for full size
+    
+    Returns:
+        np.ndarray: Decoded BGR image, or None if decoding failed
+    """
+    scale = 1
+    if target_size is not None:
+        source_size = jpeg_size(data)
+        if source_size is not None:
+            scale = reduced_decode_scale(source_size, target_size)
+
+    if _turbo is not None:
+        try:
+            return _turbo.decode(data, pixel_format=TJPF_BGR, scaling_factor=(1, scale))
+        except Exception:
+            pass
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    return cv2.imdecode(buffer, _REDUCED_FLAGS[scale])
+
+# Per-class box colours (BGR), indexed by class id modulo the palette length
+PALETTE = np.array([
+    (56, 56, 255), (151, 157, 255), (31, 112, 255), (29, 178, 255), (49, 210, 207),
+    (10, 249, 72), (23, 204, 146), (134, 219, 61), (52, 147, 26), (187, 212, 0),
+    (168, 153, 44), (255, 194, 0), (147, 69, 52), (255, 115, 100), (236, 24, 0),
+    (255, 56, 132), (133, 0, 82), (255, 56, 203), (200, 149, 255), (199, 55, 255),
+], dtype=np.uint8)
+
+class DetectionRenderer:
+    """
+    Draws a whole Detections result in place using NumPy slicing.
+    
+    Box outlines are written as four slice assignments per box, with all
+    coordinates clipped in one vectorised step. Label text is not rasterised
+    per frame: each label ("person 0.87", plus "#12 " for tracks) is drawn once
+    with OpenCV into a small sprite that already has the class colour as
+    background, cached per (text, colour), and copied into the frame. Scores
+    are shown with two decimals, so a class needs at most 101 label sprites.
+    Once the cache is warm nothing is allocated per frame, and the frame is
+    drawn on in place rather than copied.
+    
+    Args:
+        thickness (int): Box line and text thickness
+        font_scale (float): Label font scale
+        palette (np.ndarray): (K, 3) BGR colours indexed by class id modulo K
+        max_sprites (int): Cache size after which sprites are rebuilt from scratch
+    """
+    
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    
+    def __init__(
+        self,
+        thickness: int = 2,
+        font_scale: float = 0.5,
+        palette: np.ndarray = PALETTE,
+        max_sprites: int = 4096
+    ):
+        self.thickness = thickness
+        self.font_scale = font_scale
+        self.palette = np.asarray(palette, dtype=np.uint8)
+        self.max_sprites = max_sprites
+        (_, self.text_height), self.baseline = cv2.getTextSize(
+            "Ag", self.font, font_scale, thickness
+        )
+        self.label_height = self.text_height + self.baseline + 5
+        self._sprites = {}
+    
+    def sprite(self, text: str, color: Tuple[int, int, int]) -> np.ndarray:
+        """White text on a colour background, label_height pixels tall."""
+        key = (text, color)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            if len(self._sprites) >= self.max_sprites:
+                self._sprites.clear()
+            (width, _), _ = cv2.getTextSize(text, self.font, self.font_scale, self.thickness)
+            sprite = np.empty((self.label_height, width, 3), dtype=np.uint8)
+            sprite[:] = color
+            cv2.putText(
+                sprite, text, (0, self.text_height), self.font, self.font_scale,
+                (255, 255, 255), self.thickness
+            )
+            self._sprites[key] = sprite
+        return sprite
+    
+    def draw(
+        self,
+        image: np.ndarray,
+        detections,
+        color: Optional[Tuple[int, int, int]] = None
+    ) -> np.ndarray:
+        """Draw every box and label onto image; color overrides the palette."""
+        if not len(detections):
+            return image
+        h, w = image.shape[:2]
+        t = self.thickness
+        label_height = self.label_height
+        boxes = np.clip(detections.boxes.astype(np.int32), 0, (w, h, w, h))
+        if color is None:
+            colors = self.palette[detections.class_ids % len(self.palette)]
+        else:
+            colors = np.broadcast_to(np.asarray(color, dtype=np.uint8), (len(boxes), 3))
+        
+        # Python scalars make the per-box loop several times cheaper than NumPy ones
+        names = detections.names
+        track_ids = detections.track_ids.tolist() if detections.track_ids is not None else None
+        rows = zip(
+            boxes.tolist(), colors, colors.tolist(),
+            detections.class_ids.tolist(), detections.scores.tolist()
+        )
+        for i, ((a, b, c, d), bgr, key, class_id, score) in enumerate(rows):
+            if c <= a or d <= b:
+                continue
+            image[b:b + t, a:c] = bgr
+            image[max(d - t, b):d, a:c] = bgr
+            image[b:d, a:a + t] = bgr
+            image[b:d, max(c - t, a):c] = bgr
+            
+            key = tuple(key)
+            label = f"{names.get(class_id, class_id)} {score:.2f}"
+            tokens = (f"#{track_ids[i]} ", label) if track_ids is not None else (label,)
+            # Labels sit above the box, or just inside it at the top of the frame
+            y = b - label_height if b >= label_height else b
+            height = min(label_height, h - y)
+            x = a
+            for token in tokens:
+                sprite = self.sprite(token, key)
+                width = sprite.shape[1]
+                if height == label_height and x + width <= w:
+                    image[y:y + height, x:x + width] = sprite
+                else:
+                    width = min(width, w - x)
+                    image[y:y + height, x:x + width] = sprite[:height, :width]
+                x += width
+                if x >= w:
+                    break
+        return image
+
+_renderer = DetectionRenderer()
+
+def draw_detections(
+    image: np.ndarray,
+    detections,
+    color: Optional[Tuple[int, int, int]] = None,
+    thickness: int = 2
+) -> np.ndarray:
+    """
+    Draw every box of a Detections result on image.
+    
+    Args:
+        image (np.ndarray): Input image, drawn on in place
+        detections (Detections): Boxes, scores and class ids for the image
+        color (tuple): Box color in BGR; None colours each class from PALETTE
+        thickness (int): Line thickness
+    
+    Returns:
+        np.ndarray: Image with drawn detections
+    """
+    global _renderer
+    if _renderer.thickness != thickness:
+        _renderer = DetectionRenderer(thickness)
+    return _renderer.draw(image, detections, color)
+
 def preprocess_frame(
-    frame: np.ndarray,
+    frame: Union[np.ndarray, bytes],
     target_size: Tuple[int, int] = (640, 360),
     normalize: bool = True
 ) -> np.ndarray:
@@ -90,13 +327,19 @@ def preprocess_frame(
     Preprocess frame for inference.
     
     Args:
-        frame (np.ndarray): Input frame
+        frame (np.ndarray | bytes): Input frame, or raw JPEG bytes which are
+            decoded straight to the smallest scale that covers target_size
         target_size (tuple): Target size (width, height)
         normalize (bool): Whether to normalize pixel values
     
     Returns:
         np.ndarray: Preprocessed frame
     """
+    if isinstance(frame, (bytes, bytearray, memoryview)):
+        frame = decode_jpeg(frame, target_size)
+        if frame is None:
+            raise ValueError("Could not decode JPEG frame")
+
     # Resize frame
     resized_frame = resize_image(frame, target_size[0], target_size[1])
     
@@ -159,4 +402,103 @@ def create_overlay(
         cv2.LINE_AA
     )
     
-    return image
\ No newline at end of file
+    return image
+
+class MotionGate:
+    """
+    Cheap change detector used to skip inference on static scenes.
+    
+    Frames are downscaled to a small grayscale image and compared against a
+    running-average background. A frame passes the gate when the fraction of
+    changed pixels exceeds threshold; the changed regions are available as
+    full-resolution ROIs for cropped inference.
+    
+    Args:
+        threshold (float): Fraction of changed pixels needed to pass the gate
+        pixel_threshold (int): Per-pixel intensity difference counted as change
+        width (int): Width of the downscaled analysis image
+        learning_rate (float): Background update rate (0-1)
+        min_area (int): Smallest changed blob, in downscaled pixels, reported as ROI
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.002,
+        pixel_threshold: int = 25,
+        width: int = 160,
+        learning_rate: float = 0.05,
+        min_area: int = 4
+    ):
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.width = width
+        self.learning_rate = learning_rate
+        self.min_area = min_area
+        self.background = None
+        self.changed_fraction = 0.0
+        self.rois: List[Tuple[int, int, int, int]] = []
+        # (width, height) of the last frame, to clip ROIs to
+        self.frame_size = (0, 0)
+        # Results of the last frame that passed the gate, reused while static
+        self.last_result = None
+        self._kernel = np.ones((3, 3), dtype=np.uint8)
+    
+    def reset(self) -> None:
+        self.background = None
+        self.rois = []
+        self.last_result = None
+    
+    def update(self, frame: np.ndarray) -> bool:
+        """
+        Feed a frame and report whether it changed enough to run the model.
+        
+        Args:
+            frame (np.ndarray): BGR frame
+        
+        Returns:
+            bool: True if the change passes the threshold
+        """
+        h, w = frame.shape[:2]
+        self.frame_size = (w, h)
+        height = max(1, round(h * self.width / w))
+        small = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        
+        if self.background is None or self.background.shape != gray.shape:
+            self.background = gray.astype(np.float32)
+            self.changed_fraction = 1.0
+            self.rois = [(0, 0, w, h)]
+            return True
+        
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        changed = (diff > self.pixel_threshold).astype(np.uint8)
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+        
+        self.changed_fraction = float(np.count_nonzero(changed)) / changed.size
+        if self.changed_fraction < self.threshold:
+            self.rois = []
+            return False
+        
+        # Dilation only joins nearby changes into ROIs; it is not counted above
+        mask = cv2.dilate(changed, self._kernel)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        scale = w / self.width
+        self.rois = [
+            (
+                int(x * scale), int(y * scale),
+                min(w, int((x + bw) * scale) + 1), min(h, int((y + bh) * scale) + 1)
+            )
+            for x, y, bw, bh, area in stats[1:count]
+            if area >= self.min_area
+        ]
+        return True
+    
+    def roi_union(self, padding: int = 32) -> Optional[Tuple[int, int, int, int]]:
+        """Bounding box of all changed regions, padded, in frame coordinates."""
+        if not self.rois:
+            return None
+        rois = np.array(self.rois)
+        x1, y1 = rois[:, :2].min(axis=0) - padding
+        x2, y2 = rois[:, 2:].max(axis=0) + padding
+        width, height = self.frame_size
+        return max(0, int(x1)), max(0, int(y1)), min(width, int(x2)), min(height, int(y2))
@@ -0,0 +1,225 @@
+"""
+Low-overhead pipeline instrumentation.
+
+Stage timings go into fixed-size ring buffers, so recording is a
+``perf_counter`` call and an array store; percentiles are only computed when
+a snapshot is taken. A process-wide ``metrics`` registry is shared by the
+capture, inference and GUI layers and can be exported as JSON or as
+Prometheus text exposition format.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import numpy as np
+
+# Pipeline stages in the order a frame passes through them
+STAGES = (
+    "receive", "decode", "preprocess", "inference",
+    "postprocess", "track", "draw", "qt_convert",
+)
+PERCENTILES = (50, 95, 99)
+
+
+class RollingStats:
+    """Fixed-window ring buffer of samples with on-demand percentiles."""
+
+    def __init__(self, window: int = 300):
+        self.values = np.zeros(window, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+        self.total = 0
+
+    def add(self, value: float) -> None:
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+        self.total += 1
+
+    def window(self) -> np.ndarray:
+        return self.values[:self.count]
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": self.total}
+        data = self.window()
+        summary = {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(data, PERCENTILES))}
+        summary["mean"] = float(data.mean())
+        summary["count"] = self.total
+        return summary
+
+
+class Metrics:
+    """Registry of stage timings (ms), counters, gauges and frame rate."""
+
+    def __init__(self, window: int = 300):
+        self.window = window
+        self.stages: Dict[str, RollingStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.frame_times = RollingStats(window)
+        self.lock = threading.Lock()
+        # Reference point for startup marks; entry points may move it earlier
+        self.started = time.perf_counter()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.gauges.clear()
+            self.frame_times = RollingStats(self.window)
+
+    def record(self, stage: str, seconds: float) -> None:
+        stats = self.stages.get(stage)
+        if stats is None:
+            with self.lock:
+                stats = self.stages.setdefault(stage, RollingStats(self.window))
+        stats.add(seconds * 1000.0)
+
+    @contextmanager
+    def time(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def mark_startup(self, milestone: str) -> float:
+        """Record seconds from ``started`` to ``milestone`` as gauge ``startup_<milestone>_seconds``."""
+        elapsed = time.perf_counter() - self.started
+        self.gauge(f"startup_{milestone}_seconds", elapsed)
+        return elapsed
+
+    def startup_report(self) -> str:
+        marks = sorted(
+            (value, name[len("startup_"):-len("_seconds")])
+            for name, value in self.gauges.items() if name.startswith("startup_")
+        )
+        return ", ".join(f"{name} {value:.2f}s" for value, name in marks)
+
+    def mark_frame(self) -> None:
+        """Record that a frame left the pipeline; drives the FPS figure."""
+        self.frame_times.add(time.perf_counter())
+
+    def fps(self) -> float:
+        times = self.frame_times.window()
+        if len(times) < 2:
+            return 0.0
+        span = times.max() - times.min()
+        return (len(times) - 1) / span if span > 0 else 0.0
+
+    def stage_mean(self, *stages: str) -> float:
+        """Sum of the mean latencies (ms) of the given stages."""
+        total = 0.0
+        for stage in stages:
+            stats = self.stages.get(stage)
+            if stats is not None and stats.count:
+                total += float(stats.window().mean())
+        return total
+
+    def sample_memory(self) -> Dict[str, float]:
+        memory = {"rss_bytes": float(process_rss())}
+        total = total_memory()
+        if total:
+            memory["rss_percent"] = 100.0 * memory["rss_bytes"] / total
+        cuda = cuda_memory()
+        if cuda is not None:
+            memory["cuda_allocated_bytes"], memory["cuda_total_bytes"] = cuda
+            memory["cuda_percent"] = 100.0 * cuda[0] / cuda[1] if cuda[1] else 0.0
+        for name, value in memory.items():
+            self.gauge(f"memory_{name}", value)
+        return memory
+
+    def snapshot(self) -> Dict:
+        self.sample_memory()
+        with self.lock:
+            stages = {name: stats.summary() for name, stats in self.stages.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        return {
+            "timestamp": time.time(),
+            "fps": self.fps(),
+            "stages_ms": stages,
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "objdet") -> str:
+        """Render a snapshot in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# TYPE {prefix}_fps gauge",
+            f"{prefix}_fps {snapshot['fps']:.3f}",
+            f"# TYPE {prefix}_stage_latency_ms summary",
+        ]
+        for stage, summary in snapshot["stages_ms"].items():
+            for p in PERCENTILES:
+                if f"p{p}" in summary:
+                    lines.append(
+                        f'{prefix}_stage_latency_ms{{stage="{stage}",quantile="{p / 100}"}} '
+                        f'{summary[f"p{p}"]:.3f}'
+                    )
+            lines.append(f'{prefix}_stage_latency_ms_count{{stage="{stage}"}} {summary["count"]}')
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, value in snapshot["gauges"].items():
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Atomically write a snapshot; ``.prom`` files get Prometheus text, others JSON."""
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json(indent=2)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def process_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+def total_memory() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, AttributeError, OSError):
+        return 0
+
+
+def cuda_memory():
+    """(allocated, total) CUDA bytes, only if torch is already imported and has a GPU."""
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return None
+    device = torch.cuda.current_device()
+    return (
+        float(torch.cuda.memory_allocated(device)),
+        float(torch.cuda.get_device_properties(device).total_memory),
+    )
+
+
+metrics = Metrics()
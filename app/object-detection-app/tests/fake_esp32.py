@@ -0,0 +1,19 @@
+import cv2
+import numpy as np
+from benchmarks.replay import MJPEGReplayServer
+
+
+def make_jpeg(index: int, width: int = 160, height: int = 120) -> bytes:
+    """Encode a small synthetic frame whose mean brightness encodes ``index``."""
+    frame = np.full((height, width, 3), (index * 40) % 256, dtype=np.uint8)
+    cv2.rectangle(frame, (10, 10), (50, 50), (0, 0, 255), -1)
+    ok, jpeg = cv2.imencode(".jpg", frame)
+    assert ok
+    return jpeg.tobytes()
+
+
+class FakeESP32Server(MJPEGReplayServer):
+    """The replay server, paced at 10 ms per frame by default like a real camera."""
+
+    def __init__(self, jpegs, interval: float = 0.01, loop: bool = True, chunked: bool = False):
+        super().__init__(jpegs, interval, loop, chunked)
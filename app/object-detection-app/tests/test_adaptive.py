@@ -0,0 +1,82 @@
+import threading
+import unittest
+from src.core.adaptive import AdaptiveController, esp32_framesize, quality_ladder
+from src.core.tracker import TrackingDetector
+
+
+class SizeRecorder:
+    """Detector double that records the input sizes it is given."""
+
+    def __init__(self):
+        self.sizes = []
+
+    def set_input_size(self, size):
+        self.sizes.append(size)
+
+
+class TestAdaptiveController(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = SizeRecorder()
+        self.tracking = TrackingDetector(None)
+        self.controller = AdaptiveController(
+            self.detector, self.tracking, target_fps=20, max_interval=3,
+            smoothing=1.0, cooldown=0.0
+        )
+
+    def test_ladder(self):
+        self.assertEqual(
+            quality_ladder((320, 640, 480), 3),
+            [(640, 1), (480, 1), (320, 1), (320, 2), (320, 3)]
+        )
+        self.assertEqual(self.detector.sizes, [640])
+
+    def test_steps_down_when_behind_and_up_with_headroom(self):
+        for _ in range(10):
+            self.controller.update(0.2)
+        self.assertEqual((self.controller.size, self.controller.interval), (320, 3))
+        self.assertEqual(self.tracking.detect_interval, 3)
+        self.assertEqual(self.detector.sizes, [640, 480, 320, 320, 320])
+
+        # 2 ms per frame at the cheapest level: every step back up fits the 50 ms budget
+        for _ in range(10):
+            self.controller.update(0.002)
+        self.assertEqual((self.controller.size, self.controller.interval), (640, 1))
+
+    def test_holds_level_without_headroom(self):
+        self.controller.update(0.06)
+        self.assertEqual(self.controller.size, 480)
+        # 480 -> 640 is estimated at 35 * (640/480)^2 = 62 ms, over 80% of the 50 ms budget
+        self.assertFalse(self.controller.update(0.035))
+        self.assertEqual(self.controller.size, 480)
+        self.controller.set_target_fps(10)
+        self.assertTrue(self.controller.update(0.035))
+        self.assertEqual(self.controller.size, 640)
+
+    def test_user_interval_is_a_floor(self):
+        self.controller.set_min_interval(2)
+        self.assertEqual(self.tracking.detect_interval, 2)
+        self.controller.update(0.001)
+        self.assertEqual(self.controller.interval, 2)
+
+    def test_cooldown_and_camera_control(self):
+        sizes = []
+        called = threading.Event()
+        controller = AdaptiveController(
+            SizeRecorder(), target_fps=20, cooldown=60.0,
+            camera_control=lambda size: (sizes.append(size), called.set())
+        )
+        self.assertFalse(controller.update(1.0))
+        controller.cooldown = 0.0
+        self.assertTrue(controller.update(1.0))
+        self.assertEqual(controller.size, 480)
+        self.assertTrue(called.wait(2))
+        self.assertEqual(sizes, [480])
+        # Without a tracking detector there are no interval steps
+        self.assertEqual(len(controller.ladder), 3)
+        self.assertEqual(esp32_framesize(controller.size), 7)
+        self.assertEqual(esp32_framesize(2000), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import cv2
+import numpy as np
+from src.core.async_camera import AsyncCameraHub
+from tests.fake_esp32 import FakeESP32Server, make_jpeg
+
+
+class TestAsyncCameraHub(unittest.TestCase):
+
+    def setUp(self):
+        self.hub = AsyncCameraHub(decode_workers=2, timeout=2, initial_backoff=0.05)
+
+    def tearDown(self):
+        self.hub.stop()
+
+    def test_reads_several_streams_on_one_loop(self):
+        servers = [FakeESP32Server([make_jpeg(i)]) for i in range(4)]
+        for server in servers:
+            server.__enter__()
+        try:
+            cameras = [self.hub.open(server.address) for server in servers]
+            for camera in cameras:
+                frame_id, frame = camera.wait_for_frame(0, timeout=5)
+                self.assertIsNotNone(frame)
+                self.assertEqual(frame.shape, (120, 160, 3))
+                self.assertTrue(camera.is_connected)
+        finally:
+            for server in servers:
+                server.__exit__(None, None, None)
+
+    def test_get_frame_contract(self):
+        with FakeESP32Server([make_jpeg(1), make_jpeg(2)]) as server:
+            camera = self.hub.open(server.address, decode_size=(80, 60))
+            frame_id, frame = camera.wait_for_frame(0, timeout=5)
+            self.assertEqual(frame.shape, (60, 80, 3))
+            ret, copy = camera.get_frame()
+            self.assertTrue(ret)
+            newer_id, newer = camera.wait_for_frame(frame_id, timeout=5)
+            self.assertGreater(newer_id, frame_id)
+            camera.disconnect()
+            self.assertEqual(camera.get_frame(), (False, None))
+            self.assertFalse(camera.running)
+
+    def test_reconnects_after_stream_ends(self):
+        # The server closes the stream after two frames; later frames need a reconnect
+        with FakeESP32Server([make_jpeg(1), make_jpeg(2)], loop=False) as server:
+            camera = self.hub.open(server.address)
+            last_id = 0
+            while last_id < 5:
+                last_id, frame = camera.wait_for_frame(last_id, timeout=5)
+                self.assertIsNotNone(frame)
+            camera.disconnect()
+
+    def test_chunked_stream(self):
+        # The real ESP32 sends /stream with Transfer-Encoding: chunked
+        jpegs = [make_jpeg(1), make_jpeg(4)]
+        with FakeESP32Server(jpegs, loop=False, chunked=True) as server:
+            camera = self.hub.open(server.address)
+            last_id, frames = 0, []
+            while last_id < 4:
+                last_id, frame = camera.wait_for_frame(last_id, timeout=5)
+                self.assertIsNotNone(frame)
+                frames.append(frame)
+            camera.disconnect()
+        expected = {int(cv2.imdecode(np.frombuffer(j, np.uint8), cv2.IMREAD_COLOR)[100, 100, 0]) for j in jpegs}
+        self.assertLessEqual({int(frame[100, 100, 0]) for frame in frames}, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
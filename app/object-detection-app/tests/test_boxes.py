@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from src.core.backends import letterbox
+from src.utils.boxes import batched_nms, box_iou, nms, xywh_to_xyxy
+
+
+class TestBoxes(unittest.TestCase):
+
+    def setUp(self):
+        self.boxes = np.array([
+            [0, 0, 10, 10],
+            [1, 1, 11, 11],
+            [50, 50, 60, 60],
+        ], dtype=np.float32)
+        self.scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+
+    def test_xywh_to_xyxy(self):
+        out = xywh_to_xyxy(np.array([[5, 5, 10, 4]], dtype=np.float32))
+        np.testing.assert_allclose(out, [[0, 3, 10, 7]])
+
+    def test_box_iou(self):
+        iou = box_iou(self.boxes, self.boxes)
+        np.testing.assert_allclose(np.diag(iou), 1.0)
+        self.assertAlmostEqual(iou[0, 1], 81 / 119, places=5)
+        self.assertEqual(iou[0, 2], 0.0)
+
+    def test_nms_suppresses_overlaps(self):
+        self.assertEqual(nms(self.boxes, self.scores, 0.5).tolist(), [0, 2])
+
+    def test_nms_intersection_over_smaller(self):
+        boxes = np.array([[0, 0, 40, 40], [0, 0, 10, 40]], dtype=np.float32)
+        scores = np.array([0.9, 0.6], dtype=np.float32)
+        # IoU is only 0.25, but the partial box lies entirely inside the kept one
+        self.assertEqual(nms(boxes, scores, 0.5).tolist(), [0, 1])
+        self.assertEqual(nms(boxes, scores, 0.5, metric="ios").tolist(), [0])
+
+    def test_batched_nms_keeps_other_classes(self):
+        class_ids = np.array([0, 1, 0])
+        self.assertEqual(sorted(batched_nms(self.boxes, self.scores, class_ids, 0.5).tolist()), [0, 1, 2])
+
+    def test_letterbox(self):
+        image, scale, pad = letterbox(np.zeros((480, 640, 3), dtype=np.uint8), 320)
+        self.assertEqual(image.shape, (320, 320, 3))
+        self.assertEqual(scale, 0.5)
+        self.assertEqual(pad, (0, 40))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,29 @@
+import os
+import cv2
+import shutil
+import tempfile
 import unittest
+import numpy as np
 from src.core.camera import CameraStream
 
 class TestCameraStream(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # A short local recording stands in for a webcam so the tests run offline
+        cls.directory = tempfile.mkdtemp()
+        cls.video_path = os.path.join(cls.directory, "clip.avi")
+        writer = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 120))
+        for i in range(10):
+            writer.write(np.full((120, 160, 3), i * 20, dtype=np.uint8))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
     def setUp(self):
-        self.camera = CameraStream()
+        self.camera = CameraStream(self.video_path, threaded=False)
 
     def test_camera_open(self):
         self.camera.open()
@@ -15,6 +34,14 @@ class TestCameraStream(unittest.TestCase):
         ret, frame = self.camera.read()
         self.assertTrue(ret, "Frame should be read successfully.")
         self.assertIsNotNone(frame, "Frame should not be None.")
+        self.assertEqual(frame.shape, (120, 160, 3))
+
+    def test_threaded_read(self):
+        camera = CameraStream(self.video_path)
+        self.assertTrue(camera.open())
+        ret, frame = camera.read()
+        camera.release()
+        self.assertTrue(ret)
 
     def test_camera_release(self):
         self.camera.open()
@@ -25,4 +52,4 @@ class TestCameraStream(unittest.TestCase):
         self.camera.release()
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,144 @@
+import time
+import threading
+import unittest
+import numpy as np
+from src.core.ESP32Camera import ESP32Camera
+from src.core.camera_manager import CameraManager
+from src.core.detections import Detections
+from tests.fake_esp32 import FakeESP32Server, make_jpeg
+
+
+class RecordingDetector:
+    """Detector double that records the size of every batch it receives."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_batch(self, frames, conf_threshold=0.5):
+        self.batch_sizes.append(len(frames))
+        return [Detections.empty() for _ in frames]
+
+
+class TestCameraManager(unittest.TestCase):
+
+    def test_frames_from_all_cameras_are_batched(self):
+        detector = RecordingDetector()
+        manager = CameraManager(detector, max_batch_size=4)
+        received = {}
+
+        with FakeESP32Server([make_jpeg(1)]) as first, FakeESP32Server([make_jpeg(2)]) as second:
+            for camera_id, server in (("a", first), ("b", second)):
+                self.assertTrue(
+                    manager.add_camera(camera_id, server.address, ESP32Camera(backend="mjpeg"))
+                )
+                manager.subscribe(camera_id, lambda cid, frame: received.setdefault(cid, frame))
+
+            manager.start()
+            deadline = time.time() + 5
+            while len(received) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            manager.stop()
+
+        self.assertEqual(set(received), {"a", "b"})
+        self.assertEqual(received["a"].shape, (120, 160, 3))
+        self.assertTrue(all(size <= 4 for size in detector.batch_sizes))
+        self.assertEqual(manager.cameras, {})
+
+    def test_collect_batch_respects_max_batch_size(self):
+        manager = CameraManager(RecordingDetector(), max_batch_size=1)
+        with FakeESP32Server([make_jpeg(1)]) as first, FakeESP32Server([make_jpeg(2)]) as second:
+            for camera_id, server in (("a", first), ("b", second)):
+                manager.add_camera(camera_id, server.address, ESP32Camera(backend="mjpeg"))
+                manager.cameras[camera_id].wait_for_frame(0, timeout=5)
+            seen = set()
+            for _ in range(2):
+                camera_ids, frames = manager.collect_batch()
+                self.assertEqual(len(frames), 1)
+                seen.update(camera_ids)
+            manager.stop()
+        self.assertEqual(seen, {"a", "b"})
+
+    def test_set_detector_waits_for_batch_in_flight(self):
+        started, release = threading.Event(), threading.Event()
+
+        class BlockingDetector:
+            closed = False
+
+            def detect_batch(self, frames, conf_threshold=0.5):
+                started.set()
+                release.wait(5)
+                # Closing the detector mid-batch would break this
+                assert not self.closed
+                return [Detections.empty() for _ in frames]
+
+        class StillCamera:
+            is_connected = True
+
+            def get_frame_if_newer(self, last_id):
+                return last_id + 1, np.zeros((4, 4, 3), dtype=np.uint8)
+
+        old = BlockingDetector()
+        manager = CameraManager(old)
+        manager.add_camera("a", "", StillCamera())
+        manager.start()
+        self.assertTrue(started.wait(5))
+        swapped = threading.Event()
+        thread = threading.Thread(target=lambda: (manager.set_detector(RecordingDetector()), swapped.set()))
+        thread.start()
+        self.assertFalse(swapped.wait(0.1))
+        release.set()
+        self.assertTrue(swapped.wait(5))
+        old.closed = True
+        self.assertIsInstance(manager.detector, RecordingDetector)
+        manager.running = False
+        manager.thread.join(2)
+
+    def test_detections_trigger_attached_recorders(self):
+        class BoxDetector:
+            def detect_batch(self, frames, conf_threshold=0.5):
+                return [
+                    Detections(np.array([[0, 0, 2, 2]], dtype=np.float32),
+                               np.array([0.9], dtype=np.float32),
+                               np.array([0], dtype=np.int32), {0: "person"})
+                    for _ in frames
+                ]
+
+        class Recorder:
+            def __init__(self):
+                self.observed = []
+
+            def observe(self, detections):
+                self.observed.append(detections.names[int(detections.class_ids[0])])
+
+        class StillCamera:
+            is_connected = True
+            recorder = None
+
+            def __init__(self):
+                self.frame = np.zeros((4, 4, 3), dtype=np.uint8)
+
+            def get_frame_if_newer(self, last_id):
+                # Handed out without a copy, like ESP32Camera
+                return last_id + 1, self.frame
+
+        manager = CameraManager(BoxDetector())
+        recorded, plain = StillCamera(), StillCamera()
+        recorded.recorder = Recorder()
+        manager.add_camera("a", "", recorded)
+        manager.add_camera("b", "", plain)
+        received = {}
+        manager.subscribe("b", lambda cid, frame: received.setdefault(cid, frame))
+        manager.start()
+        deadline = time.time() + 5
+        while (not recorded.recorder.observed or not received) and time.time() < deadline:
+            time.sleep(0.01)
+        manager.running = False
+        manager.thread.join(2)
+        self.assertEqual(recorded.recorder.observed[0], "person")
+        # Frames from every camera are still annotated, on a copy of the camera's frame
+        self.assertTrue(received["b"].any())
+        self.assertFalse(plain.frame.any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,22 +1,59 @@
 import unittest
-from src.core.detector import ObjectDetector
+import numpy as np
+from src.core.detections import Detections
+from src.utils.image_processing import draw_detections
+
+
+class TestDetections(unittest.TestCase):
+
+    def setUp(self):
+        self.detections = Detections(
+            np.array([[10, 10, 50, 60], [100, 80, 160, 200]], dtype=np.float32),
+            np.array([0.9, 0.3], dtype=np.float32),
+            np.array([0, 2], dtype=np.int32),
+            {0: 'person', 2: 'car'}
+        )
+
+    def test_confidence_mask(self):
+        kept = self.detections.above(0.5)
+        self.assertEqual(len(kept), 1)
+        self.assertEqual(kept.boxes.shape, (1, 4))
+        self.assertEqual(kept.labels(), ['person'])
+
+    def test_to_list(self):
+        detection = self.detections.to_list()[1]
+        self.assertEqual(detection['box'], [100, 80, 160, 200])
+        self.assertEqual(detection['class_id'], 2)
+        self.assertEqual(detection['name'], 'car')
+
+    def test_draw_detections(self):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        self.assertIs(draw_detections(frame, self.detections), frame)
+        self.assertGreater(frame.sum(), 0)
+
 
 class TestObjectDetector(unittest.TestCase):
     
     def setUp(self):
+        from src.core.detector import ObjectDetector
         self.detector = ObjectDetector(model_path='models/best.pt')
 
     def test_model_loading(self):
         self.assertIsNotNone(self.detector.model, "Model should be loaded successfully.")
 
     def test_detection(self):
-        test_frame = ...  # Replace with a valid test frame
+        test_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        original = test_frame.copy()
         detections = self.detector.detect(test_frame)
-        self.assertIsInstance(detections, list, "Detections should be a list.")
-        for detection in detections:
+        self.assertIsInstance(detections, Detections, "Detections should be a Detections result.")
+        self.assertEqual(detections.boxes.shape, (len(detections), 4))
+        self.assertEqual(detections.scores.shape, (len(detections),))
+        self.assertEqual(detections.class_ids.shape, (len(detections),))
+        self.assertTrue(np.array_equal(test_frame, original), "detect() must not draw on the frame.")
+        for detection in detections.to_list():
             self.assertIn('box', detection, "Detection should contain 'box'.")
             self.assertIn('confidence', detection, "Detection should contain 'confidence'.")
             self.assertIn('class_id', detection, "Detection should contain 'class_id'.")
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+from src.core.detections import Detections
+from src.core.event_store import DetectionStore
+
+NAMES = {0: "person", 2: "car"}
+
+
+def make_detections(class_ids, track_ids=None):
+    n = len(class_ids)
+    boxes = np.tile(np.array([[10.4, 20.6, 110.2, 220.9]], dtype=np.float32), (n, 1))
+    return Detections(
+        boxes,
+        np.full(n, 0.8766, dtype=np.float32),
+        np.array(class_ids, dtype=np.int32),
+        NAMES,
+        np.array(track_ids, dtype=np.int32) if track_ids is not None else None
+    )
+
+
+class TestDetectionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "events.db")
+        self.store = DetectionStore(self.path, batch_size=50, flush_interval=0.05)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        self.assertTrue(self.store.add("cam3", make_detections([2, 0], [7, 8]), timestamp=1000.25))
+        self.assertTrue(self.store.add("cam3", Detections.empty(NAMES), timestamp=1001.0))
+        self.assertTrue(self.store.flush(5))
+        rows = self.store.query()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0], {
+            "timestamp": 1000.25, "camera": "cam3", "name": "car", "confidence": 0.877,
+            "box": [10, 21, 110, 221], "track_id": 7,
+        })
+        self.assertEqual(self.store.cameras(), ["cam3"])
+
+    def test_counts_and_histogram(self):
+        for second in range(10):
+            camera = "cam3" if second % 2 else "cam1"
+            # One car tracked across every frame of a camera, plus a person on cam3
+            self.store.add(camera, make_detections([2, 0], [1, 2]), timestamp=100 + second)
+        self.store.flush(5)
+
+        self.assertEqual(self.store.count(), {"car": 10, "person": 10})
+        self.assertEqual(self.store.count(camera="cam3", classes=["car"]), {"car": 5})
+        self.assertEqual(self.store.count(start=104, end=106), {"car": 2, "person": 2})
+        self.assertEqual(self.store.count(classes=["car"], distinct_tracks=True), {"car": 2})
+        self.assertEqual(
+            self.store.histogram(5, classes=["car"]),
+            [(100.0, "car", 5), (105.0, "car", 5)]
+        )
+        self.assertEqual(self.store.count(camera="missing"), {})
+
+    def test_batches_survive_reopen(self):
+        for i in range(120):
+            self.store.add("cam1", make_detections([0]), timestamp=i)
+        self.store.close()
+        self.assertEqual(self.store.written, 120)
+
+        # Names are interned once and reused after reopening
+        with DetectionStore(self.path) as store:
+            store.add("cam1", make_detections([2]), timestamp=500)
+            store.flush(5)
+            self.assertEqual(store.count(), {"car": 1, "person": 120})
+            self.assertEqual(store.cameras(), ["cam1"])
+
+    def test_full_queue_drops_without_blocking(self):
+        store = DetectionStore(os.path.join(self.dir, "small.db"), max_pending=2)
+        # Lock the database so the writer stalls on its first frame
+        lock = sqlite3.connect(store.path, isolation_level=None)
+        lock.execute("BEGIN EXCLUSIVE")
+        results = [store.add("cam1", make_detections([0]), timestamp=i) for i in range(6)]
+        self.assertIn(False, results)
+        self.assertEqual(store.dropped, results.count(False))
+        lock.execute("ROLLBACK")
+        lock.close()
+        self.assertTrue(store.flush(10))
+        self.assertEqual(sum(store.count().values()), results.count(True))
+        store.close()
+
+    def test_storage_per_detection(self):
+        detections = make_detections([0, 2] * 10, list(range(20)))
+        for i in range(500):
+            self.store.add("cam1", detections, timestamp=1.7e9 + i / 10)
+        self.store.close()
+        size = sum(
+            os.path.getsize(path) for path in (self.path, self.path + "-wal") if os.path.exists(path)
+        )
+        self.assertLess(size / 10000, 64)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import cv2
+import unittest
+import numpy as np
+from src.core.detections import Detections
+from src.utils.image_processing import (
+    PALETTE, DetectionRenderer, MotionGate, decode_jpeg, jpeg_size, preprocess_frame,
+    reduced_decode_scale
+)
+
+
+def encode(width, height):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.circle(frame, (width // 2, height // 2), height // 4, (255, 128, 0), -1)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+
+class TestJpegDecoding(unittest.TestCase):
+
+    def test_jpeg_size(self):
+        self.assertEqual(jpeg_size(encode(1600, 1200)), (1600, 1200))
+        self.assertIsNone(jpeg_size(b"\xff\xd8not a jpeg"))
+
+    def test_reduced_decode_scale(self):
+        self.assertEqual(reduced_decode_scale((1600, 1200), (320, 240)), 4)
+        self.assertEqual(reduced_decode_scale((1600, 1200), (640, 480)), 2)
+        self.assertEqual(reduced_decode_scale((640, 480), (640, 480)), 1)
+        self.assertEqual(reduced_decode_scale((640, 480), None), 1)
+
+    def test_decode_covers_target(self):
+        frame = decode_jpeg(encode(1600, 1200), (640, 480))
+        self.assertEqual(frame.shape, (600, 800, 3))
+        self.assertEqual(decode_jpeg(encode(320, 240)).shape, (240, 320, 3))
+
+    def test_preprocess_from_jpeg_bytes(self):
+        frame = preprocess_frame(encode(1600, 1200), target_size=(320, 240))
+        self.assertEqual(frame.shape, (240, 320, 3))
+        self.assertEqual(frame.dtype, np.float32)
+
+
+
+class TestDetectionRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.renderer = DetectionRenderer()
+        self.detections = Detections(
+            np.array([[20, 40, 120, 140], [-10, -10, 700, 30], [600, 400, 640, 480]], dtype=np.float32),
+            np.array([0.87, 0.5, 0.25], dtype=np.float32),
+            np.array([0, 1, 25], dtype=np.int32),
+            {0: "person", 1: "car"},
+            np.array([3, 4, 5])
+        )
+
+    def test_draws_in_place_with_palette_colours(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.assertIs(self.renderer.draw(frame, self.detections), frame)
+        # Box edges take the class colour; the interior is untouched
+        self.assertEqual(frame[140 - 1, 70].tolist(), PALETTE[0].tolist())
+        self.assertEqual(frame[90, 70].tolist(), [0, 0, 0])
+        self.assertEqual(frame[479, 620].tolist(), PALETTE[25 % len(PALETTE)].tolist())
+        # Label sprite sits above the first box in its colour
+        label = frame[40 - self.renderer.label_height:40, 20:60]
+        self.assertTrue((label == PALETTE[0]).all(axis=2).any())
+        self.assertTrue((label == 255).all(axis=2).any())
+
+    def test_label_sprites_are_cached(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.renderer.draw(frame, self.detections)
+        cached = dict(self.renderer._sprites)
+        self.assertIn(("person 0.87", tuple(PALETTE[0].tolist())), cached)
+        self.assertIn(("#3 ", tuple(PALETTE[0].tolist())), cached)
+        self.renderer.draw(frame, self.detections)
+        self.assertEqual(self.renderer._sprites.keys(), cached.keys())
+        self.assertTrue(all(self.renderer._sprites[k] is v for k, v in cached.items()))
+
+    def test_fixed_colour_and_empty(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.renderer.draw(frame, self.detections.filter([0]), color=(0, 255, 0))
+        self.assertEqual(frame[40, 70].tolist(), [0, 255, 0])
+        blank = np.zeros((48, 64, 3), dtype=np.uint8)
+        self.renderer.draw(blank, Detections.empty())
+        self.assertFalse(blank.any())
+
+
+class TestMotionGate(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = MotionGate()
+        self.frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    def test_static_scene_is_gated(self):
+        self.assertTrue(self.gate.update(self.frame))
+        for _ in range(5):
+            self.assertFalse(self.gate.update(self.frame.copy()))
+
+    def test_change_passes_with_roi(self):
+        self.gate.update(self.frame)
+        moved = self.frame.copy()
+        moved[100:200, 300:400] = 255
+        self.assertTrue(self.gate.update(moved))
+        self.assertEqual(len(self.gate.rois), 1)
+        x1, y1, x2, y2 = self.gate.rois[0]
+        self.assertTrue(x1 <= 300 and y1 <= 100 and x2 >= 400 and y2 >= 200)
+        self.assertLess((x2 - x1) * (y2 - y1), 640 * 480 / 4)
+
+    def test_change_at_frame_edge(self):
+        self.gate.update(self.frame)
+        moved = self.frame.copy()
+        moved[400:480, 560:640] = 255
+        self.assertTrue(self.gate.update(moved))
+        # About the changed area (80x80 of 640x480, plus blur), not its dilation
+        self.assertGreater(self.gate.changed_fraction, 80 * 80 / (640 * 480))
+        self.assertLess(self.gate.changed_fraction, 0.024)
+        x1, y1, x2, y2 = self.gate.roi_union()
+        self.assertEqual((x2, y2), (640, 480))
+        self.assertLess(x1, 560)
+
+    def test_sensor_noise_is_ignored(self):
+        self.gate.update(self.frame)
+        noisy = np.random.default_rng(0).integers(0, 6, self.frame.shape, dtype=np.uint8)
+        self.assertFalse(self.gate.update(noisy))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import time
+import unittest
+import numpy as np
+from src.core.detections import Detections
+from src.core.inference_pool import InferencePool
+
+# Read when a spawned worker unpickles its factory, before it can set anything
+IMPORT_THREADS = os.environ.get("OMP_NUM_THREADS")
+
+
+class MeanDetector:
+    """Detector double that reports each frame's mean value and shape as one box."""
+
+    names = {0: "mean"}
+
+    def __init__(self, delay: float = 0.0, fail_on: int = -1):
+        self.delay = delay
+        self.fail_on = fail_on
+
+    def detect_batch(self, frames, conf_threshold=0.5):
+        results = []
+        for frame in frames:
+            time.sleep(self.delay)
+            value = float(frame.mean())
+            if value == self.fail_on:
+                raise ValueError("bad frame")
+            h, w = frame.shape[:2]
+            results.append(Detections(
+                np.array([[0, 0, w, h]], dtype=np.float32),
+                np.array([value], dtype=np.float32),
+                np.array([os.getpid() % 1000], dtype=np.int32),
+                self.names
+            ))
+        return results
+
+
+def make_detector(**kwargs):
+    return MeanDetector(**kwargs)
+
+
+def make_env_detector():
+    detector = MeanDetector()
+    detector.names = {0: IMPORT_THREADS}
+    return detector
+
+
+def frame(value, size=(48, 64)):
+    return np.full((*size, 3), value, dtype=np.uint8)
+
+
+class TestInferencePool(unittest.TestCase):
+
+    def test_results_in_submission_order(self):
+        with InferencePool(workers=2, factory=make_detector,
+                           detector_kwargs={"delay": 0.01}, start_timeout=60) as pool:
+            values = list(range(10))
+            results = pool.detect_batch([frame(v) for v in values])
+        self.assertEqual([float(r.scores[0]) for r in results], values)
+        self.assertEqual(results[0].names, {0: "mean"})
+        # Frames were spread over both processes
+        self.assertEqual(len({int(r.class_ids[0]) for r in results}), 2)
+
+    def test_tags_and_backpressure(self):
+        with InferencePool(workers=1, factory=make_detector, slots=2, start_timeout=60) as pool:
+            for i in range(6):
+                pool.submit(frame(i), tag=f"camera{i % 2}")
+                self.assertLessEqual(len(pool.in_flight), 2)
+            results = list(pool.results())
+        self.assertEqual([tag for _, tag, _ in results], ["camera0", "camera1"] * 3)
+        self.assertEqual([seq for seq, _, _ in results], list(range(6)))
+
+    def test_slots_grow_for_larger_frames(self):
+        with InferencePool(workers=1, factory=make_detector, slots=1, start_timeout=60) as pool:
+            small, large = pool.detect_batch([frame(1, (10, 10)), frame(2, (100, 120))])
+        self.assertEqual(large.boxes[0].tolist(), [0, 0, 120, 100])
+        self.assertEqual(float(large.scores[0]), 2.0)
+
+    def test_worker_errors_are_raised(self):
+        with InferencePool(workers=1, factory=make_detector,
+                           detector_kwargs={"fail_on": 7}, start_timeout=60) as pool:
+            with self.assertRaises(RuntimeError):
+                pool.detect_batch([frame(7)])
+            # The pool keeps working after a failed frame
+            self.assertEqual(float(pool.detect(frame(3)).scores[0]), 3.0)
+
+    def test_failed_frame_does_not_leak_into_next_batch(self):
+        with InferencePool(workers=2, factory=make_detector,
+                           detector_kwargs={"fail_on": 7, "delay": 0.01}, start_timeout=60) as pool:
+            with self.assertRaises(RuntimeError):
+                pool.detect_batch([frame(v) for v in (1, 7, 2, 3, 4)])
+            self.assertEqual(pool.pending, 0)
+            results = pool.detect_batch([frame(v) for v in (10, 11)])
+        self.assertEqual([float(r.scores[0]) for r in results], [10.0, 11.0])
+
+    def test_thread_caps_precede_worker_imports(self):
+        before = os.environ.get("OMP_NUM_THREADS")
+        with InferencePool(workers=1, threads_per_worker=3, factory=make_env_detector,
+                           start_timeout=60) as pool:
+            self.assertEqual(pool.names, {0: "3"})
+        self.assertEqual(os.environ.get("OMP_NUM_THREADS"), before)
+
+    def test_failed_start_is_reported(self):
+        with self.assertRaises(RuntimeError):
+            InferencePool(workers=1, factory=make_detector,
+                          detector_kwargs={"unknown": True}, start_timeout=60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import json
+import tempfile
+import unittest
+from src.utils.metrics import Metrics, RollingStats
+
+
+class TestRollingStats(unittest.TestCase):
+
+    def test_window_and_percentiles(self):
+        stats = RollingStats(window=100)
+        for value in range(1, 201):
+            stats.add(value)
+        summary = stats.summary()
+        self.assertEqual(summary["count"], 200)
+        self.assertAlmostEqual(summary["p50"], 150.5)
+        self.assertGreater(summary["p99"], summary["p95"])
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.metrics.record("inference", 0.020)
+        self.metrics.record("inference", 0.030)
+        self.metrics.record("draw", 0.001)
+        self.metrics.count("dropped_frames", 3)
+
+    def test_snapshot(self):
+        snapshot = self.metrics.snapshot()
+        self.assertAlmostEqual(snapshot["stages_ms"]["inference"]["mean"], 25.0)
+        self.assertEqual(snapshot["counters"]["dropped_frames"], 3)
+        self.assertGreater(snapshot["gauges"]["memory_rss_bytes"], 0)
+        self.assertAlmostEqual(self.metrics.stage_mean("inference", "draw"), 26.0)
+
+    def test_prometheus_text(self):
+        text = self.metrics.to_prometheus()
+        self.assertIn('objdet_stage_latency_ms{stage="inference",quantile="0.95"}', text)
+        self.assertIn("objdet_dropped_frames_total 3", text)
+
+    def test_write_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            self.metrics.write(path)
+            with open(path) as f:
+                self.assertIn("inference", json.load(f)["stages_ms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from src.core.mjpeg import BOUNDARY, ChunkedDecoder, MJPEGParser, MJPEGStream, parse_boundary
+from src.core.ESP32Camera import ESP32Camera
+from tests.fake_esp32 import FakeESP32Server, make_jpeg
+
+
+def multipart(jpegs, content_length=True):
+    body = b""
+    for jpeg in jpegs:
+        body += f"\r\n--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n".encode()
+        if content_length:
+            body += f"Content-Length: {len(jpeg)}\r\n".encode()
+        body += b"\r\n" + jpeg
+    return body + f"\r\n--{BOUNDARY}\r\n".encode()
+
+
+class TestMJPEGParser(unittest.TestCase):
+
+    def setUp(self):
+        self.jpegs = [make_jpeg(i) for i in range(3)]
+
+    def test_parse_boundary(self):
+        self.assertEqual(
+            parse_boundary(f"multipart/x-mixed-replace;boundary={BOUNDARY}"),
+            BOUNDARY.encode()
+        )
+
+    def test_byte_by_byte(self):
+        parser = MJPEGParser(BOUNDARY.encode())
+        body = multipart(self.jpegs)
+        frames = []
+        for i in range(len(body)):
+            frames.extend(parser.feed(body[i:i + 1]))
+        self.assertEqual(frames, self.jpegs)
+
+    def test_without_content_length(self):
+        parser = MJPEGParser(BOUNDARY.encode())
+        frames = parser.feed(multipart(self.jpegs, content_length=False))
+        self.assertEqual(frames, self.jpegs)
+
+    def test_raw_concatenated_jpegs(self):
+        parser = MJPEGParser()
+        body = b"".join(self.jpegs)
+        frames = parser.feed(body[:100]) + parser.feed(body[100:])
+        self.assertEqual(frames, self.jpegs)
+
+    def test_buffer_is_compacted(self):
+        parser = MJPEGParser(BOUNDARY.encode())
+        for _ in range(20):
+            parser.feed(multipart(self.jpegs))
+        self.assertLess(len(parser.buffer), len(BOUNDARY) + 8)
+
+    def test_chunked_byte_by_byte(self):
+        body = multipart(self.jpegs)
+        chunked = b"".join(
+            f"{len(body[i:i + 700]):x}\r\n".encode() + body[i:i + 700] + b"\r\n"
+            for i in range(0, len(body), 700)
+        ) + b"0\r\n\r\n"
+        decoder = ChunkedDecoder()
+        parser = MJPEGParser(BOUNDARY.encode())
+        frames = []
+        for i in range(len(chunked)):
+            frames.extend(parser.feed(decoder.feed(chunked[i:i + 1])))
+        self.assertEqual(frames, self.jpegs)
+        self.assertTrue(decoder.finished)
+
+
+class TestMJPEGStream(unittest.TestCase):
+
+    def test_stream_reads_jpegs(self):
+        jpegs = [make_jpeg(i) for i in range(3)]
+        with FakeESP32Server(jpegs) as server:
+            stream = MJPEGStream(f"http://{server.address}/stream")
+            self.assertTrue(stream.isOpened())
+            self.assertIn(stream.read_jpeg(), jpegs)
+            ret, frame = stream.read()
+            self.assertTrue(ret)
+            self.assertEqual(frame.shape, (120, 160, 3))
+            stream.release()
+            self.assertFalse(stream.isOpened())
+
+    def test_esp32_camera_mjpeg_backend(self):
+        with FakeESP32Server([make_jpeg(i) for i in range(3)]) as server:
+            camera = ESP32Camera(backend="mjpeg")
+            self.assertTrue(camera.connect(server.address))
+            frame_id, frame = camera.wait_for_frame(0, timeout=5)
+            self.assertGreater(frame_id, 0)
+            self.assertEqual(frame.shape, (120, 160, 3))
+            camera.disconnect()
+
+    def test_chunked_stream(self):
+        jpegs = [make_jpeg(i) for i in range(3)]
+        with FakeESP32Server(jpegs, chunked=True) as server:
+            stream = MJPEGStream(f"http://{server.address}/stream")
+            self.assertIn(stream.read_jpeg(), jpegs)
+            self.assertIn(stream.read_jpeg(), jpegs)
+            stream.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import numpy as np
+from src.core import backends
+from src.core.detections import Detections
+from src.core.detector import ObjectDetector
+from src.core.model_cache import ModelCache, model_key
+from src.utils.image_processing import MotionGate
+
+
+class ConstantBackend(backends.InferenceBackend):
+    """Backend double that reports one full-frame box and counts its loads and runs."""
+
+    name = "constant"
+    loads = 0
+
+    def __init__(self, model_path, imgsz=640, variant="fp32", size=100):
+        super().__init__(model_path, imgsz)
+        ConstantBackend.loads += 1
+        self.names = {0: model_path}
+        self.size = size
+        self.calls = 0
+
+    def predict(self, frames, conf_threshold=0.5, imgsz=None):
+        self.calls += len(frames)
+        return [
+            Detections(
+                np.array([[0, 0, frame.shape[1], frame.shape[0]]], dtype=np.float32),
+                np.array([0.9], dtype=np.float32),
+                np.array([0], dtype=np.int32),
+                self.names
+            )
+            for frame in frames
+        ]
+
+    def memory_bytes(self):
+        return self.size
+
+
+class TestModelCache(unittest.TestCase):
+
+    def test_lru_eviction_within_budget(self):
+        cache = ModelCache(max_bytes=250)
+        for name in "abc":
+            cache.put(name, object(), size=100)
+        self.assertEqual(cache.keys(), ["b", "c"])
+        self.assertIsNotNone(cache.get("b"))
+        cache.put("d", object(), size=100)
+        self.assertEqual(cache.keys(), ["b", "d"])
+        self.assertEqual(cache.total_bytes, 200)
+
+    def test_model_count_and_oversized_entry(self):
+        cache = ModelCache(max_bytes=50, max_models=2)
+        cache.put("a", object(), size=10)
+        cache.put("b", object(), size=10)
+        cache.put("c", object(), size=10)
+        self.assertEqual(cache.keys(), ["b", "c"])
+        # The newest entry is kept even when it alone exceeds the budget
+        cache.put("big", object(), size=500)
+        self.assertEqual(cache.keys(), ["big"])
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_key_normalises_options(self):
+        self.assertEqual(
+            model_key("onnxruntime", "m.pt", 640, "fp32", num_threads=2, device="cpu"),
+            model_key("onnxruntime", "./m.pt", 640, "fp32", device="cpu", num_threads=2)
+        )
+
+
+class TestModelSwitching(unittest.TestCase):
+
+    def setUp(self):
+        backends.BACKENDS[ConstantBackend.name] = ConstantBackend
+        ConstantBackend.loads = 0
+        self.cache = ModelCache(max_bytes=1000)
+        self.detector = ObjectDetector("a", backend="constant", cache=self.cache)
+
+    def tearDown(self):
+        del backends.BACKENDS[ConstantBackend.name]
+
+    def test_switching_back_uses_cache(self):
+        first = self.detector.backend
+        self.detector.switch_model("b", backend="constant", warmup_size=(32, 24))
+        self.assertEqual(self.detector.names, {0: "b"})
+        self.assertEqual(self.detector.backend.calls, 2)  # warmed up before the swap
+        self.detector.switch_model("a", backend="constant")
+        self.assertIs(self.detector.backend, first)
+        self.assertEqual(ConstantBackend.loads, 2)
+
+    def test_load_model_does_not_swap(self):
+        backend = self.detector.load_model("b", backend="constant")
+        self.assertEqual(self.detector.names, {0: "a"})
+        self.detector.set_model(backend)
+        frame = np.zeros((24, 32, 3), dtype=np.uint8)
+        self.assertEqual(self.detector.detect(frame).labels(), ["b"])
+
+    def test_motion_gate_results_refresh_after_switch(self):
+        gate = MotionGate()
+        frame = np.zeros((24, 32, 3), dtype=np.uint8)
+        self.assertEqual(self.detector.detect(frame, motion_gate=gate).labels(), ["a"])
+        self.assertEqual(self.detector.detect(frame, motion_gate=gate).labels(), ["a"])
+        self.detector.switch_model("b", backend="constant")
+        # Static scene, but the cached results belong to the previous model
+        self.assertEqual(self.detector.detect(frame, motion_gate=gate).labels(), ["b"])
+        self.assertEqual(self.detector.backend.calls, 1)
+        self.detector.detect(frame, motion_gate=gate)
+        self.assertEqual(self.detector.backend.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
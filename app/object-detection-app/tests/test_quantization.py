@@ -0,0 +1,21 @@
+import unittest
+from src.core.quantization import head_nodes
+
+
+class TestQuantization(unittest.TestCase):
+
+    def test_head_nodes_are_the_last_module(self):
+        names = [
+            "/model.0/conv/Conv",
+            "/model.9/cv1/conv/Conv",
+            "/model.22/cv2.0/cv2.0.0/conv/Conv",
+            "/model.22/dfl/conv/Conv",
+            "/model.21/m.0/cv1/conv/Conv",
+            "output0_Concat",
+        ]
+        self.assertEqual(head_nodes(names), names[2:4])
+        self.assertEqual(head_nodes(["Conv_0", "MatMul_1"]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
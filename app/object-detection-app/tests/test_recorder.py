@@ -0,0 +1,129 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from src.core.ESP32Camera import ESP32Camera
+from src.core.detections import Detections
+from src.core.mjpeg import MJPEGParser
+from src.core.recorder import ClipRecorder, FrameRingBuffer
+from tests.fake_esp32 import FakeESP32Server, make_jpeg
+
+
+def read_clip(path):
+    with open(path, "rb") as f:
+        return MJPEGParser().feed(f.read())
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+
+    def test_capped_by_bytes(self):
+        buffer = FrameRingBuffer(max_seconds=60, max_bytes=250)
+        for i in range(10):
+            buffer.append(bytes([i]) * 100, timestamp=i)
+        self.assertEqual(len(buffer), 2)
+        self.assertLessEqual(buffer.nbytes, 250)
+        self.assertEqual(buffer.snapshot()[-1][1][0], 9)
+
+    def test_capped_by_age(self):
+        buffer = FrameRingBuffer(max_seconds=2, max_bytes=10 ** 6)
+        for i in range(10):
+            buffer.append(b"x", timestamp=float(i))
+        self.assertEqual([t for t, _ in buffer.snapshot()], [7.0, 8.0, 9.0])
+
+
+class TestClipRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_clip_contains_pre_and_post_frames(self):
+        recorder = ClipRecorder(self.directory, pre_seconds=60, post_seconds=60)
+        jpegs = [make_jpeg(i) for i in range(6)]
+        for jpeg in jpegs[:3]:
+            recorder.add_frame(jpeg)
+        path = recorder.trigger("person")
+        for jpeg in jpegs[3:]:
+            recorder.add_frame(jpeg)
+        recorder.close(timeout=5)
+
+        self.assertIn("person", os.path.basename(path))
+        self.assertEqual(read_clip(path), jpegs)
+
+    def test_frame_arriving_during_trigger_is_written_once(self):
+        buffered, resume = threading.Event(), threading.Event()
+
+        class PausingBuffer(FrameRingBuffer):
+            def append(self, jpeg, timestamp=None):
+                super().append(jpeg, timestamp)
+                # The capture thread is preempted right after buffering the frame
+                buffered.set()
+                resume.wait(5)
+
+        recorder = ClipRecorder(self.directory, pre_seconds=60, post_seconds=60)
+        recorder.buffer = PausingBuffer(60)
+        jpeg = make_jpeg(1)
+        capture = threading.Thread(target=recorder.add_frame, args=(jpeg,))
+        capture.start()
+        self.assertTrue(buffered.wait(5))
+        trigger = threading.Thread(target=recorder.trigger)
+        trigger.start()
+        time.sleep(0.1)
+        resume.set()
+        capture.join(5)
+        trigger.join(5)
+        recorder.close(timeout=5)
+        self.assertEqual(read_clip(recorder.clips[0]), [jpeg])
+
+    def test_clip_ends_after_post_seconds(self):
+        recorder = ClipRecorder(self.directory, pre_seconds=60, post_seconds=0.05)
+        recorder.add_frame(make_jpeg(1))
+        recorder.trigger()
+        time.sleep(0.1)
+        recorder.add_frame(make_jpeg(2))
+        self.assertFalse(recorder.recording)
+        recorder.close(timeout=5)
+        self.assertEqual(len(read_clip(recorder.clips[0])), 1)
+
+    def test_observe_only_triggers_on_watched_classes(self):
+        recorder = ClipRecorder(self.directory, classes=["person"])
+        names = {0: "person", 1: "car"}
+        car = Detections(
+            np.array([[0, 0, 10, 10]], dtype=np.float32),
+            np.array([0.9], dtype=np.float32),
+            np.array([1], dtype=np.int32),
+            names
+        )
+        self.assertFalse(recorder.observe(car))
+        self.assertFalse(recorder.observe(Detections.empty(names)))
+        person = Detections(car.boxes, car.scores, np.array([0], dtype=np.int32), names)
+        self.assertTrue(recorder.observe(person))
+        recorder.close(timeout=5)
+        self.assertEqual(len(recorder.clips), 1)
+
+    def test_camera_feeds_original_jpeg_bytes(self):
+        jpegs = [make_jpeg(i) for i in range(3)]
+        recorder = ClipRecorder(self.directory, pre_seconds=60)
+        with FakeESP32Server(jpegs) as server:
+            camera = ESP32Camera(backend="mjpeg")
+            camera.attach_recorder(recorder)
+            self.assertTrue(camera.connect(server.address))
+            deadline = time.time() + 5
+            while len(recorder.buffer) < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            recorder.trigger()
+            camera.disconnect()
+        recorder.close(timeout=5)
+
+        clip = read_clip(recorder.clips[0])
+        self.assertGreaterEqual(len(clip), 3)
+        self.assertTrue(set(clip) <= set(jpegs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import time
+import socket
+import unittest
+import cv2
+import numpy as np
+import requests
+from src.core.detections import Detections
+from src.core.mjpeg import MJPEGStream
+from src.core.stream_server import StreamServer
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def make_frame(index, width=160, height=120):
+    return np.full((height, width, 3), index * 10 % 256, dtype=np.uint8)
+
+
+class TestStreamServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StreamServer("127.0.0.1", 0).start()
+        self.url = f"http://127.0.0.1:{self.server.port}"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def channel(self, name="cam"):
+        self.assertTrue(wait_until(lambda: name in self.server.channels))
+        return self.server.channels[name]
+
+    def test_no_encoding_without_viewers(self):
+        for i in range(5):
+            self.server.publish("cam", make_frame(i))
+        channel = self.channel()
+        self.assertTrue(wait_until(lambda: channel.seq == 5))
+        self.assertEqual(channel.encoded, 0)
+
+        # A snapshot encodes the newest frame on demand
+        response = requests.get(f"{self.url}/snapshot/cam", timeout=5)
+        self.assertEqual(response.status_code, 200)
+        image = cv2.imdecode(np.frombuffer(response.content, np.uint8), cv2.IMREAD_COLOR)
+        self.assertAlmostEqual(image.mean(), 40, delta=2)
+
+    def test_encodes_once_for_all_viewers(self):
+        self.server.publish("cam", make_frame(1))
+        channel = self.channel()
+        viewers = [MJPEGStream(f"{self.url}/stream/cam") for _ in range(3)]
+        try:
+            for viewer in viewers:
+                self.assertTrue(viewer.isOpened())
+            self.assertTrue(wait_until(lambda: channel.viewers == 3))
+            first = [viewer.read_jpeg() for viewer in viewers]
+            self.server.publish("cam", make_frame(2))
+            second = [viewer.read_jpeg() for viewer in viewers]
+        finally:
+            for viewer in viewers:
+                viewer.release()
+        self.assertEqual(len(set(first)), 1)
+        self.assertEqual(len(set(second)), 1)
+        self.assertNotEqual(first[0], second[0])
+        self.assertEqual(channel.encoded, 2)
+        self.assertTrue(wait_until(lambda: channel.viewers == 0))
+
+    def test_slow_viewer_drops_frames(self):
+        # Noise compresses badly, so the socket buffers of a stalled viewer fill up quickly
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (240, 320, 3), dtype=np.uint8) for _ in range(4)]
+        self.server.publish("cam", frames[0])
+        channel = self.channel()
+
+        slow = socket.create_connection(("127.0.0.1", self.server.port))
+        slow.sendall(b"GET /stream HTTP/1.1\r\nHost: test\r\n\r\n")
+        fast = MJPEGStream(f"{self.url}/stream/cam")
+        try:
+            self.assertTrue(fast.isOpened())
+            self.assertTrue(wait_until(lambda: channel.viewers == 2))
+            start = time.perf_counter()
+            for i in range(1, 60):
+                self.server.publish("cam", frames[i % 4])
+                fast.read_jpeg()
+                self.assertTrue(wait_until(lambda: channel.encoded == i + 1))
+            self.assertLess((time.perf_counter() - start) / 59, 0.5)
+
+            # Once the slow viewer reads again it skips to the newest frame
+            slow.settimeout(0.05)
+
+            def read_slow():
+                try:
+                    slow.recv(1 << 20)
+                except socket.timeout:
+                    pass
+                return self.server.dropped > 0
+
+            self.assertTrue(wait_until(read_slow))
+        finally:
+            fast.release()
+            slow.close()
+
+    def test_detections_and_errors(self):
+        detections = Detections(
+            np.array([[1, 2, 3, 4]], dtype=np.float32), np.array([0.5], dtype=np.float32),
+            np.array([0], dtype=np.int32), {0: "person"}
+        )
+        self.server.publish("cam 1", make_frame(0), detections, timestamp=12.5)
+        self.channel("cam 1")
+        body = requests.get(f"{self.url}/detections", timeout=5).json()
+        self.assertEqual(body["stream"], "cam 1")
+        self.assertEqual(body["timestamp"], 12.5)
+        self.assertEqual(body["detections"], detections.to_list())
+        self.assertIn("/stream/cam%201", requests.get(self.url, timeout=5).text)
+        self.assertEqual(requests.get(f"{self.url}/stream/other", timeout=5).status_code, 404)
+        self.assertEqual(requests.get(f"{self.url}/favicon.ico", timeout=5).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
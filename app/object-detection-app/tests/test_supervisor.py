@@ -0,0 +1,125 @@
+import time
+import threading
+import unittest
+import numpy as np
+from src.core.ESP32Camera import ESP32Camera
+from src.core.supervisor import StreamSupervisor
+from tests.fake_esp32 import FakeESP32Server, make_jpeg
+
+
+class BreakingStream:
+    """Capture double that returns one frame and then fails."""
+
+    def __init__(self):
+        self.reads = 0
+        self.released = False
+
+    def read(self):
+        self.reads += 1
+        if self.reads > 1:
+            raise OSError("connection reset")
+        return True, np.full((4, 4, 3), 7, dtype=np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        self.released = True
+
+
+class EmptyStream:
+    """Capture double that stays open but never returns a frame."""
+
+    def __init__(self):
+        self.reads = 0
+
+    def read(self):
+        self.reads += 1
+        return False, None
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestCaptureLoop(unittest.TestCase):
+
+    def test_failed_reads_back_off(self):
+        camera = ESP32Camera(backend="opencv")
+        stream = EmptyStream()
+        camera.stream = stream
+        camera.running = True
+        thread = threading.Thread(target=camera._capture_loop, args=(stream,), daemon=True)
+        thread.start()
+        time.sleep(0.5)
+        camera.disconnect()
+        thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+        # Exponential backoff from 10 ms keeps this to a handful of reads, not a spin
+        self.assertLess(stream.reads, 15)
+
+    def test_read_error_keeps_last_frame(self):
+        camera = ESP32Camera(backend="opencv")
+        stream = BreakingStream()
+        camera.stream = stream
+        camera.running = True
+        thread = threading.Thread(target=camera._capture_loop, args=(stream,), daemon=True)
+        thread.start()
+        thread.join(timeout=2)
+        self.assertFalse(camera.running)
+        self.assertTrue(stream.released)
+        # Consumers keep showing the last frame while the supervisor reconnects
+        ok, frame = camera.get_frame()
+        self.assertTrue(ok)
+        self.assertEqual(int(frame[0, 0, 0]), 7)
+
+
+class TestStreamSupervisor(unittest.TestCase):
+
+    def test_reconnects_after_stream_ends(self):
+        with FakeESP32Server([make_jpeg(1), make_jpeg(2)], loop=False) as server:
+            camera = ESP32Camera(backend="mjpeg")
+            self.assertTrue(camera.connect(server.address))
+            supervisor = StreamSupervisor(camera, server.address, check_interval=0.05,
+                                          initial_backoff=0.05)
+            supervisor.start()
+            try:
+                self.assertTrue(wait_until(lambda: camera.frame_id >= 5))
+                self.assertGreaterEqual(supervisor.reconnects, 1)
+            finally:
+                supervisor.stop()
+                camera.disconnect()
+
+    def test_reconnects_stalled_stream(self):
+        # One frame, then the server goes quiet without closing the connection
+        with FakeESP32Server([make_jpeg(1)], interval=30) as server:
+            camera = ESP32Camera(backend="mjpeg")
+            self.assertTrue(camera.connect(server.address))
+            stalled = camera.stream
+            supervisor = StreamSupervisor(camera, server.address, stall_timeout=0.3,
+                                          check_interval=0.05)
+            supervisor.start()
+            try:
+                self.assertTrue(wait_until(lambda: supervisor.stalls >= 1 and camera.frame_id >= 2))
+                self.assertTrue(camera.running)
+                # Released at once, well before the blocked read would time out
+                self.assertIsNone(stalled.response)
+                stats = supervisor.stats()
+                self.assertGreaterEqual(stats["reconnects"], 1)
+                self.assertIn("fps", stats)
+            finally:
+                supervisor.stop()
+                camera.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import numpy as np
+from src.core.detections import Detections
+from src.core.tiling import TiledInference, tile_grid, tile_starts
+from src.utils.metrics import metrics
+
+
+def bright_region(frames, conf_threshold=0.5, imgsz=None):
+    """Predict double: one box around the bright pixels of each image, cut at its edges."""
+    results = []
+    for frame in frames:
+        ys, xs = np.nonzero(frame[..., 0] > 128)
+        if len(xs) == 0:
+            results.append(Detections.empty({0: "blob"}))
+            continue
+        box = [xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]
+        # Partial views score lower than complete ones, like a real model
+        complete = box[0] > 0 and box[1] > 0 and box[2] < frame.shape[1] and box[3] < frame.shape[0]
+        results.append(Detections(
+            np.array([box], dtype=np.float32),
+            np.array([0.9 if complete else 0.6], dtype=np.float32),
+            np.array([0], dtype=np.int32),
+            {0: "blob"}
+        ))
+    return results
+
+
+class TestTiling(unittest.TestCase):
+
+    def test_grid_covers_frame(self):
+        self.assertEqual(tile_starts(1600, 640, 0.2), [0, 512, 960])
+        self.assertEqual(tile_starts(500, 640, 0.2), [0])
+        grid = tile_grid(1600, 1200, 640, 0.2)
+        self.assertEqual(len(grid), 9)
+        self.assertEqual(grid[:, 2].max(), 1600)
+        self.assertEqual(grid[:, 3].max(), 1200)
+        self.assertTrue(np.all(grid[:, 2] - grid[:, 0] == 640))
+
+    def test_object_across_tile_border_is_merged(self):
+        frame = np.zeros((300, 400, 3), dtype=np.uint8)
+        frame[140:160, 190:210] = 255  # straddles the first tile's right edge
+        tiler = TiledInference(tile_size=200, overlap=0.25, full_frame=False)
+        detections = tiler.predict(bright_region, [frame])[0]
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections.boxes[0].tolist(), [190, 140, 210, 160])
+        self.assertAlmostEqual(float(detections.scores[0]), 0.9, places=5)
+
+    def test_batches_and_reuses_buffer(self):
+        calls = []
+
+        def predict(frames, conf_threshold=0.5, imgsz=None):
+            calls.append((len(frames), imgsz))
+            return bright_region(frames, conf_threshold)
+
+        frames = [np.zeros((300, 400, 3), dtype=np.uint8) for _ in range(2)]
+        frames[1][10:20, 380:390] = 255
+        tiler = TiledInference(tile_size=200, overlap=0.25)
+        results = tiler.predict(predict, frames, 0.5, 320)
+        buffer = tiler._buffer
+        tiler.predict(predict, frames, 0.5, 320)
+        self.assertIs(tiler._buffer, buffer)
+        per_frame = tiler.tiles_per_frame(400, 300)
+        self.assertEqual(calls, [(2 * per_frame, 320)] * 2)
+        self.assertEqual(len(results[0]), 0)
+        self.assertEqual(results[1].boxes.tolist(), [[380, 10, 390, 20]])
+
+    def test_frame_within_one_tile_runs_once(self):
+        calls = []
+
+        def predict(frames, conf_threshold=0.5):
+            calls.append(len(frames))
+            return bright_region(frames, conf_threshold)
+
+        frame = np.zeros((150, 200, 3), dtype=np.uint8)
+        frame[40:60, 50:70] = 255
+        tiler = TiledInference(tile_size=200, full_frame=True)
+        detections = tiler.predict(predict, [frame, frame])
+        self.assertEqual(calls, [2])
+        self.assertEqual(tiler.tiles_per_frame(200, 150), 1)
+        self.assertEqual(metrics.gauges["tiles_per_frame"], 1)
+        self.assertEqual(detections[1].boxes.tolist(), [[50, 40, 70, 60]])
+        self.assertEqual(tiler.tiles_per_frame(400, 300), 7)
+
+    def test_grayscale_frames(self):
+        shapes = []
+
+        def predict(frames, conf_threshold=0.5):
+            shapes.extend(frame.shape for frame in frames)
+            return [Detections.empty() for _ in frames]
+
+        tiler = TiledInference(tile_size=200, overlap=0.25, full_frame=False)
+        tiler.predict(predict, [np.zeros((300, 400), dtype=np.uint8)])
+        self.assertEqual(set(shapes), {(200, 200)})
+
+    def test_invalid_overlap(self):
+        with self.assertRaises(ValueError):
+            TiledInference(overlap=1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
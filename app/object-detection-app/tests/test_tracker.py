@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from src.core.detections import Detections
+from src.core.tracker import IoUTracker, TrackingDetector
+
+
+def detections(boxes, class_ids=None):
+    boxes = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+    class_ids = np.zeros(len(boxes), dtype=np.int32) if class_ids is None else np.array(class_ids, dtype=np.int32)
+    return Detections(boxes, np.full(len(boxes), 0.9, dtype=np.float32), class_ids, {0: 'person', 1: 'car'})
+
+
+class MovingBoxDetector:
+    """Detector double reporting one box that moves 5 px right per call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, frame, conf_threshold=0.5):
+        x = 10 + 5 * self.calls
+        self.calls += 1
+        return detections([[x, 10, x + 40, 50]])
+
+
+class TestIoUTracker(unittest.TestCase):
+
+    def test_ids_are_stable(self):
+        tracker = IoUTracker()
+        first = tracker.update(detections([[0, 0, 40, 40], [100, 100, 140, 140]]))
+        second = tracker.update(detections([[102, 101, 142, 141], [2, 1, 42, 41]]))
+        self.assertEqual(sorted(first.track_ids.tolist()), [1, 2])
+        self.assertEqual(second.track_ids.tolist(), [1, 2])
+        np.testing.assert_allclose(second.boxes[0], [2, 1, 42, 41])
+
+    def test_classes_do_not_match(self):
+        tracker = IoUTracker()
+        tracker.update(detections([[0, 0, 40, 40]], [0]))
+        result = tracker.update(detections([[0, 0, 40, 40]], [1]))
+        self.assertEqual(result.track_ids.tolist(), [2])
+
+    def test_predict_uses_velocity(self):
+        tracker = IoUTracker(momentum=1.0)
+        tracker.update(detections([[0, 0, 40, 40]]))
+        tracker.update(detections([[10, 0, 50, 40]]))
+        predicted = tracker.predict()
+        np.testing.assert_allclose(predicted.boxes[0], [20, 0, 60, 40])
+
+    def test_lost_tracks_expire(self):
+        tracker = IoUTracker(max_misses=1)
+        tracker.update(detections([[0, 0, 40, 40]]))
+        tracker.update(detections([]))
+        self.assertEqual(len(tracker), 1)
+        tracker.update(detections([]))
+        self.assertEqual(len(tracker), 0)
+
+    def test_lost_tracks_are_hidden_on_predicted_frames(self):
+        tracker = IoUTracker(max_misses=3)
+        tracker.update(detections([[0, 0, 40, 40], [100, 100, 140, 140]]))
+        shown = tracker.update(detections([[100, 100, 140, 140]]))
+        self.assertEqual(len(tracker), 2)
+        self.assertEqual(shown.track_ids.tolist(), [2])
+        for _ in range(3):
+            self.assertEqual(tracker.predict().track_ids.tolist(), [2])
+        # A coasting track shows again once it is matched
+        shown = tracker.update(detections([[0, 0, 40, 40], [100, 100, 140, 140]]))
+        self.assertEqual(sorted(shown.track_ids.tolist()), [1, 2])
+
+
+class TestTrackingDetector(unittest.TestCase):
+
+    def test_detector_runs_every_kth_frame(self):
+        detector = MovingBoxDetector()
+        tracking = TrackingDetector(detector, detect_interval=3)
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        ids = {int(tracking.detect(frame).track_ids[0]) for _ in range(9)}
+        self.assertEqual(detector.calls, 3)
+        self.assertEqual(ids, {1})
+        self.assertAlmostEqual(tracking.inference_ratio, 1 / 3)
+
+    def test_scene_change_forces_detection(self):
+        detector = MovingBoxDetector()
+        tracking = TrackingDetector(detector, detect_interval=10)
+        tracking.detect(np.zeros((120, 160, 3), dtype=np.uint8))
+        tracking.detect(np.full((120, 160, 3), 255, dtype=np.uint8))
+        self.assertEqual(detector.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()